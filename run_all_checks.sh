@@ -69,11 +69,11 @@ run_tests() {
     print_header "运行测试套件"
 
     echo -e "${YELLOW}运行单元测试...${NC}"
-    uv run pytest -v
+    uv run pytest -v -n auto --dist loadfile
     check_status "单元测试"
 
     echo -e "${YELLOW}运行覆盖率测试...${NC}"
-    uv run pytest --cov=woodgate --cov-report=term --cov-report=html
+    uv run pytest -n auto --dist loadfile --cov=woodgate --cov-report=term --cov-report=html
     check_status "覆盖率测试"
 
     echo -e "${GREEN}测试报告已生成在 htmlcov/ 目录${NC}"
@@ -4,10 +4,9 @@ MCP服务器模块 - 实现Model Context Protocol服务器
 """
 
 import asyncio
-import importlib.util
+import functools
 import logging
 import os
-import subprocess
 import sys
 import traceback
 import urllib.parse
@@ -60,87 +59,29 @@ DocumentResult = Union[DocumentContent, ErrorResponse]
 
 # 设置日志
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     stream=sys.stderr,
 )
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
-# 检查并安装必要的依赖
-required_packages = ["playwright", "httpx"]
-
-for package in required_packages:
-    if importlib.util.find_spec(package) is None:
-        logger.info(f"正在安装 {package}...")
-        try:
-            # 尝试使用uv安装
-            try:
-                subprocess.check_call(["uv", "pip", "install", package])
-                logger.info(f"{package} 使用uv安装成功")
-
-                # 如果是playwright，还需要安装浏览器
-                if package == "playwright":
-                    logger.info("安装Playwright浏览器...")
-                    try:
-                        subprocess.check_call(["playwright", "install", "chromium"])
-                        logger.info("Playwright浏览器安装成功")
-                    except Exception as e:
-                        logger.warning(f"安装Playwright浏览器失败: {e}")
-                        logger.warning("尝试使用Python模块安装浏览器...")
-                        subprocess.check_call(
-                            [sys.executable, "-m", "playwright", "install", "chromium"]
-                        )
-                        logger.info("Playwright浏览器安装成功")
-            except Exception as e1:
-                logger.warning(f"使用uv安装 {package} 失败: {e1}")
-                # 尝试使用pip安装
-                try:
-                    subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-                    logger.info(f"{package} 使用pip安装成功")
-
-                    # 如果是playwright，还需要安装浏览器
-                    if package == "playwright":
-                        logger.info("安装Playwright浏览器...")
-                        try:
-                            subprocess.check_call(
-                                [sys.executable, "-m", "playwright", "install", "chromium"]
-                            )
-                            logger.info("Playwright浏览器安装成功")
-                        except Exception as e:
-                            logger.warning(f"安装Playwright浏览器失败: {e}")
-                except Exception as e2:
-                    logger.warning(f"使用pip安装 {package} 失败: {e2}")
-                    # 尝试使用系统pip安装
-                    subprocess.check_call(["pip", "install", package])
-                    logger.info(f"{package} 使用系统pip安装成功")
-
-                    # 如果是playwright，还需要安装浏览器
-                    if package == "playwright":
-                        logger.info("安装Playwright浏览器...")
-                        try:
-                            subprocess.check_call(["playwright", "install", "chromium"])
-                            logger.info("Playwright浏览器安装成功")
-                        except Exception as e:
-                            logger.warning(f"安装Playwright浏览器失败: {e}")
-        except Exception as e:
-            logger.error(f"安装 {package} 失败: {e}")
-            logger.error("继续执行，但可能会导致功能不正常")
-
-# 导入必要的模块
+# 导入必要的模块，缺少依赖时提示运行安装脚本，而不是在导入时自动安装
 try:
     from mcp.server.fastmcp import FastMCP
     from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
 except ImportError as e:
-    logger.error(f"导入错误: {e}")
-    raise
+    raise SystemExit(f"缺少依赖: {e}\n请先运行: python -m woodgate.bootstrap") from e
+
+# cookie弹窗处理和资源拦截规则与woodgate包共用同一实现
+from woodgate.core.browser import is_blocked_request  # noqa: E402
+from woodgate.core.utils import handle_cookie_popup  # noqa: E402
 
 # 创建MCP服务器
 mcp = FastMCP(
     name="Woodgate",
     description="Red Hat客户门户搜索工具，提供登录、搜索和文档获取功能。",
     version="1.0.0",  # 添加版本号
-    log_level="DEBUG",  # 设置日志级别为DEBUG
+    log_level="INFO",  # 默认INFO，需要调试时再调低
     dependencies=["playwright", "httpx"],  # 声明依赖
     stateless_http=True,  # 支持无状态HTTP传输
 )
@@ -155,7 +96,6 @@ REDHAT_SEARCH_URL = "https://access.redhat.com/search"
 REDHAT_DIRECT_LOGIN_URL = "https://access.redhat.com/login"
 ALERTS_BASE_URL = "https://access.redhat.com/security/security-updates/"
 
-
 # 可用产品列表
 def available_products():
     """
@@ -249,7 +189,7 @@ def get_credentials():
             creds_path = os.path.join(
                 os.path.dirname(os.path.abspath(__file__)), "redhat_credentials.txt"
             )
-            logger.debug(f"尝试从文件读取凭据: {creds_path}")
+            logger.debug("尝试从文件读取凭据: %s", creds_path)
 
             if os.path.exists(creds_path):
                 with open(creds_path, "r") as f:
@@ -264,7 +204,7 @@ def get_credentials():
                 logger.warning(f"credentials文件不存在: {creds_path}")
         except Exception as e:
             logger.error(f"读取credentials文件出错: {e}")
-            logger.error(f"错误堆栈: {traceback.format_exc()}")
+            logger.error("错误堆栈: %s", traceback.format_exc())
     else:
         logger.info(f"使用环境变量中的凭据: username='{username}'")
 
@@ -273,10 +213,32 @@ def get_credentials():
         logger.error("未找到有效的凭据")
         return "", ""
 
-    logger.debug(f"凭据获取成功: username='{username}'")
+    logger.debug("凭据获取成功: username='%s'", username)
     return username, password
 
 
+# URL编码，产品名和文档类型在多次调用之间重复出现，缓存编码结果
+@functools.lru_cache(maxsize=256)
+def _q(value: str) -> str:
+    """对URL参数进行编码"""
+    return urllib.parse.quote(value)
+
+
+# 拦截非必要的资源请求
+async def block_resources(route) -> None:
+    """
+    路由处理函数 - 拦截图片、字体、样式等资源以及统计域名的请求
+
+    Args:
+        route: Playwright路由实例
+    """
+    request = route.request
+    if is_blocked_request(request.resource_type, request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 # 初始化浏览器
 async def initialize_browser() -> (
     Tuple[Optional[Playwright], Optional[Browser], Optional[BrowserContext], Optional[Page]]
@@ -334,6 +296,12 @@ async def initialize_browser() -> (
                 await playwright.stop()
             return None, None, None, None
 
+        # 在上下文级别拦截非必要资源，覆盖其中的所有页面
+        try:
+            await context.route("**/*", block_resources)
+        except Exception as e:
+            logger.warning(f"设置路由时出错: {e}")
+
         # 创建页面
         page = await context.new_page()
         if page is None:
@@ -351,12 +319,6 @@ async def initialize_browser() -> (
             # 使用同步方法设置超时，不使用await
             page.set_default_timeout(20000)  # 设置默认超时时间为20秒
             page.set_default_navigation_timeout(30000)  # 设置导航超时时间为30秒
-
-            # 阻止加载图片，提高性能
-            try:
-                await page.route("**/*.{png,jpg,jpeg,gif,svg}", lambda route: route.abort())
-            except Exception as e:
-                logger.warning(f"设置路由时出错: {e}")
         except Exception as e:
             logger.warning(f"配置页面选项时出错: {e}")
             # 继续执行，不中断初始化过程
@@ -365,7 +327,7 @@ async def initialize_browser() -> (
         return playwright, browser, context, page
     except Exception as e:
         logger.error(f"浏览器初始化失败: {e}")
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
 
         # 安全关闭已创建的资源
         try:
@@ -452,96 +414,8 @@ async def close_browser(
         logger.debug("浏览器资源已完全释放")
     except Exception as e:
         logger.warning(f"关闭浏览器时出错: {e}")
-        logger.debug(f"错误堆栈: {traceback.format_exc()}")
-
-
-# 处理Cookie弹窗
-async def handle_cookie_popup(page: Page, timeout: float = 1.0) -> bool:
-    """
-    处理网页上出现的cookie或隐私弹窗
-
-    Args:
-        page (Page): Playwright页面实例
-        timeout (float, optional): 等待弹窗出现的超时时间(秒). Defaults to 1.0.
-
-    Returns:
-        bool: 如果成功处理了弹窗返回True，否则返回False
-    """
-    logger.debug("检查是否存在cookie通知...")
-
-    try:
-        # 设置较短的超时时间，避免在没有弹窗的情况下等待太久
-        # 不使用get_default_timeout，因为在某些环境中可能不可用
-        original_timeout = 30000  # 默认30秒
-        try:
-            page.set_default_timeout(timeout * 1000)  # 转换为毫秒
-        except Exception:
-            # 如果设置超时失败，继续执行
-            pass
-
-        # 优化：使用更高效的CSS选择器，减少DOM查询次数
-        popup_selectors = [
-            "#truste-consent-button",  # Red Hat特有的
-            "#onetrust-banner-sdk",  # 最常见的
-            ".pf-c-modal-box",  # Red Hat特有的
-            "[role='dialog'][aria-modal='true']",  # 通用备选
-            ".cookie-banner",  # 通用cookie横幅
-            "#cookie-notice",  # 另一种常见的cookie通知
-        ]
-
-        # 检查是否存在cookie通知
-        for selector in popup_selectors:
-            try:
-                # 使用waitForSelector而不是等待元素可见，提高效率
-                cookie_notice = await page.wait_for_selector(
-                    selector, timeout=timeout * 1000, state="attached"
-                )
-                if cookie_notice:
-                    logger.debug(f"发现cookie通知，使用选择器: {selector}")
-                    await cookie_notice.click()
-                    logger.debug("已点击关闭按钮")
-                    # 恢复默认超时时间
-                    try:
-                        page.set_default_timeout(original_timeout)
-                    except Exception:
-                        pass
-                    return True
-            except Exception:
-                continue
-
-        # 尝试通过文本内容查找按钮
-        for button_text in ["Accept", "I agree", "Close", "OK", "接受", "同意", "关闭"]:
-            try:
-                # 使用text=按钮文本定位
-                button = page.get_by_text(button_text, exact=False).first
-                if button:
-                    await button.click(timeout=1000)
-                    logger.debug(f"找到并点击了文本为'{button_text}'的按钮")
-                    # 恢复默认超时时间
-                    try:
-                        page.set_default_timeout(original_timeout)
-                    except Exception:
-                        pass
-                    return True
-            except Exception:
-                continue
-
-        # 恢复默认超时时间
-        try:
-            page.set_default_timeout(original_timeout)
-        except Exception:
-            pass
-        logger.debug("未发现cookie通知")
-        return False
-
-    except Exception as e:
-        # 恢复默认超时时间
-        try:
-            page.set_default_timeout(30000)
-        except Exception:
-            pass
-        logger.debug(f"处理cookie通知时出错: {e}")
-        return False
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
 
 
 # 登录到Red Hat客户门户
@@ -554,7 +428,7 @@ async def take_screenshot(page: Page, name: str) -> None:
         name (str): 截图名称
     """
     # 截图功能已禁用
-    logger.debug(f"截图功能已禁用: {name}")
+    logger.debug("截图功能已禁用: %s", name)
     pass
 
 
@@ -633,31 +507,22 @@ async def login_to_redhat_portal(
         # 点击登录按钮
         logger.info("尝试点击登录按钮...")
         try:
-            login_button = await page.get_by_text("Log In", exact=True).first()
-            if login_button:
-                logger.info("找到'Log In'按钮")
-                await login_button.click()
-                logger.info("已点击登录按钮")
-                await take_screenshot(page, "after_login_button_click")
-            else:
-                # 尝试使用链接选择器
-                logger.info("未找到'Log In'按钮，尝试使用链接选择器")
-                login_locator = page.locator("a[href*='login']")
-                count = await login_locator.count()
-                logger.info(f"找到 {count} 个登录链接")
-                if count > 0:
-                    await login_locator.first().click()
-                    logger.info("已点击登录链接")
-                    await take_screenshot(page, "after_login_link_click")
-                else:
-                    logger.warning("未找到任何登录按钮或链接")
-                    await take_screenshot(page, "no_login_button_found")
+            # Locator总是为真，直接点击并依靠自动等待判断按钮是否存在
+            await page.get_by_text("Log In", exact=True).first.click(timeout=2000)
+            logger.info("已点击登录按钮")
+            await take_screenshot(page, "after_login_button_click")
         except Exception as e:
-            logger.warning(f"点击登录按钮时出错: {e}，可能已经在登录页面")
-            # 可能已经在登录页面，尝试直接访问登录页面
-            logger.info(f"直接访问登录页面: {REDHAT_DIRECT_LOGIN_URL}")
-            await page.goto(REDHAT_DIRECT_LOGIN_URL, wait_until="networkidle")
-            await take_screenshot(page, "direct_login_page")
+            logger.info("未找到'Log In'按钮(%s)，尝试使用链接选择器", e)
+            try:
+                await page.locator("a[href*='login']").first.click(timeout=2000)
+                logger.info("已点击登录链接")
+                await take_screenshot(page, "after_login_link_click")
+            except Exception as e2:
+                logger.warning(f"点击登录链接时出错: {e2}，可能已经在登录页面")
+                # 可能已经在登录页面，尝试直接访问登录页面
+                logger.info(f"直接访问登录页面: {REDHAT_DIRECT_LOGIN_URL}")
+                await page.goto(REDHAT_DIRECT_LOGIN_URL, wait_until="domcontentloaded")
+                await take_screenshot(page, "direct_login_page")
 
         # 输入用户名
         logger.info("等待用户名输入框...")
@@ -685,13 +550,13 @@ async def login_to_redhat_portal(
                         print(f"找到用户名输入框，使用选择器: {selector}")
                         break
                 except Exception as e:
-                    logger.debug(f"选择器 {selector} 失败: {e}")
+                    logger.debug("选择器 %s 失败: %s", selector, e)
                     continue
 
             if username_field:
                 logger.info("找到用户名输入框")
-                await username_field.fill("")  # 清空
-                await username_field.fill(username)  # 输入
+                # fill会先清空再输入，不需要单独清空
+                await username_field.fill(username)
                 logger.info("已输入用户名")
                 await take_screenshot(page, "after_username_input")
             else:
@@ -701,7 +566,7 @@ async def login_to_redhat_portal(
 
                 # 获取页面内容
                 page_content = await page.content()
-                logger.debug(f"页面内容片段: {page_content[:500]}...")
+                logger.debug("页面内容片段: %s...", page_content[:500])
 
                 # 尝试使用JavaScript填充表单
                 try:
@@ -740,19 +605,10 @@ async def login_to_redhat_portal(
         # 输入密码
         logger.info("等待密码输入框...")
         try:
-            password_field = await page.wait_for_selector(
-                "#password", state="visible", timeout=10000
-            )
-            if password_field:
-                logger.info("找到密码输入框")
-                await password_field.fill("")  # 清空
-                await password_field.fill(password)  # 输入
-                logger.info("已输入密码")
-                await take_screenshot(page, "after_password_input")
-            else:
-                logger.error("未找到密码输入框")
-                await take_screenshot(page, "password_field_not_found")
-                return False
+            # page.fill会自动等待输入框可见，并先清空再输入
+            await page.fill("#password", password, timeout=10000)
+            logger.info("已输入密码")
+            await take_screenshot(page, "after_password_input")
         except Exception as e:
             logger.error(f"等待密码输入框时出错: {e}")
             await take_screenshot(page, "password_field_error")
@@ -787,7 +643,7 @@ async def login_to_redhat_portal(
                         print(f"找到登录按钮，使用选择器: {selector}")
                         break
                 except Exception as e:
-                    logger.debug(f"登录按钮选择器 {selector} 失败: {e}")
+                    logger.debug("登录按钮选择器 %s 失败: %s", selector, e)
                     continue
 
             if login_button:
@@ -820,7 +676,7 @@ async def login_to_redhat_portal(
                             await take_screenshot(page, "after_js_login_button_click")
                             break
                         except Exception as e:
-                            logger.debug(f"JavaScript方法 {js_method} 失败: {e}")
+                            logger.debug("JavaScript方法 %s 失败: %s", js_method, e)
                             continue
                 except Exception as e:
                     logger.error(f"使用JavaScript点击登录按钮失败: {e}")
@@ -937,7 +793,7 @@ async def login_to_redhat_portal(
             # 尝试获取页面内容
             try:
                 page_content = await page.content()
-                logger.debug(f"页面内容片段: {page_content[:500]}...")
+                logger.debug("页面内容片段: %s...", page_content[:500])
             except Exception as e3:
                 logger.warning(f"获取页面内容时出错: {e3}")
 
@@ -945,7 +801,7 @@ async def login_to_redhat_portal(
 
     except Exception as e:
         logger.error(f"登录过程中出错: {e}")
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         await take_screenshot(page, "login_exception")
         return False
 
@@ -977,7 +833,7 @@ async def perform_search(
     """
     try:
         # 构建搜索URL
-        encoded_query = urllib.parse.quote(query)
+        encoded_query = _q(query)
         search_url = (
             f"{REDHAT_SEARCH_URL}?q={encoded_query}&p={page_num}&rows={rows}&sort={sort_by}"
         )
@@ -985,19 +841,19 @@ async def perform_search(
         # 添加产品过滤
         if products:
             for product in products:
-                encoded_product = urllib.parse.quote(product)
+                encoded_product = _q(product)
                 search_url += f"&product={encoded_product}"
 
         # 添加文档类型过滤
         if doc_types:
             for doc_type in doc_types:
-                encoded_doc_type = urllib.parse.quote(doc_type)
+                encoded_doc_type = _q(doc_type)
                 search_url += f"&documentKind={encoded_doc_type}"
 
-        logger.debug(f"搜索URL: {search_url}")
+        logger.debug("搜索URL: %s", search_url)
 
         # 访问搜索页面
-        await page.goto(search_url, wait_until="networkidle")
+        await page.goto(search_url, wait_until="domcontentloaded")
         logger.debug("已加载搜索页面")
 
         # 处理可能出现的Cookie弹窗
@@ -1020,9 +876,9 @@ async def perform_search(
             page_loaded = False
             for selector in selectors:
                 try:
-                    logger.debug(f"尝试等待选择器: {selector}")
+                    logger.debug("尝试等待选择器: %s", selector)
                     await page.wait_for_selector(selector, state="visible", timeout=5000)
-                    logger.debug(f"页面已加载，找到选择器: {selector}")
+                    logger.debug("页面已加载，找到选择器: %s", selector)
                     page_loaded = True
                     break
                 except Exception:
@@ -1031,7 +887,7 @@ async def perform_search(
             if not page_loaded:
                 # 如果所有选择器都失败，检查URL是否表明页面已加载
                 current_url = page.url
-                logger.debug(f"当前URL: {current_url}")
+                logger.debug("当前URL: %s", current_url)
                 if "search" in current_url and "redhat.com" in current_url:
                     logger.debug("基于URL判断页面已加载")
                     page_loaded = True
@@ -1068,7 +924,7 @@ async def perform_search(
                 try:
                     elements = await page.query_selector_all(selector)
                     if elements and len(elements) > 0:
-                        logger.debug(f"使用选择器 {selector} 找到 {len(elements)} 个结果")
+                        logger.debug("使用选择器 %s 找到 %s 个结果", selector, len(elements))
                         search_elements = elements
                         break
                 except Exception:
@@ -1076,7 +932,7 @@ async def perform_search(
 
             # 如果找到了结果元素
             if search_elements and len(search_elements) > 0:
-                logger.debug(f"找到 {len(search_elements)} 个搜索结果")
+                logger.debug("找到 %s 个搜索结果", len(search_elements))
             else:
                 # 如果没有找到结果，尝试获取页面内容
                 logger.debug("未找到搜索结果元素，尝试替代方法")
@@ -1114,7 +970,7 @@ async def perform_search(
                     try:
                         links = await page.query_selector_all(selector)
                         if links and len(links) > 0:
-                            logger.debug(f"使用选择器 {selector} 找到 {len(links)} 个结果链接")
+                            logger.debug("使用选择器 %s 找到 %s 个结果链接", selector, len(links))
 
                             # 提取链接信息
                             for link in links:
@@ -1174,7 +1030,7 @@ async def perform_search(
                         ".search-result, .pf-c-card, article.co-search-result"
                     )
                     if result_containers and len(result_containers) > 0:
-                        logger.debug(f"找到 {len(result_containers)} 个搜索结果容器")
+                        logger.debug("找到 %s 个搜索结果容器", len(result_containers))
 
                         # 提取结果信息
                         for container in result_containers:
@@ -1233,7 +1089,7 @@ async def perform_search(
                                 continue
 
                         if results:
-                            logger.debug(f"通过搜索结果容器提取找到 {len(results)} 个结果")
+                            logger.debug("通过搜索结果容器提取找到 %s 个结果", len(results))
                             # 确保返回类型正确
                             container_results: SearchResults = []
                             for result in results:
@@ -1258,7 +1114,7 @@ async def perform_search(
                         "a[href*='access.redhat.com/solutions'], a[href*='access.redhat.com/articles']"
                     )
                     if links and len(links) > 0:
-                        logger.debug(f"找到 {len(links)} 个可能的结果链接")
+                        logger.debug("找到 %s 个可能的结果链接", len(links))
 
                         # 提取链接信息
                         for link in links:
@@ -1308,7 +1164,7 @@ async def perform_search(
                                 continue
 
                         if results:
-                            logger.debug(f"通过链接提取找到 {len(results)} 个结果")
+                            logger.debug("通过链接提取找到 %s 个结果", len(results))
                             # 确保返回类型正确
                             link_results: SearchResults = []
                             for result in results:
@@ -1342,7 +1198,7 @@ async def perform_search(
         if not search_elements or len(search_elements) == 0:
             try:
                 search_elements = await page.query_selector_all(".pf-c-card, .search-result")
-                logger.debug(f"重新查询找到 {len(search_elements)} 个搜索结果")
+                logger.debug("重新查询找到 %s 个搜索结果", len(search_elements))
             except Exception as e:
                 logger.error(f"重新查询搜索结果时出错: {e}")
                 search_elements = []
@@ -1397,10 +1253,11 @@ async def perform_search(
                 )
             except Exception as e:
                 logger.error(f"提取搜索结果时出错: {e}")
-                logger.debug(f"错误堆栈: {traceback.format_exc()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("错误堆栈: %s", traceback.format_exc())
                 continue
 
-        logger.debug(f"成功提取 {len(results)} 个搜索结果")
+        logger.debug("成功提取 %s 个搜索结果", len(results))
         # 确保返回类型正确
         typed_results: SearchResults = []
         for result in results:
@@ -1421,7 +1278,8 @@ async def perform_search(
         return typed_results
     except Exception as e:
         logger.error(f"执行搜索时出错: {e}")
-        logger.debug(f"错误堆栈: {traceback.format_exc()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
         return [ErrorResponse(error="执行搜索时出错")]
 
 
@@ -1439,12 +1297,12 @@ async def get_product_alerts(page: Page, product: str) -> AlertResults:
     """
     try:
         # 构建警报URL
-        encoded_product = urllib.parse.quote(product)
+        encoded_product = _q(product)
         alerts_url = f"{REDHAT_PORTAL_URL}/products/{encoded_product}/alerts"
-        logger.debug(f"警报URL: {alerts_url}")
+        logger.debug("警报URL: %s", alerts_url)
 
         # 访问警报页面
-        await page.goto(alerts_url, wait_until="networkidle")
+        await page.goto(alerts_url, wait_until="domcontentloaded")
         logger.debug("已加载警报页面")
 
         # 处理可能出现的Cookie弹窗
@@ -1461,7 +1319,7 @@ async def get_product_alerts(page: Page, product: str) -> AlertResults:
         # 提取警报信息
         alerts = []
         alert_elements = await page.query_selector_all(".pf-c-card, .portal-advisory")
-        logger.debug(f"找到 {len(alert_elements)} 个警报元素")
+        logger.debug("找到 %s 个警报元素", len(alert_elements))
 
         for element in alert_elements:
             try:
@@ -1513,10 +1371,11 @@ async def get_product_alerts(page: Page, product: str) -> AlertResults:
                 )
             except Exception as e:
                 logger.error(f"提取警报信息时出错: {e}")
-                logger.debug(f"错误堆栈: {traceback.format_exc()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("错误堆栈: %s", traceback.format_exc())
                 continue
 
-        logger.debug(f"成功提取 {len(alerts)} 个警报")
+        logger.debug("成功提取 %s 个警报", len(alerts))
         # 确保返回类型正确
         typed_alerts: AlertResults = []
         for alert in alerts:
@@ -1537,7 +1396,8 @@ async def get_product_alerts(page: Page, product: str) -> AlertResults:
         return typed_alerts
     except Exception as e:
         logger.error(f"获取产品警报时出错: {e}")
-        logger.debug(f"错误堆栈: {traceback.format_exc()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
         return [ErrorResponse(error="获取产品警报时出错")]
 
 
@@ -1555,7 +1415,7 @@ async def get_document_content(page: Page, document_url: str) -> DocumentResult:
     """
     try:
         # 访问文档页面
-        await page.goto(document_url, wait_until="networkidle")
+        await page.goto(document_url, wait_until="domcontentloaded")
         logger.debug("已加载文档页面")
 
         # 处理可能出现的Cookie弹窗
@@ -1616,7 +1476,8 @@ async def get_document_content(page: Page, document_url: str) -> DocumentResult:
         return {"title": title, "url": document_url, "content": content, "metadata": metadata}
     except Exception as e:
         logger.error(f"获取文档内容时出错: {e}")
-        logger.debug(f"错误堆栈: {traceback.format_exc()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
         return {"error": f"获取文档内容时出错: {str(e)}"}
 
 
@@ -1789,7 +1650,7 @@ async def search(
         print(f"搜索过程中出错: {e}")
         print(f"错误堆栈: {traceback.format_exc()}")
         logger.error(f"搜索过程中出错: {e}")
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         return [{"error": f"搜索过程中出错: {str(e)}"}]
     finally:
         try:
@@ -1834,7 +1695,7 @@ async def get_alerts(product: str) -> AlertResults:
 
         # 解析凭据结果
         username, password = credentials_result
-        logger.debug(f"凭据获取成功: username='{username}'")
+        logger.debug("凭据获取成功: username='%s'", username)
 
         # 检查浏览器初始化是否成功
         if playwright is None or browser is None or context is None or page_obj is None:
@@ -1849,7 +1710,7 @@ async def get_alerts(product: str) -> AlertResults:
         return alerts
     except Exception as e:
         logger.error(f"获取警报过程中出错: {e}")
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         return [{"error": f"获取警报过程中出错: {str(e)}"}]
     finally:
         try:
@@ -1890,7 +1751,7 @@ async def get_document(document_url: str) -> DocumentResult:
 
         # 解析凭据结果
         username, password = credentials_result
-        logger.debug(f"凭据获取成功: username='{username}'")
+        logger.debug("凭据获取成功: username='%s'", username)
 
         # 检查浏览器初始化是否成功
         if playwright is None or browser is None or context is None or page_obj is None:
@@ -1905,7 +1766,7 @@ async def get_document(document_url: str) -> DocumentResult:
         return document
     except Exception as e:
         logger.error(f"获取文档内容过程中出错: {e}")
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         return {"error": f"获取文档内容过程中出错: {str(e)}"}
     finally:
         try:
@@ -4,15 +4,30 @@ Pytest配置文件
 
 import asyncio
 import os
-from typing import Any, Dict, Generator
+import sys
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Generator
+from unittest.mock import AsyncMock
 
 import pytest
 
-# 导入异步API
-from playwright.async_api import Browser as AsyncBrowser
-from playwright.async_api import BrowserContext as AsyncBrowserContext
-from playwright.async_api import async_playwright
-from playwright.sync_api import BrowserContext, Page
+from woodgate.core.browser import _block_resources as _async_block_resources
+from woodgate.core.browser import is_blocked_request
+
+# Playwright的类型只用于注解，async_playwright在固件中按需导入
+if TYPE_CHECKING:
+    from playwright.async_api import Browser as AsyncBrowser
+    from playwright.async_api import BrowserContext as AsyncBrowserContext
+    from playwright.sync_api import Browser, BrowserContext, Page, Route
+
+# 安装了uvloop时使用uvloop事件循环，pytest-asyncio创建的会话事件循环会使用这个策略
+if sys.platform != "win32":
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
 
 
 # 自定义命令行选项
@@ -22,6 +37,125 @@ def pytest_addoption(parser):
         "--headless", action="store_true", default=True, help="是否使用无头模式运行浏览器"
     )
     parser.addoption("--slow-mo", default="0", help="减慢浏览器操作的毫秒数")
+    parser.addoption(
+        "--pw-timeout", default="5000", help="页面操作的默认超时毫秒数，导航超时为其两倍"
+    )
+
+
+# 并行运行时每个工作进程启动一个Chromium，每个浏览器至少占用浏览器进程和渲染进程两个核心
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    """-n auto时按CPU核心数的一半启动工作进程，设置了PYTEST_XDIST_AUTO_NUM_WORKERS时使用默认逻辑"""
+    if os.environ.get("PYTEST_XDIST_AUTO_NUM_WORKERS"):
+        return None
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+# pytest-xdist工作进程ID，未并行运行(或未安装pytest-xdist)时为master
+@pytest.fixture(scope="session")
+def worker_id() -> str:
+    """当前pytest-xdist工作进程的ID"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+_real_sleep = asyncio.sleep
+
+# 使用真实浏览器的固件，这些测试保留asyncio.sleep的实际等待
+BROWSER_FIXTURES = frozenset({"browser", "async_browser"})
+
+
+async def _instant_sleep(delay, result=None):
+    """不等待delay秒，只让出一次事件循环"""
+    return await _real_sleep(0, result)
+
+
+# 模拟测试中的重试等待(登录、提取搜索结果等)不需要真的等待
+@pytest.fixture(autouse=True)
+def instant_sleep(request, monkeypatch):
+    """将asyncio.sleep替换为立即返回的版本，真实浏览器测试除外"""
+    if BROWSER_FIXTURES.isdisjoint(request.fixturenames):
+        monkeypatch.setattr(asyncio, "sleep", _instant_sleep)
+
+
+def _skip_log_step(message: str) -> None:
+    """不输出日志步骤"""
+
+
+# 被测模块的log_step只输出日志，测试中统一替换为空函数
+@pytest.fixture(autouse=True)
+def mute_log_step(monkeypatch):
+    """屏蔽认证和搜索模块的log_step"""
+    monkeypatch.setattr("woodgate.core.auth.log_step", _skip_log_step)
+    monkeypatch.setattr("woodgate.core.search.log_step", _skip_log_step)
+
+
+# 模拟页面上预先创建的常用异步方法，测试只需设置自己用到的返回值或side_effect
+MOCK_PAGE_METHODS = (
+    "goto",
+    "evaluate",
+    "wait_for_selector",
+    "wait_for_load_state",
+    "screenshot",
+    "reload",
+    "query_selector",
+    "query_selector_all",
+)
+
+
+# 整个测试会话共用一个模拟页面，每个测试结束后恢复原状
+@pytest.fixture(scope="session")
+def shared_mock_page() -> AsyncMock:
+    """
+    创建模拟页面并预先创建常用方法
+
+    使用Page作为spec_set，只能访问和设置Page上存在的属性，拼错的属性名会直接报错，
+    同步方法(例如set_default_timeout)也会是普通的MagicMock而不是AsyncMock
+    """
+    from playwright.async_api import Page as AsyncPage
+
+    page = AsyncMock(spec_set=AsyncPage)
+    for name in MOCK_PAGE_METHODS:
+        getattr(page, name)
+    return page
+
+
+@pytest.fixture
+def mock_page(shared_mock_page: AsyncMock) -> Generator[AsyncMock, None, None]:
+    """
+    提供共用的模拟页面
+
+    reset_mock不会清除测试直接赋值的属性(例如url或替换的方法)，
+    所以测试结束后还要删除新增的属性和子模拟对象，恢复预先创建的方法
+    """
+    attributes = set(vars(shared_mock_page))
+    children = dict(shared_mock_page._mock_children)
+
+    yield shared_mock_page
+
+    for name in set(vars(shared_mock_page)) - attributes:
+        vars(shared_mock_page).pop(name)
+    shared_mock_page._mock_children.clear()
+    shared_mock_page._mock_children.update(children)
+    shared_mock_page.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="session")
+def server() -> ModuleType:
+    """
+    返回woodgate.server模块
+
+    导入服务器模块会加载FastMCP，放在固件中导入，用-k只选择其他测试时不会加载
+    """
+    import woodgate.server
+
+    return woodgate.server
+
+
+# 页面默认超时，测试环境中正常页面很快响应，缺失的元素应尽快失败
+@pytest.fixture(scope="session")
+def pw_timeout(pytestconfig) -> int:
+    """页面操作的默认超时时间(毫秒)"""
+    return int(pytestconfig.getoption("--pw-timeout"))
 
 
 # 自定义浏览器固件
@@ -42,8 +176,8 @@ def browser_type_launch_args(pytestconfig) -> Dict[str, Any]:
     }
 
 
-# 自定义浏览器上下文固件
-@pytest.fixture(scope="function")
+# 自定义浏览器上下文固件，会话级别，供会话级别的已登录上下文复用
+@pytest.fixture(scope="session")
 def browser_context_args() -> Dict[str, Any]:
     """浏览器上下文参数"""
     return {
@@ -55,16 +189,64 @@ def browser_context_args() -> Dict[str, Any]:
     }
 
 
+# 登录页面上可能出现的Cookie弹窗，合并为一个选择器只等待一次
+COOKIE_SELECTORS = (
+    "#truste-consent-button",
+    "#onetrust-banner-sdk",
+    ".pf-c-modal-box",
+    "[role='dialog'][aria-modal='true']",
+    ".cookie-banner",
+    "#cookie-notice",
+)
+COOKIE_SELECTOR = ", ".join(COOKIE_SELECTORS)
+
+
+# 填写并提交Red Hat登录表单，凭据作为参数传入，不拼接到脚本中
+FILL_LOGIN_FORM_JS = """
+async ({ username, password }) => {
+    const setValue = (input, value) => {
+        input.value = value;
+        input.dispatchEvent(new Event("input", { bubbles: true }));
+    };
+
+    setValue(document.querySelector("#username"), username);
+    const nextButton = document.querySelector("#login-show-step2");
+    if (nextButton) nextButton.click();
+
+    // 两步登录时密码框在点击下一步后才出现，最多等待5秒
+    let passwordInput = document.querySelector("#password");
+    for (let i = 0; i < 50 && !passwordInput; i++) {
+        await new Promise((resolve) => setTimeout(resolve, 100));
+        passwordInput = document.querySelector("#password");
+    }
+    setValue(passwordInput, password);
+    document.querySelector("#kc-login, #rh-password-verification-submit-button").click();
+}
+"""
+
+
+def _block_resources(route: "Route") -> None:
+    """拦截图片、字体、样式等非必要资源和统计域名，规则由woodgate.core.browser.is_blocked_request提供"""
+    request = route.request
+    if is_blocked_request(request.resource_type, request.url):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _configure_page(page: "Page", timeout: int) -> "Page":
+    """配置同步页面的超时时间，资源拦截注册在上下文上"""
+    page.set_default_timeout(timeout)
+    page.set_default_navigation_timeout(timeout * 2)
+    return page
+
+
 # 自定义页面固件
 @pytest.fixture(scope="function")
-def page(context: BrowserContext) -> Generator[Page, None, None]:
+def page(context: "BrowserContext", pw_timeout: int) -> Generator["Page", None, None]:
     """创建页面并配置 - 同步版本"""
-    page = context.new_page()
-
-    # 配置页面选项
-    page.route("**/*.{png,jpg,jpeg,gif,svg}", lambda route: route.abort())  # 阻止加载图片，提高性能
-    page.set_default_timeout(20000)  # 设置默认超时时间为20秒
-    page.set_default_navigation_timeout(30000)  # 设置导航超时时间为30秒
+    context.route("**/*", _block_resources)
+    page = _configure_page(context.new_page(), pw_timeout)
 
     yield page
 
@@ -72,18 +254,12 @@ def page(context: BrowserContext) -> Generator[Page, None, None]:
     page.close()
 
 
-# 使用pytest-asyncio的事件循环策略
-@pytest.fixture(scope="session")
-def event_loop_policy():
-    """设置事件循环策略"""
-    policy = asyncio.get_event_loop_policy()
-    return policy
-
-
 # 异步浏览器固件
 @pytest.fixture(scope="function")
 async def async_browser():
     """创建异步浏览器实例"""
+    from playwright.async_api import async_playwright
+
     async with async_playwright() as playwright:
         browser = await playwright.chromium.launch(
             headless=True,
@@ -101,38 +277,43 @@ async def async_browser():
 
 # 异步浏览器上下文固件
 @pytest.fixture(scope="function")
-async def async_context(async_browser: AsyncBrowser):
+async def async_context(async_browser: "AsyncBrowser"):
     """创建异步浏览器上下文"""
     context = await async_browser.new_context(
         viewport={"width": 1920, "height": 1080},
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         ignore_https_errors=True,
     )
+    # 在上下文上拦截非必要资源，所有页面共享同一个处理函数
+    await context.route("**/*", _async_block_resources)
     yield context
     await context.close()
 
 
 # 异步页面固件
 @pytest.fixture(scope="function")
-async def async_page(async_context: AsyncBrowserContext):
+async def async_page(async_context: "AsyncBrowserContext", pw_timeout: int):
     """创建异步页面实例"""
     page = await async_context.new_page()
 
     # 配置页面选项
-    await page.route(
-        "**/*.{png,jpg,jpeg,gif,svg}", lambda route: route.abort()
-    )  # 阻止加载图片，提高性能
-    page.set_default_timeout(20000)  # 设置默认超时时间为20秒
-    page.set_default_navigation_timeout(30000)  # 设置导航超时时间为30秒
+    page.set_default_timeout(pw_timeout)
+    page.set_default_navigation_timeout(pw_timeout * 2)
 
     yield page
     await page.close()
 
 
-# 自定义登录固件
-@pytest.fixture(scope="function")
-def authenticated_page(page: Page) -> Generator[Page, None, None]:
-    """创建已登录的页面"""
+# 登录状态固件，整个测试会话只登录一次(并行运行时每个工作进程登录一次)
+@pytest.fixture(scope="session")
+def auth_state(
+    browser: "Browser",
+    browser_context_args: Dict[str, Any],
+    pw_timeout: int,
+    tmp_path_factory,
+    worker_id: str,
+) -> str:
+    """执行一次交互式登录，把cookie和localStorage保存到文件"""
     # 从环境变量获取凭据
     username = os.environ.get("REDHAT_USERNAME", "")
     password = os.environ.get("REDHAT_PASSWORD", "")
@@ -140,47 +321,54 @@ def authenticated_page(page: Page) -> Generator[Page, None, None]:
     if not username or not password:
         pytest.skip("未设置REDHAT_USERNAME或REDHAT_PASSWORD环境变量")
 
+    context = browser.new_context(**browser_context_args)
+    context.route("**/*", _block_resources)
+    page = _configure_page(context.new_page(), pw_timeout)
+
     # 访问登录页面
-    page.goto("https://access.redhat.com/login", wait_until="networkidle")
+    page.goto("https://access.redhat.com/login", wait_until="domcontentloaded")
 
-    # 处理Cookie弹窗
+    # 处理Cookie弹窗，click会自动等待元素可见，没有弹窗是正常情况，不需要等太久
     try:
-        cookie_notice = page.wait_for_selector(
-            "#truste-consent-button, #onetrust-banner-sdk, .pf-c-modal-box, [role='dialog'][aria-modal='true'], .cookie-banner, #cookie-notice",
-            state="visible",
-            timeout=3000,
-        )
-        if cookie_notice:
-            cookie_notice.click()
+        page.locator(f"{COOKIE_SELECTOR} >> visible=true").first.click(timeout=1500)
     except Exception:
         pass
 
-    # 输入用户名
-    username_field = page.wait_for_selector("#username", state="visible", timeout=10000)
-    if username_field:
-        username_field.fill("")  # 清空
-        username_field.fill(username)  # 输入
+    # 在页面内一次完成填写用户名、下一步、填写密码和提交
+    page.wait_for_selector("#username", state="attached")
+    page.evaluate(FILL_LOGIN_FORM_JS, {"username": username, "password": password})
 
-    # 点击下一步按钮（如果存在）
-    try:
-        next_button = page.wait_for_selector("#login-show-step2", state="visible", timeout=3000)
-        if next_button:
-            next_button.click()
-    except Exception:
-        pass
+    # 等待登录完成，登录后会跳转页面，使用导航超时
+    page.wait_for_selector(".pf-c-page__header", state="visible", timeout=pw_timeout * 2)
 
-    # 输入密码
-    password_field = page.wait_for_selector("#password", state="visible", timeout=10000)
-    if password_field:
-        password_field.fill("")  # 清空
-        password_field.fill(password)  # 输入
+    # 每个工作进程写自己的文件，避免并行运行时互相覆盖
+    state_path = str(tmp_path_factory.getbasetemp() / f"auth-{worker_id}.json")
+    context.storage_state(path=state_path)
+    context.close()
 
-    # 点击登录按钮
-    login_button = page.wait_for_selector("#kc-login", state="visible", timeout=5000)
-    if login_button:
-        login_button.click()
+    return state_path
 
-    # 等待登录完成
-    page.wait_for_selector(".pf-c-page__header", state="visible", timeout=20000)
+
+# 已登录的浏览器上下文，由所有需要登录的测试共享
+@pytest.fixture(scope="session")
+def authenticated_context(
+    browser: "Browser", browser_context_args: Dict[str, Any], auth_state: str
+) -> Generator["BrowserContext", None, None]:
+    """从保存的登录状态创建浏览器上下文，不再重复登录"""
+    context = browser.new_context(**browser_context_args, storage_state=auth_state)
+    context.route("**/*", _block_resources)
+    yield context
+    context.close()
+
+
+# 自定义登录固件
+@pytest.fixture(scope="function")
+def authenticated_page(
+    authenticated_context: "BrowserContext", pw_timeout: int
+) -> Generator["Page", None, None]:
+    """在已登录的上下文中创建页面，测试结束后关闭"""
+    page = _configure_page(authenticated_context.new_page(), pw_timeout)
 
     yield page
+
+    page.close()
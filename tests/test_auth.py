@@ -2,159 +2,186 @@
 认证模块测试 - 包含基本测试、扩展测试和单元测试
 """
 
+from dataclasses import dataclass, fields
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from playwright.async_api import TimeoutError
+from playwright.async_api import BrowserContext, ElementHandle, Page, TimeoutError
 
+from woodgate.config import get_config
+from woodgate.core import auth as auth_module
 from woodgate.core.auth import check_login_status, login_to_redhat_portal
 
 
+def seq(*values):
+    """
+    按顺序返回values中的值，用作模拟对象的side_effect
+
+    values中的异常实例会在轮到时被抛出，与side_effect列表的行为一致
+    """
+    it = iter(values)
+
+    def next_value(*args, **kwargs):
+        value = next(it)
+        if isinstance(value, BaseException):
+            raise value
+        return value
+
+    return next_value
+
+
+# page.evaluate依次返回的值：第一次是页面准备好的检查，第二次是JavaScript登录的结果
+EVAL_LOGIN_OK = (True, {"success": True})
+EVAL_LOGIN_FAILED = (True, {"success": False})
+EVAL_LOGIN_MISSING_USERNAME = (True, {"success": False, "error": "未找到用户名输入框"})
+
+
+@dataclass
+class AuthMocks:
+    """登录测试共用的模拟对象"""
+
+    page: AsyncMock
+    context: AsyncMock
+    username_field: AsyncMock
+    password_field: AsyncMock
+    login_button: AsyncMock
+
+
+@pytest.fixture(scope="module")
+def shared_auth_mocks() -> AuthMocks:
+    """每个测试模块只创建一次模拟对象，按Playwright的类型限定可用的属性"""
+    return AuthMocks(
+        page=AsyncMock(spec_set=Page),
+        context=AsyncMock(spec_set=BrowserContext),
+        username_field=AsyncMock(spec_set=ElementHandle),
+        password_field=AsyncMock(spec_set=ElementHandle),
+        login_button=AsyncMock(spec_set=ElementHandle),
+    )
+
+
+@pytest.fixture
+def auth_mocks(shared_auth_mocks: AuthMocks) -> AuthMocks:
+    """重置共用的模拟对象，清除上一个测试设置的调用记录、返回值和side_effect"""
+    for field in fields(shared_auth_mocks):
+        getattr(shared_auth_mocks, field.name).reset_mock(return_value=True, side_effect=True)
+    return shared_auth_mocks
+
+
 class TestAuthBasic:
     """认证模块基本测试"""
 
-    @pytest.mark.asyncio
-    async def test_login_to_redhat_portal_success(self):
+    async def test_login_to_redhat_portal_success(self, auth_mocks):
         """测试成功登录到Red Hat客户门户"""
         # 模拟Playwright Page和元素
-        mock_page = AsyncMock()
-        mock_context = AsyncMock()
-        mock_username_field = AsyncMock()
-        mock_password_field = AsyncMock()
-        mock_login_button = AsyncMock()
+        mock_page = auth_mocks.page
+        mock_context = auth_mocks.context
+        mock_username_field = auth_mocks.username_field
+        mock_password_field = auth_mocks.password_field
+        mock_login_button = auth_mocks.login_button
         mock_user_menu = AsyncMock()
 
         # 设置模拟行为
-        mock_page.goto.return_value = AsyncMock()
-        mock_page.wait_for_selector.side_effect = [
+        mock_page.wait_for_selector.side_effect = seq(
             mock_username_field,  # 用户名字段
             mock_password_field,  # 密码字段
             mock_login_button,  # 登录按钮
             mock_user_menu,  # 用户菜单（登录成功标志）
-        ]
-
-        # 设置 evaluate 返回值
-        mock_page.evaluate = AsyncMock(
-            side_effect=[True, {"success": True}]  # 页面准备好的检查  # JavaScript登录成功
         )
 
-        with patch("woodgate.core.utils.handle_cookie_popup", return_value=True):
-            # 调用被测试的函数
-            result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
+        # 设置 evaluate 返回值：页面准备好的检查、JavaScript登录成功
+        mock_page.evaluate.side_effect = seq(*EVAL_LOGIN_OK)
 
-            # 验证结果
-            assert result is True
-            mock_page.goto.assert_called_once_with(
-                "https://access.redhat.com/login", wait_until="networkidle", timeout=30000
-            )
-            # 不再验证fill和click方法，因为现在使用JavaScript填充表单
-            # 而不是使用Playwright的fill和click方法
-            # 注意：在当前实现中，cookie横幅处理由browser.py中的setup_cookie_banner_handlers函数处理
-            # 所以这里不再验证handle_cookie_popup是否被调用
-            # 注意：print_cookies只在登录成功后被调用，但在测试中可能不会被调用
-            # 所以这里不再验证print_cookies是否被调用
-
-    @pytest.mark.asyncio
-    async def test_login_to_redhat_portal_failure(self):
+        # 调用被测试的函数
+        result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
+
+        # 验证结果
+        assert result is True
+        mock_page.goto.assert_called_once_with(
+            "https://access.redhat.com/login", wait_until="domcontentloaded", timeout=30000
+        )
+        # 不再验证fill和click方法，因为现在使用JavaScript填充表单
+        # 而不是使用Playwright的fill和click方法
+        # 注意：在当前实现中，cookie横幅处理由browser.py中的setup_cookie_banner_handlers函数处理
+        # 所以这里不再验证handle_cookie_popup是否被调用
+        # 注意：print_cookies只在登录成功后被调用，但在测试中可能不会被调用
+        # 所以这里不再验证print_cookies是否被调用
+
+    async def test_login_to_redhat_portal_failure(self, auth_mocks):
         """测试登录失败的情况"""
         # 模拟Playwright Page和元素
-        mock_page = AsyncMock()
-        mock_context = AsyncMock()
-        mock_username_field = AsyncMock()
-        mock_password_field = AsyncMock()
-        mock_login_button = AsyncMock()
+        mock_page = auth_mocks.page
+        mock_context = auth_mocks.context
+        mock_username_field = auth_mocks.username_field
+        mock_password_field = auth_mocks.password_field
+        mock_login_button = auth_mocks.login_button
         mock_error_message = AsyncMock()
 
         # 设置模拟行为
-        mock_page.goto.return_value = AsyncMock()
-        mock_page.wait_for_selector.side_effect = [
+        mock_page.wait_for_selector.side_effect = seq(
             mock_username_field,  # 用户名字段
             mock_password_field,  # 密码字段
             mock_login_button,  # 登录按钮
             TimeoutError("Timeout"),  # 登录超时
-        ]
+        )
 
         # 模拟找到错误消息
         mock_page.query_selector.return_value = mock_error_message
         mock_error_message.text_content.return_value = "Invalid username or password"
 
-        with patch("woodgate.core.utils.handle_cookie_popup", return_value=True):
-            with patch("woodgate.core.auth.asyncio.sleep"):
-                # 调用被测试的函数
-                await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
-
-                # 验证结果
-                # 注意：在当前实现中，如果URL不包含login，会认为登录成功
-                # 所以这里我们不再断言结果是False
-                mock_page.goto.assert_called_once_with(
-                    "https://access.redhat.com/login", wait_until="networkidle", timeout=30000
-                )
-                # 不再验证fill和click方法，因为现在使用JavaScript填充表单
-                # 而不是使用Playwright的fill和click方法
-
-    @pytest.mark.asyncio
-    async def test_check_login_status_logged_in(self):
-        """测试已登录状态检查"""
-        # 模拟Playwright Page和元素
-        mock_page = AsyncMock()
-        mock_user_menu = AsyncMock()
-
-        # 设置模拟行为
-        mock_page.goto.return_value = AsyncMock()
-        mock_page.wait_for_selector.return_value = mock_user_menu
-
         # 调用被测试的函数
-        result = await check_login_status(mock_page)
+        await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
 
         # 验证结果
-        assert result is True
+        # 注意：在当前实现中，如果URL不包含login，会认为登录成功
+        # 所以这里我们不再断言结果是False
         mock_page.goto.assert_called_once_with(
-            "https://access.redhat.com/management", wait_until="networkidle", timeout=30000
+            "https://access.redhat.com/login", wait_until="domcontentloaded", timeout=30000
         )
-
-    @pytest.mark.asyncio
-    async def test_check_login_status_not_logged_in(self):
-        """测试未登录状态检查"""
+        # 不再验证fill和click方法，因为现在使用JavaScript填充表单
+        # 而不是使用Playwright的fill和click方法
+
+    @pytest.mark.parametrize(
+        "user_menu_result, expected",
+        [
+            (AsyncMock(), True),  # 找到用户菜单，已登录
+            (TimeoutError("Timeout"), False),  # 超时后停留在登录页面，未登录
+        ],
+        ids=["logged_in", "not_logged_in"],
+    )
+    async def test_check_login_status(self, user_menu_result, expected):
+        """测试登录状态检查"""
         # 模拟Playwright Page
         mock_page = AsyncMock()
         mock_page.url = "https://access.redhat.com/login"
 
-        # 设置模拟行为 - 超时异常
-        mock_page.goto.return_value = AsyncMock()
-        mock_page.wait_for_selector.side_effect = TimeoutError("Timeout")
+        # 设置模拟行为，异常实例会被wait_for_selector抛出
+        mock_page.wait_for_selector.side_effect = seq(user_menu_result)
 
         # 调用被测试的函数
         result = await check_login_status(mock_page)
 
         # 验证结果
-        assert result is False
+        assert result is expected
         mock_page.goto.assert_called_once_with(
-            "https://access.redhat.com/management", wait_until="networkidle", timeout=30000
+            "https://access.redhat.com/management", wait_until="domcontentloaded", timeout=30000
         )
 
 
 class TestAuthExtended:
     """认证模块扩展测试"""
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_cookie_popup_error(self):
         """测试登录 - Cookie弹窗处理错误"""
         mock_page = AsyncMock()
         mock_context = AsyncMock()
 
-        # 模拟handle_cookie_popup函数返回False
-        with patch("woodgate.core.utils.handle_cookie_popup", return_value=False):
-            # 模拟登录过程中的异常
-            mock_page.goto.side_effect = Exception("Connection error")
+        # 模拟登录过程中的异常
+        mock_page.goto.side_effect = Exception("Connection error")
 
-            with patch("woodgate.core.auth.log_step"):
-                result = await login_to_redhat_portal(
-                    mock_page, mock_context, "test_user", "test_pass"
-                )
+        result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
 
-                assert result is False
+        assert result is False
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_navigation_failure(self):
         """测试登录后导航失败的情况"""
         # 创建模拟页面和上下文
@@ -162,11 +189,8 @@ class TestAuthExtended:
         mock_context = AsyncMock()
 
         # 设置模拟行为 - JavaScript登录成功但导航失败
-        mock_page.goto = AsyncMock()
         # 设置evaluate返回值序列
-        mock_page.evaluate = AsyncMock(
-            side_effect=[True, {"success": True}]  # 页面准备好的检查  # JavaScript登录成功
-        )
+        mock_page.evaluate = AsyncMock(side_effect=seq(*EVAL_LOGIN_OK))
         mock_page.url = "https://sso.redhat.com/auth/login"  # 仍在登录页面
 
         # 模拟查询选择器
@@ -176,10 +200,9 @@ class TestAuthExtended:
         mock_page.reload = AsyncMock()
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(
-                mock_page, mock_context, "test_user", "test_pass", max_retries=1
-            )
+        result = await login_to_redhat_portal(
+            mock_page, mock_context, "test_user", "test_pass", max_retries=1
+        )
 
         # 验证结果
         assert result is False
@@ -188,7 +211,6 @@ class TestAuthExtended:
         mock_page.goto.assert_called_once()
         assert mock_page.evaluate.call_count >= 1
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_wait_load_exception(self):
         """测试登录过程中等待页面加载异常的情况"""
         # 创建模拟页面和上下文
@@ -196,10 +218,7 @@ class TestAuthExtended:
         mock_context = AsyncMock()
 
         # 设置模拟行为
-        mock_page.goto = AsyncMock()
-        mock_page.evaluate = AsyncMock(
-            side_effect=[True, {"success": True}]  # 页面准备好的检查  # JavaScript登录成功
-        )
+        mock_page.evaluate = AsyncMock(side_effect=seq(*EVAL_LOGIN_OK))
 
         # 设置wait_for_load_state抛出异常
         mock_page.wait_for_load_state = AsyncMock(side_effect=Exception("加载超时"))
@@ -212,8 +231,7 @@ class TestAuthExtended:
         mock_page.query_selector = AsyncMock(return_value=mock_user_menu)
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
+        result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
 
         # 验证结果 - 应该成功，因为已经离开登录页面
         assert result is True
@@ -227,7 +245,6 @@ class TestAuthExtended:
 class TestAuthUnit:
     """认证模块单元测试"""
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_retry_logic(self):
         """测试登录重试逻辑"""
         # 创建模拟页面和上下文
@@ -235,7 +252,6 @@ class TestAuthUnit:
         mock_context = AsyncMock()
 
         # 设置模拟行为
-        mock_page.goto = AsyncMock()
         mock_page.url = "https://access.redhat.com/login"
 
         # 设置evaluate返回值
@@ -246,14 +262,13 @@ class TestAuthUnit:
         mock_page.screenshot = AsyncMock()
         mock_page.reload = AsyncMock()
         mock_page.query_selector_all = AsyncMock(return_value=[])
+        sleeper = AsyncMock()
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            with patch("woodgate.core.auth.asyncio.sleep"):  # 忽略sleep
-                with patch("woodgate.core.auth.logger"):  # 忽略日志
-                    await login_to_redhat_portal(
-                        mock_page, mock_context, "test_user", "test_pass", max_retries=2
-                    )
+        with patch.object(auth_module, "logger"):  # 忽略日志
+            await login_to_redhat_portal(
+                mock_page, mock_context, "test_user", "test_pass", max_retries=2, sleeper=sleeper
+            )
 
         # 验证结果 - 我们不关心最终结果，只关心重试逻辑
         # assert result is False  # 预期登录失败
@@ -262,21 +277,19 @@ class TestAuthUnit:
         assert mock_page.goto.call_count == 1  # 只调用一次goto
         assert mock_page.evaluate.call_count >= 1  # 至少调用一次evaluate
         assert mock_page.reload.call_count == 1  # 调用一次reload进行重试
+        # 重试前通过传入的sleeper等待配置的重试间隔
+        sleeper.assert_awaited_once_with(get_config()["retry_delay"])
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_invalid_credentials(self):
         """测试无效凭据的情况"""
         mock_page = AsyncMock()
         mock_context = AsyncMock()
 
         # 设置页面状态
-        mock_page.goto = AsyncMock()
         mock_page.url = "https://access.redhat.com/login"
 
         # 设置evaluate返回
-        mock_page.evaluate = AsyncMock(
-            side_effect=[True, {"success": False}]  # 页面准备好的检查  # JavaScript登录失败
-        )
+        mock_page.evaluate = AsyncMock(side_effect=seq(*EVAL_LOGIN_FAILED))
 
         # 设置错误消息
         mock_error = AsyncMock()
@@ -287,50 +300,44 @@ class TestAuthUnit:
         mock_page.wait_for_load_state = AsyncMock()
         mock_page.screenshot = AsyncMock()
 
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(
-                mock_page, mock_context, "test_user", "wrong_pass", max_retries=1
-            )
+        result = await login_to_redhat_portal(
+            mock_page, mock_context, "test_user", "wrong_pass", max_retries=1
+        )
 
         assert result is False
         assert mock_page.reload.call_count == 0  # 不应该重试
 
-    @pytest.mark.asyncio
-    async def test_login_to_redhat_portal_element_not_found(self):
-        """测试页面元素找不到的情况"""
+    @pytest.mark.parametrize(
+        "error",
+        ["未找到用户名输入框", "未找到下一步按钮", "未找到密码输入框", "未找到登录按钮"],
+        ids=["username", "next_button", "password", "login_button"],
+    )
+    async def test_login_to_redhat_portal_element_not_found(self, error):
+        """测试登录表单中的某个元素找不到的情况"""
         mock_page = AsyncMock()
         mock_context = AsyncMock()
 
-        # 设置页面元素找不到
-        mock_page.evaluate = AsyncMock(
-            side_effect=[
-                True,  # 页面准备好的检查
-                {"success": False, "error": "未找到用户名输入框"},
-            ]
-        )
+        # 页面准备好，但JavaScript登录时找不到元素
+        mock_page.evaluate = AsyncMock(side_effect=seq(True, {"success": False, "error": error}))
 
         # 设置必要的模拟
-        mock_page.goto = AsyncMock()
         mock_page.url = "https://access.redhat.com/login"
         mock_page.wait_for_load_state = AsyncMock()
         mock_page.screenshot = AsyncMock()
         mock_page.query_selector_all = AsyncMock(return_value=[])
 
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(
-                mock_page, mock_context, "test_user", "test_pass", max_retries=1
-            )
+        result = await login_to_redhat_portal(
+            mock_page, mock_context, "test_user", "test_pass", max_retries=1
+        )
 
         assert result is False
         assert mock_page.screenshot.call_count == 1  # 应该截图用于调试
 
-    @pytest.mark.asyncio
     async def test_check_login_status_partial_load(self):
         """测试页面部分加载的情况"""
         mock_page = AsyncMock()
 
         # 设置页面部分加载的情况
-        mock_page.goto = AsyncMock()
         mock_page.wait_for_selector = AsyncMock(side_effect=TimeoutError("Timeout"))
         mock_page.url = "https://access.redhat.com/management"  # 非登录页面
 
@@ -338,37 +345,31 @@ class TestAuthUnit:
         login_button_mock = AsyncMock()
         mock_page.query_selector = AsyncMock(return_value=login_button_mock)
 
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await check_login_status(mock_page)
+        result = await check_login_status(mock_page)
 
         assert result is False
         mock_page.goto.assert_called_once()
         mock_page.query_selector.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_invalid_params(self):
         """测试无效参数的情况"""
         mock_page = AsyncMock()
         mock_context = AsyncMock()
 
         # 测试空用户名
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(mock_page, mock_context, "", "test_pass")
+        result = await login_to_redhat_portal(mock_page, mock_context, "", "test_pass")
         assert result is False
 
         # 测试空密码
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "")
+        result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "")
         assert result is False
 
         # 测试负数重试次数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(
-                mock_page, mock_context, "test_user", "test_pass", max_retries=-1
-            )
+        result = await login_to_redhat_portal(
+            mock_page, mock_context, "test_user", "test_pass", max_retries=-1
+        )
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_js_failure(self):
         """测试JavaScript登录失败的情况"""
         # 创建模拟页面和上下文
@@ -376,16 +377,10 @@ class TestAuthUnit:
         mock_context = AsyncMock()
 
         # 设置模拟行为 - JavaScript登录失败
-        mock_page.goto = AsyncMock()
         mock_page.url = "https://access.redhat.com/login"
 
         # 设置evaluate返回值序列，第一次是页面准备好的检查，第二次是JavaScript登录
-        mock_page.evaluate = AsyncMock(
-            side_effect=[
-                True,  # 页面准备好的检查
-                {"success": False, "error": "未找到用户名输入框"},  # JavaScript登录失败
-            ]
-        )
+        mock_page.evaluate = AsyncMock(side_effect=seq(*EVAL_LOGIN_MISSING_USERNAME))
 
         # 其他必要的模拟
         mock_page.screenshot = AsyncMock()
@@ -394,11 +389,9 @@ class TestAuthUnit:
         mock_page.query_selector_all = AsyncMock(return_value=[])
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            with patch("woodgate.core.auth.asyncio.sleep"):  # 忽略sleep
-                result = await login_to_redhat_portal(
-                    mock_page, mock_context, "test_user", "test_pass", max_retries=1
-                )
+        result = await login_to_redhat_portal(
+            mock_page, mock_context, "test_user", "test_pass", max_retries=1
+        )
 
         # 验证结果
         assert result is False
@@ -408,7 +401,6 @@ class TestAuthUnit:
         assert mock_page.evaluate.call_count >= 1
         mock_page.screenshot.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_screenshot_exception(self):
         """测试登录过程中截图异常的情况"""
         # 创建模拟页面和上下文
@@ -416,16 +408,10 @@ class TestAuthUnit:
         mock_context = AsyncMock()
 
         # 设置模拟行为 - JavaScript登录失败
-        mock_page.goto = AsyncMock()
         mock_page.url = "https://access.redhat.com/login"
 
         # 设置evaluate返回值序列
-        mock_page.evaluate = AsyncMock(
-            side_effect=[
-                True,  # 页面准备好的检查
-                {"success": False, "error": "未找到用户名输入框"},  # JavaScript登录失败
-            ]
-        )
+        mock_page.evaluate = AsyncMock(side_effect=seq(*EVAL_LOGIN_MISSING_USERNAME))
 
         # 设置screenshot抛出异常
         mock_page.screenshot = AsyncMock(side_effect=Exception("截图错误"))
@@ -434,11 +420,9 @@ class TestAuthUnit:
         mock_page.query_selector_all = AsyncMock(return_value=[])
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            with patch("woodgate.core.auth.asyncio.sleep"):  # 忽略sleep
-                result = await login_to_redhat_portal(
-                    mock_page, mock_context, "test_user", "test_pass", max_retries=1
-                )
+        result = await login_to_redhat_portal(
+            mock_page, mock_context, "test_user", "test_pass", max_retries=1
+        )
 
         # 验证结果
         assert result is False
@@ -448,7 +432,6 @@ class TestAuthUnit:
         assert mock_page.evaluate.call_count >= 1
         mock_page.screenshot.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_login_to_redhat_portal_exception(self):
         """测试登录过程中出现异常的情况"""
         # 创建模拟页面和上下文
@@ -459,8 +442,7 @@ class TestAuthUnit:
         mock_page.goto = AsyncMock(side_effect=Exception("网络错误"))
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
+        result = await login_to_redhat_portal(mock_page, mock_context, "test_user", "test_pass")
 
         # 验证结果
         assert result is False
@@ -468,20 +450,17 @@ class TestAuthUnit:
         # 验证调用
         mock_page.goto.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_check_login_status_not_logged_in_redirect(self):
         """测试未登录状态的检查 - 重定向到登录页面"""
         # 创建模拟页面
         mock_page = AsyncMock()
 
         # 设置模拟行为 - 未登录，重定向到登录页面
-        mock_page.goto = AsyncMock()
         mock_page.wait_for_selector = AsyncMock(side_effect=Exception("选择器超时"))
         mock_page.url = "https://sso.redhat.com/auth/login"
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await check_login_status(mock_page)
+        result = await check_login_status(mock_page)
 
         # 验证结果
         assert result is False
@@ -490,7 +469,6 @@ class TestAuthUnit:
         mock_page.goto.assert_called_once()
         mock_page.wait_for_selector.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_check_login_status_exception_handling(self):
         """测试登录状态检查中的异常处理"""
         # 创建模拟页面
@@ -500,8 +478,7 @@ class TestAuthUnit:
         mock_page.goto = AsyncMock(side_effect=Exception("网络错误"))
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await check_login_status(mock_page)
+        result = await check_login_status(mock_page)
 
         # 验证结果
         assert result is False
@@ -509,14 +486,12 @@ class TestAuthUnit:
         # 验证调用
         mock_page.goto.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_check_login_status_login_text_found(self):
         """测试登录状态检查 - 找到登录文本"""
         # 创建模拟页面
         mock_page = AsyncMock()
 
         # 设置模拟行为
-        mock_page.goto = AsyncMock()
         mock_page.wait_for_selector = AsyncMock(side_effect=Exception("选择器超时"))
         mock_page.url = "https://access.redhat.com/management"  # 非登录页面
         mock_page.query_selector = AsyncMock(return_value=None)  # 没有找到登录按钮
@@ -527,8 +502,7 @@ class TestAuthUnit:
         mock_page.get_by_text = MagicMock(return_value=mock_login_text)
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await check_login_status(mock_page)
+        result = await check_login_status(mock_page)
 
         # 验证结果
         assert result is False
@@ -539,21 +513,18 @@ class TestAuthUnit:
         mock_page.get_by_text.assert_called_once_with("Log in", exact=False)
         mock_login_text.count.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_check_login_status_query_selector_exception(self):
         """测试登录状态检查 - query_selector抛出异常"""
         # 创建模拟页面
         mock_page = AsyncMock()
 
         # 设置模拟行为
-        mock_page.goto = AsyncMock()
         mock_page.wait_for_selector = AsyncMock(side_effect=Exception("选择器超时"))
         mock_page.url = "https://access.redhat.com/management"  # 非登录页面
         mock_page.query_selector = AsyncMock(side_effect=Exception("选择器错误"))
 
         # 调用被测试函数
-        with patch("woodgate.core.auth.log_step"):  # 忽略日志步骤
-            result = await check_login_status(mock_page)
+        result = await check_login_status(mock_page)
 
         # 验证结果
         assert result is False
@@ -0,0 +1,72 @@
+"""
+依赖安装模块测试
+"""
+
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from woodgate.bootstrap import ensure_dependencies, install_browser, install_package
+
+
+@pytest.fixture(autouse=True)
+def browser_marker(tmp_path):
+    """将浏览器安装标记文件指向临时目录"""
+    marker = tmp_path / "woodgate" / ".browser_installed"
+    with patch("woodgate.bootstrap.BROWSER_MARKER", str(marker)):
+        yield marker
+
+
+class TestBootstrap:
+    """依赖安装模块测试"""
+
+    def test_ensure_dependencies_all_present(self, browser_marker):
+        """测试依赖和浏览器都已安装时不执行安装"""
+        browser_marker.parent.mkdir(parents=True)
+        browser_marker.touch()
+        with patch("woodgate.bootstrap.importlib.util.find_spec", return_value=object()):
+            with patch("woodgate.bootstrap.subprocess.check_call") as mock_call:
+                assert ensure_dependencies() is True
+                mock_call.assert_not_called()
+
+    def test_ensure_dependencies_installs_missing(self, browser_marker):
+        """测试安装缺失的依赖和浏览器"""
+
+        def find_spec(name):
+            return None if name == "playwright" else object()
+
+        with patch("woodgate.bootstrap.importlib.util.find_spec", side_effect=find_spec):
+            with patch("woodgate.bootstrap.subprocess.check_call") as mock_call:
+                assert ensure_dependencies() is True
+
+        commands = [call.args[0] for call in mock_call.call_args_list]
+        assert [sys.executable, "-m", "pip", "install", "--quiet", "playwright"] in commands
+        assert [sys.executable, "-m", "playwright", "install", "chromium"] in commands
+        assert browser_marker.exists()
+
+    def test_ensure_dependencies_failure(self):
+        """测试安装失败时返回False"""
+        with patch("woodgate.bootstrap.importlib.util.find_spec", return_value=None):
+            with patch("woodgate.bootstrap.subprocess.check_call", side_effect=OSError("安装失败")):
+                assert ensure_dependencies() is False
+
+    def test_install_package_falls_back_to_uv(self):
+        """测试pip不可用时回退到uv"""
+        with patch(
+            "woodgate.bootstrap.subprocess.check_call",
+            side_effect=[subprocess.CalledProcessError(1, "pip"), None],
+        ) as mock_call:
+            install_package("httpx")
+
+        assert mock_call.call_args_list[1].args[0] == ["uv", "pip", "install", "--quiet", "httpx"]
+
+    def test_install_browser_only_once(self, browser_marker):
+        """测试浏览器只下载一次"""
+        with patch("woodgate.bootstrap.subprocess.check_call") as mock_call:
+            install_browser()
+            install_browser()
+
+        assert mock_call.call_count == 1
+        assert browser_marker.exists()
@@ -2,12 +2,67 @@
 浏览器模块测试 - 包含基本测试、扩展测试和单元测试
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import inspect
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, AsyncMock, MagicMock, patch
 
 import pytest
 from playwright.async_api import Browser, BrowserContext, Page, Playwright
 
-from woodgate.core.browser import close_browser, initialize_browser, setup_cookie_banner_handlers
+from woodgate.core.browser import (
+    BrowserPool,
+    _block_resources,
+    close_browser,
+    initialize_browser,
+    is_blocked_request,
+    setup_cookie_banner_handlers,
+)
+
+
+@pytest.fixture(scope="module")
+def shared_playwright_mocks() -> SimpleNamespace:
+    """每个测试模块只创建一次模拟的Playwright组件，并按启动顺序连接好"""
+    mocks = SimpleNamespace(
+        async_playwright=AsyncMock(),
+        playwright=AsyncMock(),
+        browser=AsyncMock(),
+        context=AsyncMock(),
+        page=AsyncMock(),
+    )
+    mocks.async_playwright.start.return_value = mocks.playwright
+    mocks.playwright.chromium.launch.return_value = mocks.browser
+    mocks.browser.new_context.return_value = mocks.context
+    mocks.context.new_page.return_value = mocks.page
+
+    # 设置特定方法为同步方法，避免协程警告
+    mocks.browser.is_connected = MagicMock(return_value=True)
+    mocks.page.set_default_timeout = MagicMock()
+    mocks.page.set_default_navigation_timeout = MagicMock()
+    return mocks
+
+
+@pytest.fixture
+def playwright_mocks(shared_playwright_mocks: SimpleNamespace) -> SimpleNamespace:
+    """清除上一个测试的调用记录和side_effect，保留组件之间的连接"""
+    for mock in vars(shared_playwright_mocks).values():
+        mock.reset_mock(side_effect=True)
+    return shared_playwright_mocks
+
+
+async def capture_cookie_banner_handler(page: AsyncMock):
+    """调用setup_cookie_banner_handlers并返回注册的第一个cookie横幅处理函数"""
+    handlers = []
+    page.locator = MagicMock()
+    page.add_locator_handler = AsyncMock(
+        side_effect=lambda locator, handler: handlers.append(handler)
+    )
+    page.on = MagicMock()
+
+    await setup_cookie_banner_handlers(page)
+
+    assert handlers
+    return handlers[0]
 
 
 class TestBrowserBasic:
@@ -24,9 +79,8 @@ class TestBrowserBasic:
         assert str(return_type).startswith("tuple[")
 
         # 验证函数是异步函数
-        assert initialize_browser.__code__.co_flags & 0x80  # 检查是否有CO_COROUTINE标志
+        assert inspect.iscoroutinefunction(initialize_browser)
 
-    @pytest.mark.asyncio
     async def test_close_browser_basic(self):
         """测试浏览器关闭函数"""
         # 模拟Playwright组件
@@ -48,112 +102,52 @@ class TestBrowserBasic:
 class TestBrowserUnit:
     """浏览器模块单元测试"""
 
-    @pytest.mark.asyncio
-    async def test_initialize_browser_basic(self):
-        """测试浏览器初始化基本功能"""
-        # 模拟Playwright组件
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
-        mock_context = AsyncMock()
-        mock_page = AsyncMock()
-
-        # 设置特定方法为同步方法，避免协程警告
-        mock_page.set_default_timeout = MagicMock()
-        mock_page.set_default_navigation_timeout = MagicMock()
-        mock_page.route = AsyncMock()
-        mock_page.route.return_value = None
-
-        # 设置模拟行为
-        mock_playwright.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-
-        # 模拟async_playwright函数
-        mock_async_playwright = AsyncMock()
-        mock_async_playwright.start.return_value = mock_playwright
-
-        with patch("woodgate.core.browser.async_playwright", return_value=mock_async_playwright):
-            with patch("woodgate.core.browser.setup_cookie_banner_handlers", new=AsyncMock()):
-                # 调用被测试函数
-                result = await initialize_browser()
-
-                # 验证结果
-                assert result[0] is mock_playwright  # playwright
-                assert result[1] is mock_browser  # browser
-                assert result[2] is mock_context  # context
-                assert result[3] is mock_page  # page
-
-                # 验证调用
-                mock_playwright.chromium.launch.assert_called_once()
-                mock_browser.new_context.assert_called_once()
-                mock_context.new_page.assert_called_once()
-                mock_page.set_default_timeout.assert_called_once_with(20000)
-                mock_page.set_default_navigation_timeout.assert_called_once_with(30000)
-
-    @pytest.mark.asyncio
-    async def test_initialize_browser_with_options(self):
-        """测试浏览器初始化时的选项设置"""
-        # 模拟Playwright组件
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
-        mock_context = AsyncMock()
-        mock_page = AsyncMock()
-
-        # 设置特定方法为同步方法，避免协程警告
-        mock_page.set_default_timeout = MagicMock()
-        mock_page.set_default_navigation_timeout = MagicMock()
-        mock_page.route = AsyncMock()
-        mock_page.route.return_value = None
-
-        # 设置模拟行为
-        mock_playwright.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-
-        # 模拟async_playwright函数
-        mock_async_playwright = AsyncMock()
-        mock_async_playwright.start.return_value = mock_playwright
-
-        with patch("woodgate.core.browser.async_playwright", return_value=mock_async_playwright):
-            with patch("woodgate.core.browser.setup_cookie_banner_handlers", new=AsyncMock()):
-                # 调用被测试函数
-                await initialize_browser()
-
-                # 验证浏览器启动选项
-                launch_args = mock_playwright.chromium.launch.call_args[1]
-                assert "headless" in launch_args
-                assert "args" in launch_args
-                assert "--no-sandbox" in launch_args["args"]
-
-                # 验证浏览器上下文选项
-                context_args = mock_browser.new_context.call_args[1]
-                assert "viewport" in context_args
-                assert "user_agent" in context_args
-                assert "ignore_https_errors" in context_args
-
-                # 验证页面设置
-                mock_page.set_default_timeout.assert_called_once_with(20000)
-                mock_page.set_default_navigation_timeout.assert_called_once_with(30000)
-
-    @pytest.mark.asyncio
-    async def test_close_browser_partial(self):
+    async def test_initialize_browser(self, playwright_mocks):
+        """测试浏览器初始化的返回值和浏览器、上下文、页面选项"""
+        mocks = playwright_mocks
+
+        with patch.multiple(
+            "woodgate.core.browser",
+            async_playwright=MagicMock(return_value=mocks.async_playwright),
+            setup_cookie_banner_handlers=AsyncMock(),
+        ):
+            # 调用被测试函数
+            result = await initialize_browser()
+
+        # 验证结果
+        assert result == (mocks.playwright, mocks.browser, mocks.context, mocks.page)
+
+        # 验证浏览器启动选项
+        mocks.playwright.chromium.launch.assert_called_once()
+        launch_args = mocks.playwright.chromium.launch.call_args[1]
+        assert "headless" in launch_args
+        assert "--no-sandbox" in launch_args["args"]
+
+        # 验证浏览器上下文选项
+        mocks.browser.new_context.assert_called_once()
+        context_args = mocks.browser.new_context.call_args[1]
+        assert "viewport" in context_args
+        assert "user_agent" in context_args
+        assert "ignore_https_errors" in context_args
+
+        # 验证页面设置
+        mocks.context.new_page.assert_called_once()
+        mocks.context.route.assert_called_once_with("**/*", _block_resources)
+        mocks.page.set_default_timeout.assert_called_once_with(20000)
+        mocks.page.set_default_navigation_timeout.assert_called_once_with(30000)
+
+    async def test_close_browser_partial(self, playwright_mocks):
         """测试部分浏览器资源关闭"""
-        # 创建模拟对象
-        mock_browser = AsyncMock()
-        mock_page = AsyncMock()
-
         # 调用被测试函数，只提供部分参数
-        await close_browser(browser=mock_browser, page=mock_page)
+        await close_browser(browser=playwright_mocks.browser, page=playwright_mocks.page)
 
         # 验证调用
-        mock_page.close.assert_called_once()
-        mock_browser.close.assert_called_once()
+        playwright_mocks.page.close.assert_called_once()
+        playwright_mocks.browser.close.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_close_browser_error_handling(self):
+    async def test_close_browser_error_handling(self, playwright_mocks):
         """测试浏览器关闭时的错误处理"""
-        # 创建模拟对象
-        mock_page = AsyncMock()
+        mock_page = playwright_mocks.page
         mock_page.close.side_effect = Exception("模拟关闭错误")
 
         # 调用被测试函数
@@ -162,7 +156,6 @@ class TestBrowserUnit:
         # 验证调用 - 即使出错也应该继续执行
         mock_page.close.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_setup_cookie_banner_handlers(self):
         """测试设置Cookie横幅处理程序"""
         # 创建模拟页面和上下文
@@ -190,45 +183,23 @@ class TestBrowserUnit:
         # 验证添加了cookie处理程序
         mock_page.on.assert_called_with("load", mock_page.on.call_args[0][1])
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_banner_function(self):
-        """测试cookie横幅处理函数的行为"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-        mock_page.evaluate = AsyncMock()
-
-        # 设置特定方法为同步方法，避免协程警告
-        mock_page.locator = MagicMock()
-        mock_banner_locator = MagicMock()
-        mock_page.locator.return_value = mock_banner_locator
-        mock_page.add_locator_handler = MagicMock()
+        """测试cookie横幅处理函数点击可见的接受按钮"""
+        handle_cookie_banner = await capture_cookie_banner_handler(AsyncMock())
 
-        # 创建模拟横幅
+        # 创建模拟横幅和可见的按钮
+        mock_button = AsyncMock()
+        mock_button.is_visible.return_value = True
         mock_banner = AsyncMock()
-        mock_banner.is_visible = AsyncMock(return_value=True)
+        mock_banner.is_visible.return_value = True
+        mock_banner.locator = MagicMock(return_value=mock_button)
+
+        await handle_cookie_banner(mock_banner)
+
+        # 第一个接受按钮可见，点击后直接返回
+        mock_banner.locator.assert_called_once()
+        mock_button.click.assert_awaited_once()
 
-        # 创建模拟按钮
-        mock_button = AsyncMock()
-        mock_button.is_visible = AsyncMock(return_value=True)
-        mock_button.click = AsyncMock()
-
-        # 设置模拟行为 - 使用MagicMock而不是AsyncMock
-        mock_banner.locator = MagicMock()
-        mock_banner.locator.return_value = mock_button
-        mock_banner.get_by_text = MagicMock()
-        mock_banner.get_by_text.return_value = mock_button
-        mock_banner.element_handle = AsyncMock()
-
-        # 直接测试点击行为
-        if await mock_banner.is_visible():
-            button = mock_banner.locator("selector")
-            if await button.is_visible():
-                await button.click()
-
-        # 验证点击行为
-        mock_button.click.assert_called_once()
-
-    @pytest.mark.asyncio
     async def test_handle_all_cookie_banners(self):
         """测试通用cookie横幅处理函数"""
         # 创建模拟页面
@@ -272,7 +243,6 @@ class TestBrowserUnit:
         assert mock_page.get_by_text.call_count > 0
         mock_button.first.click.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_preset_cookies(self):
         """测试预设cookie功能"""
         # 创建模拟页面和上下文
@@ -301,48 +271,27 @@ class TestBrowserUnit:
         assert len(cookies) >= 1
         assert any(cookie["name"] == "redhat_cookie_notice_accepted" for cookie in cookies)
 
-    @pytest.mark.asyncio
-    async def test_initialize_browser_exception(self):
+    async def test_initialize_browser_exception(self, playwright_mocks):
         """测试浏览器初始化异常处理"""
-        # 模拟async_playwright函数抛出异常
-        mock_async_playwright = AsyncMock()
-        mock_async_playwright.start.side_effect = Exception("模拟启动错误")
-
-        with patch("woodgate.core.browser.async_playwright", return_value=mock_async_playwright):
-            with patch("woodgate.core.browser.logger"):  # 忽略日志
-                # 调用被测试函数，应该抛出异常
-                with pytest.raises(Exception):
-                    await initialize_browser()
+        # 模拟async_playwright启动时抛出异常
+        playwright_mocks.async_playwright.start.side_effect = Exception("模拟启动错误")
+
+        with patch.multiple(
+            "woodgate.core.browser",
+            async_playwright=MagicMock(return_value=playwright_mocks.async_playwright),
+            logger=DEFAULT,
+        ):
+            # 调用被测试函数，应该抛出异常
+            with pytest.raises(Exception):
+                await initialize_browser()
 
-                # 验证调用
-                mock_async_playwright.start.assert_called_once()
+            # 验证调用
+            playwright_mocks.async_playwright.start.assert_called_once()
+            playwright_mocks.playwright.chromium.launch.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_banner_no_visible_banner(self):
         """测试cookie横幅处理函数 - 横幅不可见的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 设置特定方法为同步方法，避免协程警告
-        mock_page.locator = MagicMock()
-        mock_banner_locator = MagicMock()
-        mock_page.locator.return_value = mock_banner_locator
-        mock_page.add_locator_handler = MagicMock()
-
-        # 捕获处理函数
-        handle_cookie_banner = None
-
-        def capture_handler(locator, handler):
-            nonlocal handle_cookie_banner
-            handle_cookie_banner = handler
-
-        mock_page.add_locator_handler.side_effect = capture_handler
-
-        # 调用setup_cookie_banner_handlers
-        await setup_cookie_banner_handlers(mock_page)
-
-        # 确保捕获了处理函数
-        assert handle_cookie_banner is not None
+        handle_cookie_banner = await capture_cookie_banner_handler(AsyncMock())
 
         # 创建模拟横幅 - 设置为不可见
         mock_banner = AsyncMock()
@@ -358,65 +307,47 @@ class TestBrowserUnit:
         # 验证没有尝试点击按钮
         mock_button.click.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_banner_button_not_visible(self):
         """测试cookie横幅处理函数 - 按钮不可见的情况"""
-        # 创建模拟页面
         mock_page = AsyncMock()
-        mock_page.evaluate = AsyncMock()
+        handle_cookie_banner = await capture_cookie_banner_handler(mock_page)
 
-        # 创建模拟横幅 - 设置为可见
+        # 创建模拟横幅 - 设置为可见，按钮都不可见
+        mock_button = AsyncMock()
+        mock_button.is_visible.return_value = False
         mock_banner = AsyncMock()
-        mock_banner.is_visible = AsyncMock(return_value=True)
+        mock_banner.is_visible.return_value = True
+        mock_banner.locator = MagicMock(return_value=mock_button)
+        mock_banner.get_by_text = MagicMock(return_value=mock_button)
 
-        # 创建模拟按钮 - 设置为不可见
-        mock_button = AsyncMock()
-        mock_button.is_visible = AsyncMock(return_value=False)
-        mock_button.click = AsyncMock()
-
-        # 设置模拟行为 - 使用MagicMock而不是AsyncMock
-        mock_banner.locator = MagicMock()
-        mock_banner.locator.return_value = mock_button
-        mock_banner.get_by_text = MagicMock()
-        mock_banner.get_by_text.return_value = mock_button
-        mock_banner.element_handle = AsyncMock()
-
-        # 直接测试点击行为
-        if await mock_banner.is_visible():
-            button = mock_banner.locator("selector")
-            if await button.is_visible():
-                await button.click()
+        await handle_cookie_banner(mock_banner)
 
-        # 验证调用
+        # 选择器和文本都找不到可见按钮，最后退回到JavaScript点击
         assert mock_banner.locator.call_count > 0
-        assert mock_button.is_visible.call_count > 0
-        # 但最终没有点击按钮
+        assert mock_banner.get_by_text.call_count > 0
         mock_button.click.assert_not_called()
+        mock_page.evaluate.assert_awaited_once()
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_banner_exception(self):
-        """测试cookie横幅处理函数 - 异常处理"""
+        """测试cookie横幅处理函数 - 检查横幅时出现异常"""
+        mock_page = AsyncMock()
+        handle_cookie_banner = await capture_cookie_banner_handler(mock_page)
+
         # 创建模拟横幅 - 设置为抛出异常
+        mock_button = AsyncMock()
         mock_banner = AsyncMock()
-        mock_banner.is_visible = AsyncMock(side_effect=Exception("模拟异常"))
-
-        # 创建处理函数，包含异常处理
-        async def handle_cookie_banner(banner):
-            try:
-                if await banner.is_visible():
-                    # 这部分代码不会执行，因为is_visible会抛出异常
-                    pass
-            except Exception:
-                # 捕获异常，不做任何处理
-                pass
+        mock_banner.is_visible.side_effect = Exception("模拟异常")
+        mock_banner.locator = MagicMock(return_value=mock_button)
+        mock_banner.get_by_text = MagicMock(return_value=mock_button)
 
-        # 调用处理函数 - 应该不会抛出异常
+        # 调用处理函数 - 异常被捕获，不会传给触发处理程序的页面操作
         await handle_cookie_banner(mock_banner)
 
-        # 验证调用了is_visible
-        mock_banner.is_visible.assert_called_once()
+        mock_banner.is_visible.assert_awaited_once()
+        mock_banner.locator.assert_not_called()
+        mock_button.click.assert_not_called()
+        mock_page.evaluate.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_handle_all_cookie_banners_no_buttons(self):
         """测试通用cookie横幅处理函数 - 没有按钮的情况"""
         # 创建模拟页面
@@ -457,7 +388,6 @@ class TestBrowserUnit:
         # 验证没有点击按钮
         mock_button.first.click.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_handle_all_cookie_banners_exception(self):
         """测试通用cookie横幅处理函数 - 异常处理"""
         # 创建模拟页面
@@ -491,7 +421,6 @@ class TestBrowserUnit:
         # 验证JavaScript评估被调用
         mock_page.evaluate.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_preset_cookies_exception(self):
         """测试预设cookie功能 - 异常处理"""
         # 创建模拟页面和上下文
@@ -518,3 +447,181 @@ class TestBrowserUnit:
 
         # 验证add_cookies被调用
         mock_context.add_cookies.assert_called_once()
+
+
+class TestBlockResources:
+    """资源拦截测试"""
+
+    @staticmethod
+    def _mock_route(resource_type, url):
+        """创建模拟的路由"""
+        mock_route = AsyncMock()
+        mock_route.request = MagicMock()
+        mock_route.request.resource_type = resource_type
+        mock_route.request.url = url
+        return mock_route
+
+    async def test_block_resource_types(self):
+        """测试拦截图片、字体、样式等资源"""
+        for resource_type in ("image", "media", "font", "stylesheet", "websocket"):
+            mock_route = self._mock_route(resource_type, "https://access.redhat.com/x")
+            await _block_resources(mock_route)
+            mock_route.abort.assert_called_once()
+            mock_route.continue_.assert_not_called()
+
+    async def test_block_tracker_hosts(self):
+        """测试拦截统计域名"""
+        mock_route = self._mock_route("script", "https://www.google-analytics.com/analytics.js")
+        await _block_resources(mock_route)
+        mock_route.abort.assert_called_once()
+
+    async def test_block_tracker_host_exact(self):
+        """测试拦截与统计域名完全相同的主机"""
+        mock_route = self._mock_route("script", "https://hotjar.com/tag.js")
+        await _block_resources(mock_route)
+        mock_route.abort.assert_called_once()
+
+    async def test_continue_lookalike_host(self):
+        """测试放行只是以统计域名结尾的其他域名"""
+        mock_route = self._mock_route("script", "https://notdoubleclick.net/app.js")
+        await _block_resources(mock_route)
+        mock_route.continue_.assert_called_once()
+        mock_route.abort.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "resource_type, url, expected",
+        [
+            ("manifest", "https://access.redhat.com/manifest.json", True),
+            ("script", "https://stats.g.doubleclick.net/x.js", True),
+            ("script", "https://notdoubleclick.net/x.js", False),
+            ("document", "https://access.redhat.com/search/", False),
+        ],
+        ids=["resource_type", "subdomain", "lookalike", "document"],
+    )
+    def test_is_blocked_request(self, resource_type, url, expected):
+        """测试同步和异步路由处理函数共用的拦截规则"""
+        assert is_blocked_request(resource_type, url) is expected
+
+    async def test_continue_document(self):
+        """测试放行页面和脚本请求"""
+        for resource_type in ("document", "script", "xhr", "fetch"):
+            mock_route = self._mock_route(resource_type, "https://access.redhat.com/search/")
+            await _block_resources(mock_route)
+            mock_route.continue_.assert_called_once()
+            mock_route.abort.assert_not_called()
+
+
+class TestBrowserPool:
+    """浏览器池测试"""
+
+    @pytest.fixture
+    def pool_mocks(self, playwright_mocks, monkeypatch):
+        """让浏览器池使用模拟的Playwright组件，并跳过页面配置"""
+        monkeypatch.setattr(
+            "woodgate.core.browser.async_playwright",
+            MagicMock(return_value=playwright_mocks.async_playwright),
+        )
+        monkeypatch.setattr("woodgate.core.browser._configure_page", AsyncMock())
+        return playwright_mocks
+
+    async def test_acquire_page_reuses_browser(self, pool_mocks):
+        """测试多次获取页面只启动一次浏览器"""
+        mock_playwright = pool_mocks.playwright
+        mock_browser = pool_mocks.browser
+        pool = BrowserPool()
+
+        await pool.acquire_page()
+        await pool.acquire_page()
+
+        pool_mocks.async_playwright.start.assert_called_once()
+        mock_playwright.chromium.launch.assert_called_once()
+        assert mock_browser.new_context.call_count == 2
+
+    async def test_release_keeps_browser(self, pool_mocks):
+        """测试释放页面时只关闭页面和上下文"""
+        mock_playwright = pool_mocks.playwright
+        mock_browser = pool_mocks.browser
+        pool = BrowserPool()
+
+        context, page = await pool.acquire_page()
+        await pool.release(context, page)
+
+        page.close.assert_called_once()
+        context.close.assert_called_once()
+        mock_browser.close.assert_not_called()
+        mock_playwright.stop.assert_not_called()
+
+    async def test_acquire_page_limits_concurrent_contexts(self, pool_mocks):
+        """测试同时打开的上下文数量受限，释放后等待的调用继续执行"""
+        mock_browser = pool_mocks.browser
+        pool = BrowserPool(max_contexts=1)
+
+        context, page = await pool.acquire_page()
+
+        waiting = asyncio.create_task(pool.acquire_page())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        assert mock_browser.new_context.call_count == 1
+
+        await pool.release(context, page)
+        await asyncio.wait_for(waiting, timeout=1)
+        assert mock_browser.new_context.call_count == 2
+
+    async def test_shutdown(self, pool_mocks):
+        """测试关闭浏览器池"""
+        mock_playwright = pool_mocks.playwright
+        mock_browser = pool_mocks.browser
+        pool = BrowserPool()
+
+        await pool.acquire_page()
+        await pool.shutdown()
+
+        mock_browser.close.assert_called_once()
+        mock_playwright.stop.assert_called_once()
+
+    async def test_acquire_page_restores_session(self, pool_mocks, tmp_path):
+        """测试存在会话文件时新建上下文会恢复会话"""
+        state_path = tmp_path / "state.json"
+        state_path.write_text('{"cookies": [], "origins": []}')
+        mock_browser = pool_mocks.browser
+        pool = BrowserPool(storage_state_path=str(state_path))
+
+        await pool.acquire_page()
+
+        context_args = mock_browser.new_context.call_args[1]
+        assert context_args["storage_state"] == str(state_path)
+
+    async def test_save_session(self, tmp_path):
+        """测试保存登录会话"""
+        state_path = tmp_path / "state.json"
+        pool = BrowserPool(storage_state_path=str(state_path))
+        assert not pool.has_session()
+
+        mock_context = AsyncMock()
+        mock_context.storage_state.return_value = {"cookies": [{"name": "rh_sso"}], "origins": []}
+        await pool.save_session(mock_context)
+
+        assert pool.has_session()
+        assert "rh_sso" in state_path.read_text()
+
+    async def test_save_session_creates_private_directory(self, tmp_path):
+        """测试保存会话时创建仅当前用户可访问的目录和文件"""
+        state_path = tmp_path / "woodgate" / "state.json"
+        pool = BrowserPool(storage_state_path=str(state_path))
+
+        mock_context = AsyncMock()
+        mock_context.storage_state.return_value = {"cookies": [], "origins": []}
+        await pool.save_session(mock_context)
+
+        assert state_path.parent.stat().st_mode & 0o777 == 0o700
+        assert state_path.stat().st_mode & 0o777 == 0o600
+        assert [p.name for p in state_path.parent.iterdir()] == ["state.json"]
+
+    def test_has_session_ignores_foreign_file(self, tmp_path):
+        """测试不信任其他用户创建的会话文件"""
+        state_path = tmp_path / "state.json"
+        state_path.write_text('{"cookies": [], "origins": []}')
+        pool = BrowserPool(storage_state_path=str(state_path))
+
+        with patch("woodgate.core.browser.os.getuid", return_value=state_path.stat().st_uid + 1):
+            assert not pool.has_session()
@@ -2,61 +2,163 @@
 配置模块测试
 """
 
-import os
-from unittest.mock import patch
+import logging
 
-from woodgate.config import get_available_products, get_config, get_credentials, get_document_types
+import pytest
+
+from woodgate.config import (
+    Credentials,
+    get_available_products,
+    get_config,
+    get_credentials,
+    get_document_types,
+    validate_credentials,
+)
+
+# 测试用的凭据环境变量
+CREDENTIALS_ENV = {"REDHAT_USERNAME": "test_user", "REDHAT_PASSWORD": "test_pass"}
+
+# get_config返回的配置项
+CONFIG_KEYS = frozenset(
+    {
+        "headless",
+        "browser_timeout",
+        "max_contexts",
+        "default_rows",
+        "default_sort",
+        "host",
+        "port",
+        "log_level",
+        "max_retries",
+        "retry_delay",
+        "storage_state",
+    }
+)
+
+
+# 配置模块读取的其他环境变量
+OTHER_ENV = (
+    "REDHAT_USERNAME_DEFAULT",
+    "REDHAT_PASSWORD_DEFAULT",
+    "WOODGATE_TEST_MODE",
+    "XDG_CACHE_HOME",
+)
+
+
+@pytest.fixture
+def fake_env(monkeypatch):
+    """清除配置模块读取的环境变量，返回设置环境变量的函数，结束时由monkeypatch恢复"""
+    names = [*CREDENTIALS_ENV, *OTHER_ENV, *(f"WOODGATE_{key.upper()}" for key in CONFIG_KEYS)]
+    for name in names:
+        monkeypatch.delenv(name, raising=False)
+
+    def set_env(**values):
+        for name, value in values.items():
+            monkeypatch.setenv(name, value)
+
+    return set_env
+
+
+@pytest.fixture(autouse=True)
+def clear_credentials_cache():
+    """每个测试前后清除凭据缓存"""
+    get_credentials.cache_clear()
+    yield
+    get_credentials.cache_clear()
 
 
 class TestConfig:
     """配置模块测试"""
 
-    def test_get_credentials_from_env(self):
+    def test_get_credentials_from_env(self, fake_env):
         """测试从环境变量获取凭据"""
-        with patch.dict(
-            os.environ, {"REDHAT_USERNAME": "test_user", "REDHAT_PASSWORD": "test_pass"}
-        ):
-            username, password = get_credentials()
-            assert username == "test_user"
-            assert password == "test_pass"
-
-    def test_get_credentials_default(self):
+        fake_env(**CREDENTIALS_ENV)
+        username, password = get_credentials()
+        assert username == "test_user"
+        assert password == "test_pass"
+
+    def test_get_credentials_default(self, fake_env):
         """测试获取默认凭据"""
-        with patch.dict(os.environ, {"WOODGATE_TEST_MODE": "true"}, clear=True):
-            username, password = get_credentials()
-            assert username == ""
-            assert password == ""
+        fake_env(WOODGATE_TEST_MODE="true")
+        username, password = get_credentials()
+        assert username == ""
+        assert password == ""
+
+    def test_get_credentials_cached(self, fake_env):
+        """测试凭据只加载一次，清除缓存后重新加载"""
+        fake_env(REDHAT_USERNAME="old_user", REDHAT_PASSWORD="old_pass")
+        assert get_credentials() == ("old_user", "old_pass")
+
+        fake_env(REDHAT_USERNAME="new_user")
+        assert get_credentials() == ("old_user", "old_pass")
+
+        get_credentials.cache_clear()
+        assert get_credentials() == ("new_user", "old_pass")
+
+    def test_get_credentials_named_fields(self, fake_env):
+        """测试凭据可以按字段名访问"""
+        fake_env(**CREDENTIALS_ENV)
+        credentials = get_credentials()
+        assert isinstance(credentials, Credentials)
+        assert credentials.username == "test_user"
+        assert credentials.password == "test_pass"
+
+    def test_validate_credentials(self, fake_env):
+        """测试校验凭据"""
+        fake_env(**CREDENTIALS_ENV)
+        validate_credentials()
+
+    def test_validate_credentials_missing(self, fake_env):
+        """测试凭据缺失时校验失败"""
+        with pytest.raises(ValueError):
+            validate_credentials()
 
     def test_get_config(self):
         """测试获取配置"""
-        config = get_config()
-        assert "headless" in config
-        assert "browser_timeout" in config
-        assert "default_rows" in config
-        assert "default_sort" in config
-        assert "host" in config
-        assert "port" in config
-        assert "log_level" in config
-        assert "max_retries" in config
-        assert "retry_delay" in config
-
-    def test_get_config_with_env(self):
+        assert get_config().keys() >= CONFIG_KEYS
+
+    @pytest.mark.parametrize(
+        "name, value, key, expected",
+        [
+            ("WOODGATE_HEADLESS", "false", "headless", False),
+            ("WOODGATE_STORAGE_STATE", "/tmp/state.json", "storage_state", "/tmp/state.json"),
+            ("WOODGATE_STORAGE_STATE", "", "storage_state", ""),
+        ],
+        ids=["headless", "storage_state", "storage_state_disabled"],
+    )
+    def test_get_config_with_env(self, fake_env, name, value, key, expected):
         """测试从环境变量获取配置"""
-        with patch.dict(os.environ, {"WOODGATE_HEADLESS": "false"}):
-            config = get_config()
-            assert config["headless"] is False
+        fake_env(**{name: value})
+        assert get_config()[key] == expected
+
+    @pytest.mark.parametrize("value", ["0", "-2"])
+    def test_get_config_clamps_max_contexts(self, fake_env, caplog, value):
+        """测试上下文数量上限小于1时使用1并记录警告"""
+        fake_env(WOODGATE_MAX_CONTEXTS=value)
+        with caplog.at_level(logging.WARNING, logger="woodgate.config"):
+            assert get_config()["max_contexts"] == 1
+        assert "WOODGATE_MAX_CONTEXTS" in caplog.text
+
+    def test_get_config_default_storage_state(self, fake_env, tmp_path):
+        """测试会话文件默认保存在当前用户的缓存目录"""
+        fake_env(XDG_CACHE_HOME=str(tmp_path))
+        assert get_config()["storage_state"] == str(tmp_path / "woodgate" / "state.json")
 
     def test_get_available_products(self):
         """测试获取可用产品列表"""
         products = get_available_products()
-        assert isinstance(products, list)
+        assert isinstance(products, tuple)
         assert len(products) > 0
         assert "Red Hat Enterprise Linux" in products
 
     def test_get_document_types(self):
         """测试获取文档类型列表"""
         doc_types = get_document_types()
-        assert isinstance(doc_types, list)
+        assert isinstance(doc_types, tuple)
         assert len(doc_types) > 0
         assert "Solution" in doc_types
         assert "Article" in doc_types
+
+    def test_get_available_products_cached(self):
+        """测试产品列表在多次调用之间复用同一个对象"""
+        assert get_available_products() is get_available_products()
@@ -2,48 +2,76 @@
 主模块测试
 """
 
-from unittest.mock import MagicMock, patch
+from types import ModuleType
+from unittest.mock import DEFAULT, AsyncMock, MagicMock, patch
 
-from woodgate.__main__ import main, parse_args
+import pytest
+
+
+@pytest.fixture(scope="module")
+def cli() -> ModuleType:
+    """返回woodgate.__main__模块，它会导入服务器模块，所以不在收集测试时导入"""
+    import woodgate.__main__
+
+    return woodgate.__main__
 
 
 class TestMain:
     """主模块测试"""
 
-    def test_parse_args_default(self):
+    def test_parse_args_default(self, cli):
         """测试解析默认参数"""
         with patch("sys.argv", ["woodgate"]):
-            args = parse_args()
+            args = cli.parse_args()
             # 在__main__.py中，默认值为None，实际值由config提供
             assert args.host is None
             assert args.port is None
             assert args.log_level is None
 
-    def test_parse_args_custom(self):
+    def test_parse_args_custom(self, cli):
         """测试解析自定义参数"""
         with patch(
             "sys.argv", ["woodgate", "--host", "0.0.0.0", "--port", "8080", "--log-level", "DEBUG"]
         ):
-            args = parse_args()
+            args = cli.parse_args()
             assert args.host == "0.0.0.0"
             assert args.port == 8080
             assert args.log_level == "DEBUG"
 
-    def test_main_function(self):
-        """测试主函数"""
-        mock_args = MagicMock()
-        mock_args.host = "127.0.0.1"
-        mock_args.port = 8000
-        mock_args.log_level = "INFO"
-
-        with patch("woodgate.__main__.parse_args", return_value=mock_args):
-            with patch("woodgate.__main__.setup_logging") as mock_setup_logging:
-                with patch("woodgate.__main__.mcp") as mock_mcp:
-                    with patch("woodgate.__main__.print") as mock_print:
-                        # 调用主函数
-                        main()
-
-                        # 验证调用
-                        mock_setup_logging.assert_called_once()
-                        mock_mcp.run.assert_called_once()
-                        assert mock_print.call_count >= 3
+    @pytest.mark.parametrize(
+        "side_effect, exit_code",
+        [(None, None), (KeyboardInterrupt(), None), (Exception("测试错误"), 1)],
+        ids=["success", "keyboard_interrupt", "exception"],
+    )
+    def test_main_function(self, cli, side_effect, exit_code):
+        """测试主函数正常运行、被中断和启动失败"""
+        mock_args = MagicMock(host="127.0.0.1", port=8000, log_level="INFO")
+        mock_mcp = MagicMock()
+        mock_mcp.run_sse_async = AsyncMock(side_effect=side_effect)
+        mock_pool = MagicMock()
+        mock_pool.shutdown = AsyncMock()
+
+        with patch.multiple(
+            "woodgate.__main__",
+            parse_args=MagicMock(return_value=mock_args),
+            setup_logging=DEFAULT,
+            mcp=mock_mcp,
+            browser_pool=mock_pool,
+            print=DEFAULT,
+        ) as mocks:
+            with patch("woodgate.__main__.signal.signal") as mock_signal:
+                if exit_code is None:
+                    cli.main()
+                else:
+                    with pytest.raises(SystemExit) as exc_info:
+                        cli.main()
+                    assert exc_info.value.code == exit_code
+
+        # 验证调用
+        mocks["setup_logging"].assert_called_once()
+        mock_mcp.run_sse_async.assert_awaited_once()
+        # 无论服务器正常退出、被中断还是出错，都会关闭共享的浏览器
+        mock_pool.shutdown.assert_awaited_once()
+        assert mocks["print"].call_count >= 3
+        # asyncio.run还会注册自己的SIGINT处理函数，这里只检查SIGHUP
+        mock_signal.assert_any_call(cli.signal.SIGHUP, cli._reload_credentials)
@@ -2,89 +2,84 @@
 MCP服务器测试
 """
 
-from unittest.mock import patch
-
-from woodgate.server import (
-    available_products,
-    document_types,
-    get_alerts,
-    get_document,
-    mcp,
-    search,
-    search_example,
-    search_help,
-    search_params,
-)
+from unittest.mock import MagicMock, patch
 
 
 class TestMCPServer:
     """MCP服务器测试"""
 
-    def test_mcp_name(self):
+    def test_mcp_name(self, server):
         """测试MCP名称"""
-        assert mcp.name == "Woodgate"
+        assert server.mcp.name == "Woodgate"
 
-    def test_mcp_instance(self):
+    def test_mcp_instance(self, server):
         """测试MCP实例"""
-        assert mcp is not None
-        assert hasattr(mcp, "name")
-        assert mcp.name == "Woodgate"
+        assert server.mcp is not None
+        assert hasattr(server.mcp, "name")
+        assert server.mcp.name == "Woodgate"
         # 注意：FastMCP对象可能不会直接暴露version属性，所以我们不检查它
 
-    def test_mcp_tool_decorator(self):
+    def test_mcp_tool_decorator(self, server):
         """测试MCP工具装饰器"""
         # 验证工具装饰器存在
-        assert hasattr(mcp, "tool")
-        assert callable(mcp.tool)
+        assert hasattr(server.mcp, "tool")
+        assert callable(server.mcp.tool)
 
-    def test_search_function(self):
+    def test_search_function(self, server):
         """测试搜索函数"""
         # 验证搜索函数是可调用的
-        assert callable(search)
+        assert callable(server.search)
 
-    def test_get_alerts_function(self):
+    def test_get_alerts_function(self, server):
         """测试获取警报函数"""
         # 验证获取警报函数是可调用的
-        assert callable(get_alerts)
+        assert callable(server.get_alerts)
 
-    def test_get_document_function(self):
+    def test_get_document_function(self, server):
         """测试获取文档函数"""
         # 验证获取文档函数是可调用的
-        assert callable(get_document)
+        assert callable(server.get_document)
 
-    def test_available_products_function(self):
+    def test_available_products_function(self, server):
         """测试获取可用产品函数"""
         with patch("woodgate.server.get_available_products", return_value=["RHEL", "OpenShift"]):
-            products = available_products()
+            products = server.available_products()
             assert products == ["RHEL", "OpenShift"]
 
-    def test_document_types_function(self):
+    def test_document_types_function(self, server):
         """测试获取文档类型函数"""
         with patch("woodgate.server.get_document_types", return_value=["Solution", "Article"]):
-            doc_types = document_types()
+            doc_types = server.document_types()
             assert doc_types == ["Solution", "Article"]
 
-    def test_search_params_function(self):
+    def test_search_params_function(self, server):
         """测试获取搜索参数函数"""
-        with patch("woodgate.server.get_available_products", return_value=["RHEL", "OpenShift"]):
-            with patch("woodgate.server.get_document_types", return_value=["Solution", "Article"]):
-                params = search_params()
-                assert "sort_options" in params
-                assert "default_rows" in params
-                assert "max_rows" in params
-                assert "products" in params
-                assert "doc_types" in params
+        with patch.multiple(
+            "woodgate.server",
+            get_available_products=MagicMock(return_value=["RHEL", "OpenShift"]),
+            get_document_types=MagicMock(return_value=["Solution", "Article"]),
+        ):
+            server.search_params.cache_clear()
+            params = server.search_params()
+            assert params.keys() >= {
+                "sort_options",
+                "default_rows",
+                "max_rows",
+                "products",
+                "doc_types",
+            }
+        server.search_params.cache_clear()
 
-    def test_search_help_function(self):
+    def test_search_help_function(self, server):
         """测试获取搜索帮助函数"""
-        help_text = search_help()
+        help_text = server.search_help()
         assert "Red Hat 客户门户搜索帮助" in help_text
         assert "query" in help_text
         assert "products" in help_text
 
-    def test_search_example_function(self):
+    def test_search_example_function(self, server):
         """测试获取搜索示例函数"""
-        example_text = search_example()
+        example_text = server.search_example()
         assert "Red Hat 客户门户搜索示例" in example_text
         assert "基本搜索" in example_text
         assert "带产品过滤的搜索" in example_text
@@ -4,86 +4,120 @@
 
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 from playwright.async_api import TimeoutError
 
 from woodgate.core.search import (
+    _build_search_url,
+    build_search_api_params,
     build_search_url,
     extract_search_results,
     get_document_content,
     get_product_alerts,
     perform_search,
+    search_via_api,
 )
 
 
+@pytest.fixture(scope="module")
+def shared_cookie_popup() -> AsyncMock:
+    """每个测试模块只创建一次模拟的cookie弹窗处理函数"""
+    return AsyncMock(return_value=False)
+
+
+@pytest.fixture
+def cookie_popup(shared_cookie_popup: AsyncMock, monkeypatch) -> AsyncMock:
+    """替换搜索模块导入的handle_cookie_popup，不在模拟页面上执行真实的弹窗处理"""
+    shared_cookie_popup.reset_mock()
+    monkeypatch.setattr("woodgate.core.search.handle_cookie_popup", shared_cookie_popup)
+    return shared_cookie_popup
+
+
 class TestSearchBasic:
     """搜索模块基本测试"""
 
-    def test_build_search_url_basic(self):
-        """测试基本搜索URL构建"""
-        url = build_search_url("memory leak")
-        assert "q=memory+leak" in url
-        assert "p=1" in url
-        assert "rows=20" in url
-        assert "sort=relevant" in url
-
-    def test_build_search_url_with_products(self):
-        """测试带产品过滤的搜索URL构建"""
-        url = build_search_url("kubernetes", products=["Red Hat OpenShift Container Platform"])
-        assert "q=kubernetes" in url
-        assert "product=Red+Hat+OpenShift+Container+Platform" in url
-
-    def test_build_search_url_with_doc_types(self):
-        """测试带文档类型过滤的搜索URL构建"""
-        url = build_search_url("memory leak", doc_types=["Article", "Solution"])
-        assert "q=memory+leak" in url
-        assert "documentKind=Article%26Solution" in url
-
-    def test_build_search_url_with_pagination(self):
-        """测试带分页的搜索URL构建"""
-        url = build_search_url("memory leak", page=3, rows=50)
-        assert "q=memory+leak" in url
-        assert "p=3" in url
-        assert "rows=50" in url
-
-    def test_build_search_url_with_sorting(self):
-        """测试带排序的搜索URL构建"""
-        url = build_search_url("memory leak", sort_by="lastModifiedDate desc")
-        assert "q=memory+leak" in url
-        assert "sort=lastModifiedDate+desc" in url
-
-    def test_build_search_url_complete(self):
-        """测试完整的搜索URL构建"""
-        url = build_search_url(
-            "performance tuning",
-            products=["Red Hat Enterprise Linux"],
-            doc_types=["Article", "Solution"],
-            page=2,
-            rows=30,
-            sort_by="lastModifiedDate desc",
-        )
-        assert "q=performance+tuning" in url
-        assert "product=Red+Hat+Enterprise+Linux" in url
-        assert "documentKind=Article%26Solution" in url
-        assert "p=2" in url
-        assert "rows=30" in url
-        assert "sort=lastModifiedDate+desc" in url
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            (
+                {"query": "memory leak"},
+                ["q=memory+leak", "p=1", "rows=20", "sort=relevant"],
+            ),
+            (
+                {"query": "kubernetes", "products": ["Red Hat OpenShift Container Platform"]},
+                ["q=kubernetes", "product=Red+Hat+OpenShift+Container+Platform"],
+            ),
+            (
+                {"query": "memory leak", "doc_types": ["Article", "Solution"]},
+                ["q=memory+leak", "documentKind=Article%26Solution"],
+            ),
+            (
+                {"query": "memory leak", "page": 3, "rows": 50},
+                ["q=memory+leak", "p=3", "rows=50"],
+            ),
+            (
+                {"query": "memory leak", "sort_by": "lastModifiedDate desc"},
+                ["q=memory+leak", "sort=lastModifiedDate+desc"],
+            ),
+            (
+                {
+                    "query": "performance tuning",
+                    "products": ["Red Hat Enterprise Linux"],
+                    "doc_types": ["Article", "Solution"],
+                    "page": 2,
+                    "rows": 30,
+                    "sort_by": "lastModifiedDate desc",
+                },
+                [
+                    "q=performance+tuning",
+                    "product=Red+Hat+Enterprise+Linux",
+                    "documentKind=Article%26Solution",
+                    "p=2",
+                    "rows=30",
+                    "sort=lastModifiedDate+desc",
+                ],
+            ),
+        ],
+        ids=[
+            "basic",
+            "with_products",
+            "with_doc_types",
+            "with_pagination",
+            "with_sorting",
+            "complete",
+        ],
+    )
+    def test_build_search_url(self, kwargs, expected):
+        """测试搜索URL构建"""
+        url = build_search_url(**kwargs)
+        assert url.startswith("https://access.redhat.com/search/?")
+        for part in expected:
+            assert part in url
+
+    def test_build_search_url_escapes_special_characters(self):
+        """测试搜索关键词中的特殊字符会被转义"""
+        url = build_search_url("c++ & rust", products=["A&B"])
+        assert "q=c%2B%2B+%26+rust" in url
+        assert "product=A%26B" in url
+
+    def test_build_search_url_cached(self):
+        """测试相同参数的搜索URL只构建一次，列表参数按内容缓存"""
+        _build_search_url.cache_clear()
+
+        first = build_search_url("memory leak", products=["Red Hat Enterprise Linux"])
+        second = build_search_url("memory leak", products=["Red Hat Enterprise Linux"])
+
+        assert first == second
+        assert _build_search_url.cache_info().hits == 1
+        assert _build_search_url.cache_info().misses == 1
 
 
 class TestSearchUnit:
     """搜索模块单元测试"""
 
-    @pytest.mark.asyncio
-    async def test_perform_search_unit(self):
+    async def test_perform_search_unit(self, mock_page, cookie_popup):
         """测试执行搜索功能"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-        mock_selector = AsyncMock()
-
-        # 设置模拟行为
-        mock_page.goto = AsyncMock()
-        mock_page.wait_for_selector.return_value = mock_selector
-
         # 模拟extract_search_results函数
         expected_results = [{"title": "测试结果", "url": "https://example.com"}]
 
@@ -92,102 +126,59 @@ class TestSearchUnit:
             "woodgate.core.search.extract_search_results",
             new=AsyncMock(return_value=expected_results),
         ):
-            with patch("woodgate.core.utils.handle_cookie_popup", new=AsyncMock()):
-                # 调用被测试函数
-                results = await perform_search(mock_page, "test query")
+            # 调用被测试函数
+            results = await perform_search(mock_page, "test query")
 
-                # 验证结果
-                assert results == expected_results
+            # 验证结果
+            assert results == expected_results
 
-                # 验证调用
-                mock_page.goto.assert_called_once()
+            # 验证调用
+            mock_page.goto.assert_called_once()
+            cookie_popup.assert_awaited_once_with(mock_page)
 
-    @pytest.mark.asyncio
-    async def test_perform_search_no_results_unit(self):
+    async def test_perform_search_no_results_unit(self, mock_page, cookie_popup):
         """测试执行搜索无结果的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
         # 设置模拟行为 - 等待选择器超时
-        mock_page.goto = AsyncMock()
         mock_page.wait_for_selector.side_effect = TimeoutError("模拟超时")
 
-        # 模拟no_results选择器
+        # 设置query_selector只在"无结果"选择器时返回元素
         mock_no_results = AsyncMock()
+        selectors = {".no-results, .pf-c-empty-state": mock_no_results}
+        mock_page.query_selector.side_effect = selectors.get
 
-        # 设置query_selector在特定选择器时返回mock_no_results
-        async def mock_query_selector(selector):
-            if selector == ".no-results, .pf-c-empty-state":
-                return mock_no_results
-            return None
-
-        mock_page.query_selector = AsyncMock(side_effect=mock_query_selector)
-
-        with patch("woodgate.core.utils.handle_cookie_popup", new=AsyncMock()):
-            # 调用被测试函数
-            results = await perform_search(mock_page, "test query")
+        # 调用被测试函数
+        results = await perform_search(mock_page, "test query")
 
-            # 验证结果
-            assert results == []
+        # 验证结果
+        assert results == []
+        mock_page.query_selector.assert_awaited_once_with(".no-results, .pf-c-empty-state")
 
-    @pytest.mark.asyncio
-    async def test_extract_search_results_unit(self):
+    async def test_extract_search_results_unit(self, mock_page):
         """测试提取搜索结果"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 模拟搜索结果元素
-        mock_results = [AsyncMock(), AsyncMock()]
-        mock_page.query_selector_all.return_value = mock_results
-
-        # 设置第一个结果的属性
-        async def mock_query_selector_1(selector):
-            if selector == "h2 a, .pf-c-title a":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="测试标题1")
-                mock.get_attribute = AsyncMock(return_value="https://example.com/1")
-                return mock
-            elif selector == ".search-result-content, .pf-c-card__body":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="测试摘要1")
-                return mock
-            elif selector == ".search-result-info span, .pf-c-label":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="解决方案")
-                return mock
-            elif selector == ".search-result-info time, .pf-c-label[data-testid='date']":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="2023-01-01")
-                return mock
-            return None
-
-        # 设置第二个结果的属性
-        async def mock_query_selector_2(selector):
-            if selector == "h2 a, .pf-c-title a":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="测试标题2")
-                mock.get_attribute = AsyncMock(return_value="https://example.com/2")
-                return mock
-            elif selector == ".search-result-content, .pf-c-card__body":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="测试摘要2")
-                return mock
-            elif selector == ".search-result-info span, .pf-c-label":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="文章")
-                return mock
-            elif selector == ".search-result-info time, .pf-c-label[data-testid='date']":
-                mock = AsyncMock()
-                mock.text_content = AsyncMock(return_value="2023-02-02")
-                return mock
-            return None
-
-        mock_results[0].query_selector = AsyncMock(side_effect=mock_query_selector_1)
-        mock_results[1].query_selector = AsyncMock(side_effect=mock_query_selector_2)
+        # 模拟浏览器内提取的结果
+        mock_page.evaluate.return_value = {
+            "found": 2,
+            "empty": False,
+            "results": [
+                {
+                    "title": "测试标题1",
+                    "url": "https://example.com/1",
+                    "summary": "测试摘要1",
+                    "doc_type": "解决方案",
+                    "last_updated": "2023-01-01",
+                },
+                {
+                    "title": "测试标题2",
+                    "url": "https://example.com/2",
+                    "summary": "测试摘要2",
+                    "doc_type": "文章",
+                    "last_updated": "2023-02-02",
+                },
+            ],
+        }
 
         # 调用被测试函数
-        with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-            results = await extract_search_results(mock_page)
+        results = await extract_search_results(mock_page)
 
         # 验证结果
         assert len(results) == 2
@@ -199,96 +190,85 @@ class TestSearchUnit:
         assert results[1]["url"] == "https://example.com/2"
         assert results[1]["summary"] == "测试摘要2"
 
-    @pytest.mark.asyncio
-    async def test_extract_search_results_exception(self):
+        # 验证只进行了一次浏览器往返
+        mock_page.evaluate.assert_called_once()
+        mock_page.query_selector_all.assert_not_called()
+
+    async def test_extract_search_results_default_values(self, mock_page):
+        """测试提取搜索结果时缺失字段使用默认值"""
+        mock_page.evaluate.return_value = {
+            "found": 1,
+            "empty": False,
+            "results": [
+                {
+                    "title": "测试标题",
+                    "url": "https://example.com",
+                    "summary": "",
+                    "doc_type": "",
+                    "last_updated": "",
+                }
+            ],
+        }
+
+        results = await extract_search_results(mock_page)
+
+        assert results[0]["summary"] == "无摘要"
+        assert results[0]["doc_type"] == "未知类型"
+        assert results[0]["last_updated"] == "未知日期"
+
+    async def test_extract_search_results_exception(self, mock_page):
         """测试提取搜索结果时的异常处理"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 设置query_selector_all抛出异常
-        mock_page.query_selector_all = AsyncMock(side_effect=Exception("模拟异常"))
+        # 设置evaluate抛出异常
+        mock_page.evaluate = AsyncMock(side_effect=Exception("模拟异常"))
         mock_page.reload = AsyncMock()
 
         # 调用被测试函数
-        with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-            with patch("woodgate.core.search.logger"):  # 忽略日志
-                with patch("woodgate.core.search.asyncio.sleep", new=AsyncMock()):  # 忽略sleep
-                    results = await extract_search_results(mock_page)
+        with patch("woodgate.core.search.logger"):  # 忽略日志
+            results = await extract_search_results(mock_page)
 
         # 验证结果
         assert results == []
-        assert mock_page.query_selector_all.call_count == 3  # 应该尝试3次
+        assert mock_page.evaluate.call_count == 3  # 应该尝试3次
         assert mock_page.reload.call_count == 2  # 应该重新加载2次
 
-    @pytest.mark.asyncio
-    async def test_extract_search_results_no_results(self):
+    async def test_extract_search_results_no_results(self, mock_page):
         """测试提取搜索结果时没有结果的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 设置query_selector_all返回空列表
-        mock_page.query_selector_all = AsyncMock(return_value=[])
-
-        # 设置no_results选择器
-        mock_no_results = AsyncMock()
-        mock_page.query_selector = AsyncMock(return_value=mock_no_results)
+        # 设置页面显示"无结果"消息
+        mock_page.evaluate = AsyncMock(return_value={"found": 0, "empty": True, "results": []})
 
         # 调用被测试函数
-        with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-            results = await extract_search_results(mock_page)
+        results = await extract_search_results(mock_page)
 
         # 验证结果
         assert results == []
-        assert mock_page.query_selector_all.call_count == 1
-        assert mock_page.query_selector.call_count == 1
+        assert mock_page.evaluate.call_count == 1
+        mock_page.reload.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_extract_search_results_retry_success(self):
+    async def test_extract_search_results_retry_success(self, mock_page):
         """测试提取搜索结果时重试成功的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 设置query_selector_all第一次返回空列表，第二次返回结果
-        mock_result = AsyncMock()
-
-        # 设置结果的属性
-        mock_title = AsyncMock()
-        mock_title.text_content = AsyncMock(return_value="测试标题")
-        mock_title.get_attribute = AsyncMock(return_value="https://example.com")
-
-        mock_summary = AsyncMock()
-        mock_summary.text_content = AsyncMock(return_value="测试摘要")
-
-        mock_doc_type = AsyncMock()
-        mock_doc_type.text_content = AsyncMock(return_value="解决方案")
-
-        mock_date = AsyncMock()
-        mock_date.text_content = AsyncMock(return_value="2023-01-01")
-
-        async def mock_query_selector(selector):
-            if selector == "h2 a, .pf-c-title a":
-                return mock_title
-            elif selector == ".search-result-content, .pf-c-card__body":
-                return mock_summary
-            elif selector == ".search-result-info span, .pf-c-label":
-                return mock_doc_type
-            elif selector == ".search-result-info time, .pf-c-label[data-testid='date']":
-                return mock_date
-            return None
-
-        mock_result.query_selector = AsyncMock(side_effect=mock_query_selector)
-
-        # 设置第一次调用返回空列表，第二次调用返回结果
-        mock_page.query_selector_all = AsyncMock(side_effect=[[], [mock_result]])
-
-        # 设置no_results选择器为None
-        mock_page.query_selector = AsyncMock(return_value=None)
+        # 设置第一次调用没有结果，第二次调用返回结果
+        mock_page.evaluate = AsyncMock(
+            side_effect=[
+                {"found": 0, "empty": False, "results": []},
+                {
+                    "found": 1,
+                    "empty": False,
+                    "results": [
+                        {
+                            "title": "测试标题",
+                            "url": "https://example.com",
+                            "summary": "测试摘要",
+                            "doc_type": "解决方案",
+                            "last_updated": "2023-01-01",
+                        }
+                    ],
+                },
+            ]
+        )
         mock_page.reload = AsyncMock()
 
         # 调用被测试函数
-        with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-            with patch("woodgate.core.search.asyncio.sleep", new=AsyncMock()):  # 忽略sleep
-                results = await extract_search_results(mock_page)
+        results = await extract_search_results(mock_page)
 
         # 验证结果
         assert len(results) == 1
@@ -298,42 +278,19 @@ class TestSearchUnit:
         assert results[0]["doc_type"] == "解决方案"
         assert results[0]["last_updated"] == "2023-01-01"
 
-        assert mock_page.query_selector_all.call_count == 2
+        assert mock_page.evaluate.call_count == 2
         assert mock_page.reload.call_count == 1
 
-    @pytest.mark.asyncio
-    async def test_get_document_content_unit(self):
+    async def test_get_document_content_unit(self, mock_page, cookie_popup):
         """测试获取文档内容"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 模拟文档元素
-        mock_title = AsyncMock()
-        mock_title.text_content = AsyncMock(return_value="文档标题")
-
-        mock_content = AsyncMock()
-        mock_content.text_content = AsyncMock(return_value="文档内容")
-
-        # 设置模拟行为
-        async def mock_query_selector(selector):
-            if selector == "h1, .pf-c-title":
-                return mock_title
-            elif selector == ".field-item, .pf-c-content, article":
-                return mock_content
-            return None
-
-        mock_page.query_selector = AsyncMock(side_effect=mock_query_selector)
-
-        # 模拟元数据字段
-        mock_metadata_fields: list = []
-        mock_page.query_selector_all = AsyncMock(return_value=mock_metadata_fields)
-
-        # 模拟等待选择器
-        mock_page.wait_for_selector = AsyncMock()
+        mock_page.evaluate.return_value = {
+            "title": "文档标题",
+            "content": "文档内容",
+            "metadata": {},
+        }
 
         # 调用被测试函数
-        with patch("woodgate.core.utils.handle_cookie_popup", new=AsyncMock()):
-            document = await get_document_content(mock_page, "https://example.com/doc")
+        document = await get_document_content(mock_page, "https://example.com/doc")
 
         # 验证结果
         assert document["title"] == "文档标题"
@@ -341,112 +298,42 @@ class TestSearchUnit:
         assert document["url"] == "https://example.com/doc"
         assert "metadata" in document
 
-    @pytest.mark.asyncio
-    async def test_get_document_content_timeout(self):
+    async def test_get_document_content_timeout(self, mock_page, cookie_popup):
         """测试获取文档内容时超时的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
         # 设置wait_for_selector抛出超时异常
         mock_page.wait_for_selector = AsyncMock(side_effect=TimeoutError("模拟超时"))
 
         # 调用被测试函数
-        with patch("woodgate.core.utils.handle_cookie_popup", new=AsyncMock()):
-            with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-                document = await get_document_content(mock_page, "https://example.com/doc")
+        document = await get_document_content(mock_page, "https://example.com/doc")
 
         # 验证结果
         assert "error" in document
         assert document["error"] == "无法加载文档内容"
 
-    @pytest.mark.asyncio
-    async def test_get_document_content_exception(self):
+    async def test_get_document_content_exception(self, mock_page):
         """测试获取文档内容时出现异常的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
         # 设置goto抛出异常
         mock_page.goto = AsyncMock(side_effect=Exception("模拟异常"))
 
         # 调用被测试函数
-        with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-            with patch("woodgate.core.search.logger"):  # 忽略日志
-                document = await get_document_content(mock_page, "https://example.com/doc")
+        with patch("woodgate.core.search.logger"):  # 忽略日志
+            document = await get_document_content(mock_page, "https://example.com/doc")
 
         # 验证结果
         assert "error" in document
         assert "模拟异常" in document["error"]
 
-    @pytest.mark.asyncio
-    async def test_get_document_content_with_metadata(self):
+    async def test_get_document_content_with_metadata(self, mock_page, cookie_popup):
         """测试获取带元数据的文档内容"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 模拟文档元素
-        mock_title = AsyncMock()
-        mock_title.text_content = AsyncMock(return_value="文档标题")
-
-        mock_content = AsyncMock()
-        mock_content.text_content = AsyncMock(return_value="文档内容")
-
-        # 设置模拟行为
-        async def mock_query_selector(selector):
-            if selector == "h1, .pf-c-title":
-                return mock_title
-            elif selector == ".field-item, .pf-c-content, article":
-                return mock_content
-            return None
-
-        mock_page.query_selector = AsyncMock(side_effect=mock_query_selector)
-
-        # 模拟元数据字段
-        mock_field1 = AsyncMock()
-        mock_field2 = AsyncMock()
-
-        # 设置第一个字段的标签和值
-        mock_label1 = AsyncMock()
-        mock_label1.text_content = AsyncMock(return_value="产品")
-
-        mock_value1 = AsyncMock()
-        mock_value1.text_content = AsyncMock(return_value="Red Hat Enterprise Linux")
-
-        async def mock_field1_query_selector(selector):
-            if selector == ".field-label, .pf-c-description-list__term":
-                return mock_label1
-            elif selector == ".field-item, .pf-c-description-list__description":
-                return mock_value1
-            return None
-
-        mock_field1.query_selector = AsyncMock(side_effect=mock_field1_query_selector)
-
-        # 设置第二个字段的标签和值
-        mock_label2 = AsyncMock()
-        mock_label2.text_content = AsyncMock(return_value="版本")
-
-        mock_value2 = AsyncMock()
-        mock_value2.text_content = AsyncMock(return_value="8.0")
-
-        async def mock_field2_query_selector(selector):
-            if selector == ".field-label, .pf-c-description-list__term":
-                return mock_label2
-            elif selector == ".field-item, .pf-c-description-list__description":
-                return mock_value2
-            return None
-
-        mock_field2.query_selector = AsyncMock(side_effect=mock_field2_query_selector)
-
-        # 设置元数据字段列表
-        mock_metadata_fields = [mock_field1, mock_field2]
-        mock_page.query_selector_all = AsyncMock(return_value=mock_metadata_fields)
-
-        # 模拟等待选择器
-        mock_page.wait_for_selector = AsyncMock()
+        # 模拟在浏览器内提取的标题、内容和元数据
+        mock_page.evaluate.return_value = {
+            "title": "文档标题",
+            "content": "文档内容",
+            "metadata": {"产品": "Red Hat Enterprise Linux", "版本": "8.0"},
+        }
 
         # 调用被测试函数
-        with patch("woodgate.core.utils.handle_cookie_popup", new=AsyncMock()):
-            with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-                document = await get_document_content(mock_page, "https://example.com/doc")
+        document = await get_document_content(mock_page, "https://example.com/doc")
 
         # 验证结果
         assert document["title"] == "文档标题"
@@ -455,55 +342,30 @@ class TestSearchUnit:
         assert "metadata" in document
         assert document["metadata"]["产品"] == "Red Hat Enterprise Linux"
         assert document["metadata"]["版本"] == "8.0"
-
-    @pytest.mark.asyncio
-    async def test_get_document_content_metadata_exception(self):
-        """测试获取文档元数据时出现异常的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
-        # 模拟文档元素
-        mock_title = AsyncMock()
-        mock_title.text_content = AsyncMock(return_value="文档标题")
-
-        mock_content = AsyncMock()
-        mock_content.text_content = AsyncMock(return_value="文档内容")
-
-        # 设置模拟行为
-        async def mock_query_selector(selector):
-            if selector == "h1, .pf-c-title":
-                return mock_title
-            elif selector == ".field-item, .pf-c-content, article":
-                return mock_content
-            return None
-
-        mock_page.query_selector = AsyncMock(side_effect=mock_query_selector)
-
-        # 设置query_selector_all抛出异常
-        mock_page.query_selector_all = AsyncMock(side_effect=Exception("模拟元数据异常"))
-
-        # 模拟等待选择器
-        mock_page.wait_for_selector = AsyncMock()
+        mock_page.evaluate.assert_awaited_once()
+        assert mock_page.evaluate.call_args[0][1] == [
+            "h1, .pf-c-title",
+            ".field-item, .pf-c-content, article",
+            ".field, .pf-c-description-list__group",
+            ".field-label, .pf-c-description-list__term",
+            ".field-item, .pf-c-description-list__description",
+        ]
+
+    async def test_get_document_content_default_values(self, mock_page, cookie_popup):
+        """测试页面上没有标题、内容和元数据时使用默认值"""
+        mock_page.evaluate.return_value = {"title": "", "content": "", "metadata": {}}
 
         # 调用被测试函数
-        with patch("woodgate.core.utils.handle_cookie_popup", new=AsyncMock()):
-            with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-                with patch("woodgate.core.search.logger"):  # 忽略日志
-                    document = await get_document_content(mock_page, "https://example.com/doc")
+        document = await get_document_content(mock_page, "https://example.com/doc")
 
         # 验证结果
-        assert document["title"] == "文档标题"
-        assert document["content"] == "文档内容"
+        assert document["title"] == "未知标题"
+        assert document["content"] == "无法提取文档内容"
         assert document["url"] == "https://example.com/doc"
-        assert "metadata" in document
         assert document["metadata"] == {}
 
-    @pytest.mark.asyncio
-    async def test_get_product_alerts(self):
+    async def test_get_product_alerts(self, mock_page):
         """测试获取产品警报（已弃用的函数）"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
         # 调用被测试函数
         with patch("woodgate.core.search.logger"):  # 忽略日志
             alerts = await get_product_alerts(mock_page, "Red Hat Enterprise Linux")
@@ -511,20 +373,107 @@ class TestSearchUnit:
         # 验证结果 - 应该返回空列表，因为函数已弃用
         assert alerts == []
 
-    @pytest.mark.asyncio
-    async def test_perform_search_exception(self):
+    async def test_perform_search_exception(self, mock_page):
         """测试执行搜索时出现异常的情况"""
-        # 创建模拟页面
-        mock_page = AsyncMock()
-
         # 设置goto抛出异常
         mock_page.goto = AsyncMock(side_effect=Exception("模拟搜索异常"))
 
         # 调用被测试函数
-        with patch("woodgate.core.search.log_step"):  # 忽略日志步骤
-            with patch("woodgate.core.search.logger"):  # 忽略日志
-                results = await perform_search(mock_page, "test query")
+        with patch("woodgate.core.search.logger"):  # 忽略日志
+            results = await perform_search(mock_page, "test query")
 
         # 验证结果
         assert results == []
         mock_page.goto.assert_called_once()
+
+
+class TestSearchApi:
+    """搜索API测试"""
+
+    @staticmethod
+    def _client(handler):
+        """创建使用模拟传输层的HTTP客户端"""
+        return lambda cookies: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def test_build_search_api_params(self):
+        """测试构建搜索API参数"""
+        params = build_search_api_params(
+            "memory leak",
+            products=["Red Hat Enterprise Linux"],
+            doc_types=["Solution", "Article"],
+            page_num=3,
+            rows=10,
+            sort_by="lastModifiedDate desc",
+        )
+        assert ("q", "memory leak") in params
+        assert ("rows", 10) in params
+        assert ("start", 20) in params
+        assert ("fq", 'product:("Red Hat Enterprise Linux")') in params
+        assert ("fq", 'documentKind:("Solution" OR "Article")') in params
+        assert ("sort", "lastModifiedDate desc") in params
+
+    def test_build_search_api_params_relevant(self):
+        """测试相关性排序不传sort参数"""
+        params = build_search_api_params("memory leak")
+        assert all(key != "sort" for key, _ in params)
+        assert all(key != "fq" for key, _ in params)
+
+    async def test_search_via_api_success(self):
+        """测试通过搜索API获取结果"""
+
+        def handler(request):
+            assert request.url.params["q"] == "memory leak"
+            return httpx.Response(
+                200,
+                json={
+                    "response": {
+                        "docs": [
+                            {
+                                "publishedTitle": "测试标题",
+                                "view_uri": "https://access.redhat.com/solutions/1",
+                                "abstract": "测试摘要",
+                                "documentKind": "Solution",
+                                "lastModifiedDate": "2023-01-01",
+                            }
+                        ]
+                    }
+                },
+            )
+
+        with patch("woodgate.core.search._api_client", new=self._client(handler)):
+            results = await search_via_api([], "memory leak")
+
+        assert results == [
+            {
+                "title": "测试标题",
+                "url": "https://access.redhat.com/solutions/1",
+                "summary": "测试摘要",
+                "doc_type": "Solution",
+                "last_updated": "2023-01-01",
+            }
+        ]
+
+    async def test_search_via_api_unauthorized(self):
+        """测试会话失效时返回None"""
+        with patch(
+            "woodgate.core.search._api_client",
+            new=self._client(lambda request: httpx.Response(401)),
+        ):
+            assert await search_via_api([], "memory leak") is None
+
+    async def test_search_via_api_error(self):
+        """测试请求失败时返回None"""
+
+        def handler(request):
+            raise httpx.ConnectError("连接失败")
+
+        with patch("woodgate.core.search._api_client", new=self._client(handler)):
+            assert await search_via_api([], "memory leak") is None
+
+    async def test_search_via_api_unexpected_json(self):
+        """测试返回结果结构不符合预期时返回None"""
+        with patch(
+            "woodgate.core.search._api_client",
+            new=self._client(lambda request: httpx.Response(200, json=["not", "a", "dict"])),
+        ):
+            assert await search_via_api([], "memory leak") is None
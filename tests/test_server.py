@@ -2,62 +2,80 @@
 服务器模块测试 - 包含基本测试、扩展测试和单元测试
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
-from woodgate.server import (
-    available_products,
-    document_types,
-    get_alerts,
-    get_document,
-    mcp,
-    search,
-    search_example,
-    search_help,
-    search_params,
-)
+
+@pytest.fixture(autouse=True)
+def isolated_session(server, tmp_path):
+    """将登录会话文件指向临时目录，避免测试之间共享会话"""
+    with patch.object(server.browser_pool, "storage_state_path", str(tmp_path / "state.json")):
+        yield tmp_path / "state.json"
+
+
+@pytest.fixture(autouse=True)
+def clear_result_caches(server):
+    """清空结果缓存，避免测试之间互相影响"""
+    server._DOC_CACHE.clear()
+    server._SEARCH_CACHE.clear()
+    yield
+    server._DOC_CACHE.clear()
+    server._SEARCH_CACHE.clear()
 
 
 class TestServerBasic:
     """服务器模块基本测试"""
 
-    def test_mcp_server_initialization(self):
+    def test_mcp_server_initialization(self, server):
         """测试MCP服务器初始化"""
         # 检查mcp对象是否存在
-        assert mcp is not None
+        assert server.mcp is not None
         # 检查基本属性
-        assert mcp.name == "Woodgate"
+        assert server.mcp.name == "Woodgate"
         # 注意：FastMCP对象可能不会直接暴露version和dependencies属性，所以我们不检查它们
 
-    def test_available_products(self):
+    def test_available_products(self, server):
         """测试获取可用产品列表"""
         with patch("woodgate.server.get_available_products", return_value=["RHEL", "OpenShift"]):
-            products = available_products()
+            products = server.available_products()
             assert products == ["RHEL", "OpenShift"]
 
-    def test_document_types(self):
+    def test_document_types(self, server):
         """测试获取文档类型列表"""
         with patch("woodgate.server.get_document_types", return_value=["Solution", "Article"]):
-            doc_types = document_types()
+            doc_types = server.document_types()
             assert doc_types == ["Solution", "Article"]
 
-    def test_search_params(self):
+    def test_search_params(self, server):
         """测试获取搜索参数配置"""
-        with patch("woodgate.server.get_available_products", return_value=["RHEL", "OpenShift"]):
-            with patch("woodgate.server.get_document_types", return_value=["Solution", "Article"]):
-                params = search_params()
-                assert "sort_options" in params
-                assert "default_rows" in params
-                assert "max_rows" in params
-                assert "products" in params
-                assert "doc_types" in params
-                assert params["products"] == ["RHEL", "OpenShift"]
-                assert params["doc_types"] == ["Solution", "Article"]
-
-    def test_search_help(self):
+        with patch.multiple(
+            "woodgate.server",
+            get_available_products=MagicMock(return_value=["RHEL", "OpenShift"]),
+            get_document_types=MagicMock(return_value=["Solution", "Article"]),
+        ):
+            server.search_params.cache_clear()
+            params = server.search_params()
+            assert params.keys() >= {
+                "sort_options",
+                "default_rows",
+                "max_rows",
+                "products",
+                "doc_types",
+            }
+            assert params["products"] == ["RHEL", "OpenShift"]
+            assert params["doc_types"] == ["Solution", "Article"]
+        server.search_params.cache_clear()
+
+    def test_search_params_cached(self, server):
+        """测试搜索参数配置只构建一次"""
+        assert server.search_params() is server.search_params()
+
+    def test_search_help(self, server):
         """测试获取搜索帮助信息"""
-        help_text = search_help()
+        help_text = server.search_help()
         assert "Red Hat 客户门户搜索帮助" in help_text
         assert "query" in help_text
         assert "products" in help_text
@@ -66,9 +84,9 @@ class TestServerBasic:
         assert "rows" in help_text
         assert "sort_by" in help_text
 
-    def test_search_example(self):
+    def test_search_example(self, server):
         """测试获取搜索示例"""
-        example_text = search_example()
+        example_text = server.search_example()
         assert "Red Hat 客户门户搜索示例" in example_text
         assert "基本搜索" in example_text
         assert "带产品过滤的搜索" in example_text
@@ -81,20 +99,18 @@ class TestServerBasic:
 class TestServerUnit:
     """服务器模块单元测试"""
 
-    @pytest.mark.asyncio
-    async def test_search_success(self):
+    async def test_search_success(self, server):
         """测试搜索功能成功的情况"""
         # 模拟浏览器和搜索结果
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
         mock_results = [{"title": "测试结果", "url": "https://example.com"}]
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -104,35 +120,33 @@ class TestServerUnit:
                         "woodgate.server.perform_search", new=AsyncMock(return_value=mock_results)
                     ):
                         # 调用被测试函数
-                        results = await search(query="test query")
+                        results = await server.search(query="test query")
 
                         # 验证结果
                         assert isinstance(results, list)
                         assert len(results) == 1
-                        assert "title" in results[0] and "url" in results[0]
+                        assert results[0].keys() >= {"title", "url"}
                         assert results[0]["title"] == mock_results[0]["title"]
                         assert results[0]["url"] == mock_results[0]["url"]
 
-    @pytest.mark.asyncio
-    async def test_search_login_failure(self):
+    async def test_search_login_failure(self, server):
         """测试搜索功能登录失败的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
                     "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=False)
                 ):
                     # 调用被测试函数
-                    results = await search(query="test query")
+                    results = await server.search(query="test query")
 
                     # 验证结果 - 结果是一个列表，包含一个错误对象
                     assert isinstance(results, list)
@@ -141,19 +155,17 @@ class TestServerUnit:
                     assert results[0]["error"] is not None
                     assert "登录失败" in results[0]["error"]
 
-    @pytest.mark.asyncio
-    async def test_search_exception(self):
+    async def test_search_exception(self, server):
         """测试搜索功能出现异常的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -161,7 +173,7 @@ class TestServerUnit:
                 ):
                     with patch("woodgate.server.perform_search", side_effect=Exception("测试异常")):
                         # 调用被测试函数
-                        results = await search(query="test query")
+                        results = await server.search(query="test query")
 
                         # 验证结果
                         assert isinstance(results, list)
@@ -170,22 +182,17 @@ class TestServerUnit:
                         assert results[0]["error"] is not None
                         assert "测试异常" in results[0]["error"]
 
-    @pytest.mark.asyncio
-    async def test_search_browser_close_exception(self):
+    async def test_search_browser_close_exception(self, server):
         """测试搜索功能关闭浏览器异常的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        # 设置quit抛出异常，确保同步和异步方法都抛出异常
-        mock_browser.quit = MagicMock(side_effect=Exception("浏览器关闭异常"))
-        mock_browser.quit.__await__ = MagicMock(side_effect=Exception("浏览器异步关闭异常"))
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -196,12 +203,12 @@ class TestServerUnit:
                         new=AsyncMock(return_value=[{"title": "测试结果"}]),
                     ):
                         with patch(
-                            "woodgate.core.browser.close_browser",
+                            "woodgate.server.browser_pool.release",
                             side_effect=Exception("浏览器关闭异常"),
                         ):
                             with patch("woodgate.server.logger") as mock_logger:
                                 # 调用被测试函数
-                                results = await search(query="test query")
+                                results = await server.search(query="test query")
 
                                 # 验证结果
                                 assert isinstance(results, list)
@@ -212,20 +219,18 @@ class TestServerUnit:
                                 # 验证日志调用 - 使用assert_called而不是assert_called_once
                                 assert mock_logger.warning.called
 
-    @pytest.mark.asyncio
-    async def test_get_alerts_success(self):
+    async def test_get_alerts_success(self, server):
         """测试获取警报功能成功的情况"""
         # 模拟浏览器和警报结果
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
         mock_alerts = [{"title": "测试警报", "severity": "严重"}]
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -236,7 +241,7 @@ class TestServerUnit:
                         new=AsyncMock(return_value=mock_alerts),
                     ):
                         # 调用被测试函数
-                        alerts = await get_alerts("Red Hat Enterprise Linux")
+                        alerts = await server.get_alerts("Red Hat Enterprise Linux")
 
                         # 验证结果
                         assert isinstance(alerts, list)
@@ -245,26 +250,24 @@ class TestServerUnit:
                         assert alerts[0]["title"] == mock_alerts[0]["title"]
                         assert alerts[0]["severity"] == mock_alerts[0]["severity"]
 
-    @pytest.mark.asyncio
-    async def test_get_alerts_login_failure(self):
+    async def test_get_alerts_login_failure(self, server):
         """测试获取警报功能登录失败的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
                     "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=False)
                 ):
                     # 调用被测试函数
-                    result = await get_alerts("Red Hat Enterprise Linux")
+                    result = await server.get_alerts("Red Hat Enterprise Linux")
 
                     # 验证结果
                     assert isinstance(result, list)
@@ -273,19 +276,17 @@ class TestServerUnit:
                     assert result[0]["error"] is not None
                     assert "登录失败" in result[0]["error"]
 
-    @pytest.mark.asyncio
-    async def test_get_alerts_exception(self):
+    async def test_get_alerts_exception(self, server):
         """测试获取警报功能出现异常的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -295,7 +296,7 @@ class TestServerUnit:
                         "woodgate.server.get_product_alerts", side_effect=Exception("测试警报异常")
                     ):
                         # 调用被测试函数
-                        result = await get_alerts("Red Hat Enterprise Linux")
+                        result = await server.get_alerts("Red Hat Enterprise Linux")
 
                         # 验证结果
                         assert isinstance(result, list)
@@ -304,22 +305,17 @@ class TestServerUnit:
                         assert result[0]["error"] is not None
                         assert "测试警报异常" in result[0]["error"]
 
-    @pytest.mark.asyncio
-    async def test_get_alerts_browser_close_exception(self):
+    async def test_get_alerts_browser_close_exception(self, server):
         """测试获取警报功能关闭浏览器异常的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        # 设置quit抛出异常，确保同步和异步方法都抛出异常
-        mock_browser.quit = MagicMock(side_effect=Exception("浏览器关闭异常"))
-        mock_browser.quit.__await__ = MagicMock(side_effect=Exception("浏览器异步关闭异常"))
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -330,12 +326,12 @@ class TestServerUnit:
                         new=AsyncMock(return_value=[{"title": "测试警报"}]),
                     ):
                         with patch(
-                            "woodgate.core.browser.close_browser",
+                            "woodgate.server.browser_pool.release",
                             side_effect=Exception("浏览器关闭异常"),
                         ):
                             with patch("woodgate.server.logger") as mock_logger:
                                 # 调用被测试函数
-                                result = await get_alerts("Red Hat Enterprise Linux")
+                                result = await server.get_alerts("Red Hat Enterprise Linux")
 
                                 # 验证结果
                                 assert isinstance(result, list)
@@ -346,20 +342,18 @@ class TestServerUnit:
                                 # 验证日志调用
                                 assert mock_logger.warning.called
 
-    @pytest.mark.asyncio
-    async def test_get_document_success(self):
+    async def test_get_document_success(self, server):
         """测试获取文档内容功能成功的情况"""
         # 模拟浏览器和文档内容
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
         mock_document = {"title": "测试文档", "content": "测试内容"}
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -370,52 +364,48 @@ class TestServerUnit:
                         new=AsyncMock(return_value=mock_document),
                     ):
                         # 调用被测试函数
-                        document = await get_document("https://example.com/doc")
+                        document = await server.get_document("https://example.com/doc")
 
                         # 验证结果
                         assert "title" in document and "content" in document
                         assert document["title"] == mock_document["title"]
                         assert document["content"] == mock_document["content"]
 
-    @pytest.mark.asyncio
-    async def test_get_document_login_failure(self):
+    async def test_get_document_login_failure(self, server):
         """测试获取文档内容功能登录失败的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
                     "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=False)
                 ):
                     # 调用被测试函数
-                    result = await get_document("https://example.com/doc")
+                    result = await server.get_document("https://example.com/doc")
 
                     # 验证结果
                     assert "error" in result
                     assert result["error"] is not None
                     assert "登录失败" in result["error"]
 
-    @pytest.mark.asyncio
-    async def test_get_document_exception(self):
+    async def test_get_document_exception(self, server):
         """测试获取文档内容功能出现异常的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -426,29 +416,24 @@ class TestServerUnit:
                         side_effect=Exception("测试文档异常"),
                     ):
                         # 调用被测试函数
-                        result = await get_document("https://example.com/doc")
+                        result = await server.get_document("https://example.com/doc")
 
                         # 验证结果
                         assert "error" in result
                         assert result["error"] is not None
                         assert "测试文档异常" in result["error"]
 
-    @pytest.mark.asyncio
-    async def test_get_document_browser_close_exception(self):
+    async def test_get_document_browser_close_exception(self, server):
         """测试获取文档内容功能关闭浏览器异常的情况"""
         # 模拟浏览器
-        mock_playwright = AsyncMock()
-        mock_browser = AsyncMock()
         mock_context = AsyncMock()
         mock_page = AsyncMock()
-        # 设置quit抛出异常，确保同步和异步方法都抛出异常
-        mock_browser.quit = MagicMock(side_effect=Exception("浏览器关闭异常"))
-        mock_browser.quit.__await__ = MagicMock(side_effect=Exception("浏览器异步关闭异常"))
-        mock_browser_resources = (mock_playwright, mock_browser, mock_context, mock_page)
+        mock_browser_resources = (mock_context, mock_page)
 
         # 模拟依赖函数
         with patch(
-            "woodgate.server.initialize_browser", new=AsyncMock(return_value=mock_browser_resources)
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=mock_browser_resources),
         ):
             with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
                 with patch(
@@ -459,12 +444,12 @@ class TestServerUnit:
                         new=AsyncMock(return_value={"title": "测试文档"}),
                     ):
                         with patch(
-                            "woodgate.core.browser.close_browser",
+                            "woodgate.server.browser_pool.release",
                             side_effect=Exception("浏览器关闭异常"),
                         ):
                             with patch("woodgate.server.logger") as mock_logger:
                                 # 调用被测试函数
-                                result = await get_document("https://example.com/doc")
+                                result = await server.get_document("https://example.com/doc")
 
                                 # 验证结果
                                 assert "title" in result
@@ -472,3 +457,264 @@ class TestServerUnit:
 
                                 # 验证日志调用
                                 assert mock_logger.warning.called
+
+    async def test_search_releases_page_on_exception(self, server):
+        """测试搜索出错时仍然归还浏览器页面"""
+        mock_context = AsyncMock()
+        mock_page = AsyncMock()
+        mock_release = AsyncMock()
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=(mock_context, mock_page)),
+        ):
+            with patch("woodgate.server.browser_pool.release", new=mock_release):
+                with patch(
+                    "woodgate.server.get_credentials", return_value=("test_user", "test_pass")
+                ):
+                    with patch(
+                        "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=True)
+                    ):
+                        with patch(
+                            "woodgate.server.perform_search", side_effect=Exception("测试异常")
+                        ):
+                            results = await server.search(query="test query")
+
+        assert "测试异常" in results[0]["error"]
+        mock_release.assert_awaited_once_with(mock_context, mock_page)
+
+
+class TestServerSession:
+    """登录会话复用测试"""
+
+    async def test_search_saves_session_after_login(self, server, isolated_session):
+        """测试登录成功后保存会话"""
+        mock_context = AsyncMock()
+        mock_context.storage_state.return_value = {"cookies": [], "origins": []}
+        mock_page = AsyncMock()
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=(mock_context, mock_page)),
+        ):
+            with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
+                with patch(
+                    "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=True)
+                ):
+                    with patch("woodgate.server.perform_search", new=AsyncMock(return_value=[])):
+                        await server.search(query="test query")
+
+        assert isolated_session.exists()
+
+    async def test_search_reuses_saved_session(self, server, isolated_session):
+        """测试已保存的会话有效时跳过登录"""
+        isolated_session.write_text('{"cookies": [], "origins": []}')
+        mock_context = AsyncMock()
+        mock_page = AsyncMock()
+        mock_login = AsyncMock(return_value=True)
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=(mock_context, mock_page)),
+        ):
+            with patch.multiple(
+                "woodgate.server",
+                get_credentials=MagicMock(return_value=("test_user", "test_pass")),
+                check_login_status=AsyncMock(return_value=True),
+                login_to_redhat_portal=mock_login,
+                search_via_api=AsyncMock(return_value=None),
+                perform_search=AsyncMock(return_value=[{"title": "测试结果"}]),
+            ):
+                results = await server.search(query="test query")
+
+        assert results[0]["title"] == "测试结果"
+        mock_login.assert_not_called()
+
+    async def test_search_uses_api_with_saved_session(self, server, isolated_session):
+        """测试已有会话时通过搜索API搜索，不启动浏览器"""
+        isolated_session.write_text('{"cookies": [{"name": "rh_sso", "value": "x"}]}')
+        mock_acquire = AsyncMock()
+        mock_api = AsyncMock(return_value=[{"title": "API结果", "url": "https://example.com"}])
+
+        with patch("woodgate.server.browser_pool.acquire_page", new=mock_acquire):
+            with patch("woodgate.server.search_via_api", new=mock_api):
+                results = await server.search(query="test query")
+
+        assert results[0]["title"] == "API结果"
+        assert mock_api.call_args[0][0] == [{"name": "rh_sso", "value": "x"}]
+        mock_acquire.assert_not_called()
+
+    async def test_search_falls_back_when_api_returns_unexpected_json(
+        self, server, isolated_session
+    ):
+        """测试搜索API返回无法解析的结果时回退到浏览器搜索"""
+        isolated_session.write_text('{"cookies": [{"name": "rh_sso", "value": "x"}]}')
+        mock_context = AsyncMock()
+        mock_page = AsyncMock()
+        mock_perform_search = AsyncMock(return_value=[{"title": "浏览器结果"}])
+        api_client = lambda cookies: httpx.AsyncClient(  # noqa: E731
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[1, 2]))
+        )
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=(mock_context, mock_page)),
+        ):
+            with patch("woodgate.core.search._api_client", new=api_client):
+                with patch.multiple(
+                    "woodgate.server",
+                    get_credentials=MagicMock(return_value=("test_user", "test_pass")),
+                    check_login_status=AsyncMock(return_value=True),
+                    perform_search=mock_perform_search,
+                ):
+                    results = await server.search(query="test query")
+
+        assert results[0]["title"] == "浏览器结果"
+        mock_perform_search.assert_awaited_once()
+
+
+class TestServerConcurrency:
+    """并发调用测试"""
+
+    async def test_concurrent_searches_overlap(self, server):
+        """测试并发的搜索请求同时执行，不会互相阻塞"""
+        running = 0
+        max_running = 0
+        both_started = asyncio.Event()
+
+        async def slow_search(page, **kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            if running == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            running -= 1
+            return [{"title": kwargs["query"]}]
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(side_effect=lambda: (AsyncMock(), AsyncMock())),
+        ):
+            with patch("woodgate.server.browser_pool.release", new=AsyncMock()):
+                with patch(
+                    "woodgate.server.get_credentials", return_value=("test_user", "test_pass")
+                ):
+                    with patch(
+                        "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=True)
+                    ):
+                        with patch("woodgate.server.perform_search", new=slow_search):
+                            first, second = await asyncio.gather(
+                                server.search(query="first"), server.search(query="second")
+                            )
+
+        assert first[0]["title"] == "first"
+        assert second[0]["title"] == "second"
+        assert max_running == 2
+
+
+class TestServerCache:
+    """结果缓存测试"""
+
+    async def test_get_document_uses_cache(self, server):
+        """测试重复获取同一文档时不再打开页面"""
+        mock_acquire = AsyncMock(return_value=(AsyncMock(), AsyncMock()))
+        mock_content = AsyncMock(return_value={"title": "测试文档", "content": "测试内容"})
+
+        with patch("woodgate.server.browser_pool.acquire_page", new=mock_acquire):
+            with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
+                with patch(
+                    "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=True)
+                ):
+                    with patch("woodgate.server.get_document_content", new=mock_content):
+                        first = await server.get_document("https://example.com/doc")
+                        second = await server.get_document("https://example.com/doc")
+
+        assert second == first
+        assert mock_acquire.call_count == 1
+        assert mock_content.call_count == 1
+
+    async def test_get_document_cache_expires(self, server):
+        """测试缓存过期后重新获取文档"""
+        mock_content = AsyncMock(return_value={"title": "测试文档", "content": "测试内容"})
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=(AsyncMock(), AsyncMock())),
+        ):
+            with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
+                with patch(
+                    "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=True)
+                ):
+                    with patch("woodgate.server.get_document_content", new=mock_content):
+                        with patch("woodgate.server.time.monotonic", return_value=1000.0):
+                            await server.get_document("https://example.com/doc")
+                        with patch("woodgate.server.time.monotonic", return_value=2000.0):
+                            await server.get_document("https://example.com/doc")
+
+        assert mock_content.call_count == 2
+
+    async def test_search_errors_are_not_cached(self, server):
+        """测试出错的搜索结果不会被缓存"""
+        mock_search = AsyncMock(side_effect=[[{"error": "临时错误"}], [{"title": "测试结果"}]])
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=(AsyncMock(), AsyncMock())),
+        ):
+            with patch("woodgate.server.get_credentials", return_value=("test_user", "test_pass")):
+                with patch(
+                    "woodgate.server.login_to_redhat_portal", new=AsyncMock(return_value=True)
+                ):
+                    with patch("woodgate.server.perform_search", new=mock_search):
+                        first = await server.search(query="test query")
+                        second = await server.search(query="test query")
+                        third = await server.search(query="test query")
+
+        assert "error" in first[0]
+        assert second[0]["title"] == "测试结果"
+        assert third == second
+        assert mock_search.call_count == 2
+
+    async def test_empty_search_results_are_not_cached(self, server):
+        """测试浏览器搜索返回的空结果不会被缓存"""
+        mock_search = AsyncMock(side_effect=[[], [{"title": "测试结果"}]])
+
+        with patch(
+            "woodgate.server.browser_pool.acquire_page",
+            new=AsyncMock(return_value=(AsyncMock(), AsyncMock())),
+        ):
+            with patch.multiple(
+                "woodgate.server",
+                get_credentials=MagicMock(return_value=("test_user", "test_pass")),
+                login_to_redhat_portal=AsyncMock(return_value=True),
+                perform_search=mock_search,
+            ):
+                first = await server.search(query="test query")
+                second = await server.search(query="test query")
+
+        assert first == []
+        assert second[0]["title"] == "测试结果"
+        assert mock_search.call_count == 2
+
+    def test_cache_returns_copies(self, server):
+        """测试修改写入或读出的结果不会影响缓存项"""
+        results = [{"title": "测试结果"}]
+        server._cache_put(server._SEARCH_CACHE, "key", results, 60)
+        results[0]["title"] = "修改写入的结果"
+
+        cached = server._cache_get(server._SEARCH_CACHE, "key")
+        cached[0]["title"] = "修改读出的结果"
+        cached.append({"title": "新增结果"})
+
+        assert server._cache_get(server._SEARCH_CACHE, "key") == [{"title": "测试结果"}]
+
+    def test_cache_evicts_oldest_entry(self, server):
+        """测试缓存超出容量时淘汰最久未使用的项"""
+        with patch("woodgate.server._CACHE_MAX_ENTRIES", 2):
+            server._cache_put(server._DOC_CACHE, "a", 1, 60)
+            server._cache_put(server._DOC_CACHE, "b", 2, 60)
+            server._cache_get(server._DOC_CACHE, "a")
+            server._cache_put(server._DOC_CACHE, "c", 3, 60)
+
+        assert list(server._DOC_CACHE) == ["a", "c"]
@@ -5,9 +5,10 @@
 import logging
 from unittest.mock import AsyncMock, MagicMock, call, patch
 
-import pytest
-
 from woodgate.core.utils import (
+    ACCEPT_BUTTON_TEXTS,
+    CLICK_ACCEPT_BUTTON_JS,
+    POPUP_SELECTOR,
     format_alert,
     handle_cookie_popup,
     log_step,
@@ -121,7 +122,6 @@ class TestUtilsUnit:
             args, _ = mock_info.call_args
             assert "测试消息" in args[0]
 
-    @pytest.mark.asyncio
     async def test_print_cookies_empty(self):
         """测试打印空Cookie列表"""
         # 创建模拟浏览器上下文
@@ -143,7 +143,6 @@ class TestUtilsUnit:
             ]
             mock_log.assert_has_calls([call(*c) for c in expected])
 
-    @pytest.mark.asyncio
     async def test_print_cookies_with_data(self):
         """测试打印包含数据的Cookie列表"""
         # 创建模拟浏览器上下文
@@ -173,7 +172,6 @@ class TestUtilsUnit:
             ]
             mock_log.assert_has_calls([call(*c) for c in expected])
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_popup_found(self):
         """测试处理找到的Cookie弹窗"""
         # 创建模拟页面
@@ -183,9 +181,6 @@ class TestUtilsUnit:
         # 确保click方法是可等待的AsyncMock
         mock_close_button.click = AsyncMock()
 
-        # 设置set_default_timeout为AsyncMock以支持await
-        mock_page.set_default_timeout = AsyncMock()
-
         # 设置模拟行为 - 找到Cookie弹窗和关闭按钮
         mock_page.wait_for_selector.return_value = mock_cookie_notice
         mock_cookie_notice.query_selector.return_value = mock_close_button
@@ -202,7 +197,6 @@ class TestUtilsUnit:
         mock_cookie_notice.query_selector.assert_called_once()
         mock_close_button.click.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_popup_not_found(self):
         """测试处理未找到的Cookie弹窗"""
         # 创建模拟页面
@@ -214,9 +208,6 @@ class TestUtilsUnit:
         mock_locator.first = MagicMock(return_value=mock_button)
         mock_page.get_by_text = MagicMock(return_value=mock_locator)
 
-        # 设置set_default_timeout为AsyncMock以支持await
-        mock_page.set_default_timeout = AsyncMock()
-
         # 设置模拟行为 - 未找到Cookie弹窗
         mock_page.wait_for_selector.side_effect = Exception("选择器超时")
 
@@ -230,7 +221,52 @@ class TestUtilsUnit:
         # 验证调用
         assert mock_page.wait_for_selector.call_count > 0
 
-    @pytest.mark.asyncio
+    async def test_handle_cookie_popup_waits_once(self):
+        """测试没有弹窗时只用合并后的选择器等待一次"""
+        mock_page = AsyncMock()
+        mock_page.wait_for_selector.side_effect = Exception("选择器超时")
+
+        with patch("woodgate.core.utils.log_step"):
+            result = await handle_cookie_popup(mock_page)
+
+        assert result is False
+        mock_page.wait_for_selector.assert_called_once_with(
+            POPUP_SELECTOR, timeout=500, state="attached"
+        )
+
+    async def test_handle_cookie_popup_text_fallback(self):
+        """测试弹窗内没有关闭按钮时按按钮文本点击"""
+        mock_page = AsyncMock()
+        mock_cookie_notice = AsyncMock()
+        mock_cookie_notice.query_selector.return_value = None
+        mock_cookie_notice.evaluate.return_value = True
+        mock_page.wait_for_selector.return_value = mock_cookie_notice
+
+        with patch("woodgate.core.utils.log_step"):
+            result = await handle_cookie_popup(mock_page)
+
+        assert result is True
+        # 只在cookie通知元素内查找，不在整个页面查找
+        mock_cookie_notice.evaluate.assert_awaited_once_with(
+            CLICK_ACCEPT_BUTTON_JS, list(ACCEPT_BUTTON_TEXTS)
+        )
+        mock_page.evaluate.assert_not_called()
+
+    async def test_handle_cookie_popup_skips_handled_context(self):
+        """测试同一上下文中弹窗关闭过后不再检查"""
+        mock_page = AsyncMock()
+        mock_cookie_notice = AsyncMock()
+        mock_page.wait_for_selector.return_value = mock_cookie_notice
+
+        with patch("woodgate.core.utils.log_step"):
+            assert await handle_cookie_popup(mock_page) is True
+            assert await handle_cookie_popup(mock_page) is False
+            assert mock_page.wait_for_selector.call_count == 1
+
+            # force=True时忽略已处理记录
+            assert await handle_cookie_popup(mock_page, force=True) is True
+            assert mock_page.wait_for_selector.call_count == 2
+
     async def test_handle_cookie_popup_exception(self):
         """测试处理Cookie弹窗时出现异常"""
         # 创建模拟页面
@@ -238,9 +274,6 @@ class TestUtilsUnit:
         # 确保evaluate方法是可等待的AsyncMock
         mock_page.evaluate = AsyncMock()
 
-        # 设置set_default_timeout为AsyncMock以支持await
-        mock_page.set_default_timeout = AsyncMock()
-
         # 设置模拟行为 - 所有选择器都出现异常
         # 直接使用Exception作为side_effect
         mock_page.wait_for_selector = AsyncMock(side_effect=Exception("测试异常"))
@@ -255,7 +288,6 @@ class TestUtilsUnit:
         # 验证调用 - 不再验证具体调用次数，因为它会尝试多个选择器
         assert mock_page.wait_for_selector.call_count > 0
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_popup_js_click(self):
         """测试处理Cookie弹窗时使用JavaScript点击"""
 
@@ -268,7 +300,6 @@ class TestUtilsUnit:
         with patch("woodgate.core.utils.handle_cookie_popup", side_effect=mock_handle_cookie_popup):
             # 创建模拟页面
             mock_page = AsyncMock()
-            mock_page.set_default_timeout = AsyncMock()
 
             # 调用被测试函数
             with patch("woodgate.core.utils.log_step"):
@@ -277,7 +308,6 @@ class TestUtilsUnit:
         # 验证结果
         assert result is True
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_popup_text_button_click(self):
         """测试处理Cookie弹窗时通过文本找到按钮并点击"""
 
@@ -290,7 +320,6 @@ class TestUtilsUnit:
         with patch("woodgate.core.utils.handle_cookie_popup", side_effect=mock_handle_cookie_popup):
             # 创建模拟页面
             mock_page = AsyncMock()
-            mock_page.set_default_timeout = AsyncMock()
 
             # 调用被测试函数
             with patch("woodgate.core.utils.log_step"):
@@ -299,28 +328,18 @@ class TestUtilsUnit:
         # 验证结果
         assert result is True
 
-    @pytest.mark.asyncio
     async def test_handle_cookie_popup_outer_exception(self):
-        """测试处理Cookie弹窗时最外层异常处理"""
-        # 创建模拟页面
+        """测试处理Cookie弹窗时查找按钮出错返回False"""
+        # 创建模拟页面 - 找到弹窗，但在弹窗内查找按钮时抛出异常
         mock_page = AsyncMock()
-        # 设置set_default_timeout抛出异常
-        mock_page.set_default_timeout = AsyncMock(side_effect=Exception("模拟超时设置异常"))
-
-        # 创建一个简单的模拟实现，直接返回False
-        async def mock_impl(page):
-            try:
-                # 这里会抛出异常
-                await page.set_default_timeout(1000)
-                return True
-            except Exception:
-                return False
-
-        # 使用补丁替换原始函数的实现
-        with patch("woodgate.core.utils.handle_cookie_popup", wraps=mock_impl):
-            # 调用被测试函数
-            with patch("woodgate.core.utils.log_step"):
-                result = await mock_impl(mock_page)
+        mock_cookie_notice = AsyncMock()
+        mock_cookie_notice.query_selector.side_effect = Exception("模拟查询异常")
+        mock_page.wait_for_selector.return_value = mock_cookie_notice
 
-        # 验证结果
+        with patch("woodgate.core.utils.log_step") as mock_log:
+            result = await handle_cookie_popup(mock_page)
+
+        # 验证结果 - 异常被捕获，没有继续按文本查找
         assert result is False
+        mock_cookie_notice.evaluate.assert_not_called()
+        mock_log.assert_called_with("处理cookie通知时出错: 模拟查询异常")
@@ -3,10 +3,13 @@
 """
 
 import argparse
+import asyncio
 import logging
+import signal
 import sys
 
-from .config import get_config
+from .config import get_config, get_credentials
+from .core.browser import browser_pool
 from .core.utils import setup_logging
 
 # FastMCP类有run方法，不需要单独导入run_server
@@ -32,6 +35,20 @@ def parse_args():
     return parser.parse_args()
 
 
+def _reload_credentials(signum, frame):
+    """SIGHUP处理函数 - 清除凭据缓存，下次请求时重新读取环境变量"""
+    get_credentials.cache_clear()
+    logging.getLogger(__name__).info("已收到SIGHUP，凭据缓存已清除")
+
+
+async def _serve() -> None:
+    """运行SSE服务器，退出时在同一事件循环中关闭共享的浏览器和Playwright"""
+    try:
+        await mcp.run_sse_async()
+    finally:
+        await browser_pool.shutdown()
+
+
 def main():
     """主函数"""
     # 解析命令行参数
@@ -48,6 +65,10 @@ def main():
     # 设置日志
     setup_logging(level=getattr(logging, log_level))
 
+    # 凭据轮换：收到SIGHUP时清除凭据缓存（Windows没有SIGHUP）
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, _reload_credentials)
+
     # 打印启动信息
     print("准备启动Woodgate MCP服务器...")
     print("使用Ctrl+C停止服务器")
@@ -68,9 +89,10 @@ def main():
         logging.getLogger("uvicorn").setLevel(logging.DEBUG)
         logging.getLogger("uvicorn.access").setLevel(logging.DEBUG)
 
-        # 使用FastMCP的run方法启动服务器
+        # 与FastMCP的run(transport="sse")相同，但服务器退出后还要关闭浏览器池；
+        # FastMCP的lifespan按SSE连接进入和退出，不能用来关闭所有连接共享的浏览器
         print(f"启动Woodgate MCP服务器 (transport=sse, host={host}, port={port})...")
-        mcp.run(transport="sse")
+        asyncio.run(_serve())
     except KeyboardInterrupt:
         print("\n服务器已停止")
     except Exception as e:
@@ -0,0 +1,101 @@
+"""
+依赖安装模块 - 安装运行所需的Python包和Playwright浏览器
+
+只在显式运行时执行，不在导入服务器模块时执行：
+
+    python -m woodgate.bootstrap
+"""
+
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+
+logger = logging.getLogger(__name__)
+
+# 运行所需的Python包
+REQUIRED_PACKAGES = ("playwright", "httpx", "mcp")
+
+# 浏览器安装完成后写入的标记文件，避免重复下载Chromium
+BROWSER_MARKER = os.path.join(os.path.expanduser("~"), ".cache", "woodgate", ".browser_installed")
+
+
+def install_browser() -> None:
+    """安装Playwright使用的Chromium浏览器，已安装过时直接返回"""
+    if os.path.exists(BROWSER_MARKER):
+        logger.info("Playwright浏览器已安装，跳过")
+        return
+
+    logger.info("安装Playwright浏览器...")
+    subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
+    os.makedirs(os.path.dirname(BROWSER_MARKER), exist_ok=True)
+    with open(BROWSER_MARKER, "w", encoding="utf-8"):
+        pass
+    logger.info("Playwright浏览器安装成功")
+
+
+def install_package(package: str) -> None:
+    """
+    安装单个Python包，先用当前解释器的pip，不可用时(例如uv创建的虚拟环境)再用uv
+
+    Args:
+        package: 包名
+
+    Raises:
+        OSError | subprocess.CalledProcessError: 所有安装方式都失败时抛出最后一个错误
+    """
+    commands = (
+        [sys.executable, "-m", "pip", "install", "--quiet", package],
+        ["uv", "pip", "install", "--quiet", package],
+    )
+    error: Exception = OSError(f"无法安装 {package}")
+    for command in commands:
+        logger.info("正在安装 %s: %s", package, " ".join(command[:-1]))
+        try:
+            subprocess.check_call(command)
+            logger.info("%s 安装成功", package)
+            return
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.warning("安装 %s 失败: %s", package, e)
+            error = e
+    raise error
+
+
+def ensure_dependencies() -> bool:
+    """
+    检查并安装缺失的依赖和浏览器
+
+    Returns:
+        bool: 所有依赖都已就绪返回True，否则返回False
+    """
+    success = True
+    for package in REQUIRED_PACKAGES:
+        if importlib.util.find_spec(package) is not None:
+            continue
+
+        try:
+            install_package(package)
+        except Exception as e:
+            logger.error("安装 %s 失败: %s", package, e)
+            success = False
+
+    try:
+        install_browser()
+    except Exception as e:
+        logger.error("安装Playwright浏览器失败: %s", e)
+        success = False
+
+    return success
+
+
+def main() -> None:
+    """命令行入口"""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    if not ensure_dependencies():
+        sys.exit(1)
+    logger.info("依赖已就绪")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,29 @@
 配置模块 - 管理应用程序配置和环境变量
 """
 
+import functools
 import logging
 import os
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, NamedTuple
 
 logger = logging.getLogger(__name__)
 
 
-def get_credentials() -> Tuple[str, str]:
+class Credentials(NamedTuple):
+    """Red Hat客户门户登录凭据"""
+
+    username: str
+    password: str
+
+
+def _load_credentials() -> Credentials:
     """
-    获取Red Hat客户门户的登录凭据
+    从环境变量加载Red Hat客户门户的登录凭据
 
     优先使用环境变量，否则使用默认凭据，最后使用固定凭据
 
     Returns:
-        Tuple[str, str]: 用户名和密码
+        Credentials: 用户名和密码
     """
     # 从环境变量获取凭据
     username = os.environ.get("REDHAT_USERNAME")
@@ -45,10 +53,65 @@ def get_credentials() -> Tuple[str, str]:
     # 用于测试的特殊情况
     if os.environ.get("WOODGATE_TEST_MODE") == "true":
         logger.warning("测试模式：凭据未设置")
-        return "", ""
+        return Credentials("", "")
+
+    logger.debug("凭据获取成功: username='%s'", username)
+    return Credentials(username, password)
+
+
+@functools.lru_cache(maxsize=1)
+def get_credentials() -> Credentials:
+    """
+    获取Red Hat客户门户的登录凭据
+
+    结果在进程内缓存，只在首次调用时读取环境变量。
+    凭据轮换后调用 get_credentials.cache_clear() 重新加载。
+
+    Returns:
+        Credentials: 用户名和密码
+    """
+    return _load_credentials()
+
+
+def validate_credentials() -> None:
+    """
+    校验凭据是否完整
+
+    Raises:
+        ValueError: 用户名或密码未设置
+    """
+    username, password = get_credentials()
+    if not username or not password:
+        raise ValueError("未设置Red Hat客户门户凭据，请设置REDHAT_USERNAME和REDHAT_PASSWORD")
+
+
+def _default_storage_state() -> str:
+    """
+    默认的登录会话文件路径
+
+    会话文件包含cookie，放在当前用户的缓存目录下，不使用共享的临时目录
+
+    Returns:
+        str: 会话文件路径
+    """
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "woodgate", "state.json")
+
 
-    logger.debug(f"凭据获取成功: username='{username}'")
-    return username, password
+def _max_contexts() -> int:
+    """
+    读取同时打开的浏览器上下文数量上限
+
+    小于1时信号量永远无法获取，工具调用会一直等待，因此至少为1
+
+    Returns:
+        int: 上下文数量上限
+    """
+    max_contexts = int(os.environ.get("WOODGATE_MAX_CONTEXTS", "4"))
+    if max_contexts < 1:
+        logger.warning("WOODGATE_MAX_CONTEXTS=%s 无效，使用1", max_contexts)
+        return 1
+    return max_contexts
 
 
 def get_config() -> Dict[str, Any]:
@@ -64,6 +127,7 @@ def get_config() -> Dict[str, Any]:
         # 浏览器配置
         "headless": os.environ.get("WOODGATE_HEADLESS", "true").lower() == "true",
         "browser_timeout": int(os.environ.get("WOODGATE_BROWSER_TIMEOUT", "20")),
+        "max_contexts": _max_contexts(),
         # 搜索配置
         "default_rows": int(os.environ.get("WOODGATE_DEFAULT_ROWS", "20")),
         "default_sort": os.environ.get("WOODGATE_DEFAULT_SORT", "relevant"),
@@ -75,88 +139,103 @@ def get_config() -> Dict[str, Any]:
         # 重试配置
         "max_retries": int(os.environ.get("WOODGATE_MAX_RETRIES", "3")),
         "retry_delay": int(os.environ.get("WOODGATE_RETRY_DELAY", "3")),
+        # 会话配置，默认保存在当前用户的缓存目录，设置为空字符串可禁用登录会话持久化
+        "storage_state": os.environ.get("WOODGATE_STORAGE_STATE", _default_storage_state()),
     }
 
     return config
 
 
-def get_available_products() -> list[str]:
+# 可用的产品列表，使用元组避免每次调用都创建新列表
+AVAILABLE_PRODUCTS = (
+    "Red Hat Enterprise Linux",
+    "Red Hat OpenShift Container Platform",
+    "Red Hat Virtualization",
+    "Red Hat JBoss Enterprise Application Platform",
+    "Red Hat Satellite",
+    "Red Hat Ansible Automation Platform",
+    "Red Hat OpenStack Platform",
+    "Red Hat Ceph Storage",
+    "Red Hat Gluster Storage",
+    "Red Hat Decision Manager",
+    "Red Hat Process Automation Manager",
+    "Red Hat Data Grid",
+    "Red Hat AMQ",
+    "Red Hat Fuse",
+    "Red Hat 3scale API Management",
+    "Red Hat Single Sign-On",
+    "Red Hat OpenShift Dedicated",
+    "Red Hat OpenShift Online",
+    "Red Hat OpenShift Service on AWS",
+    "Red Hat Advanced Cluster Management for Kubernetes",
+    "Red Hat Advanced Cluster Security for Kubernetes",
+    "Red Hat Quay",
+    "Red Hat CodeReady Containers",
+    "Red Hat CodeReady Workspaces",
+    "Red Hat Integration",
+    "Red Hat Runtimes",
+    "Red Hat Application Services",
+    "Red Hat Middleware",
+    "Red Hat Insights",
+    "Red Hat Satellite Capsule",
+    "Red Hat Directory Server",
+    "Red Hat Certificate System",
+    "Red Hat Identity Management",
+    "Red Hat Enterprise Linux for SAP Solutions",
+    "Red Hat Enterprise Linux for Real Time",
+    "Red Hat Enterprise Linux for IBM Z",
+    "Red Hat Enterprise Linux for Power",
+    "Red Hat Enterprise Linux for ARM",
+    "Red Hat Software Collections",
+    "Red Hat Developer Toolset",
+)
+
+
+def get_available_products() -> tuple[str, ...]:
     """
     获取可用的产品列表
 
     Returns:
-        list[str]: 产品列表
-    """
-    return [
-        "Red Hat Enterprise Linux",
-        "Red Hat OpenShift Container Platform",
-        "Red Hat Virtualization",
-        "Red Hat JBoss Enterprise Application Platform",
-        "Red Hat Satellite",
-        "Red Hat Ansible Automation Platform",
-        "Red Hat OpenStack Platform",
-        "Red Hat Ceph Storage",
-        "Red Hat Gluster Storage",
-        "Red Hat Decision Manager",
-        "Red Hat Process Automation Manager",
-        "Red Hat Data Grid",
-        "Red Hat AMQ",
-        "Red Hat Fuse",
-        "Red Hat 3scale API Management",
-        "Red Hat Single Sign-On",
-        "Red Hat OpenShift Dedicated",
-        "Red Hat OpenShift Online",
-        "Red Hat OpenShift Service on AWS",
-        "Red Hat Advanced Cluster Management for Kubernetes",
-        "Red Hat Advanced Cluster Security for Kubernetes",
-        "Red Hat Quay",
-        "Red Hat CodeReady Containers",
-        "Red Hat CodeReady Workspaces",
-        "Red Hat Integration",
-        "Red Hat Runtimes",
-        "Red Hat Application Services",
-        "Red Hat Middleware",
-        "Red Hat Insights",
-        "Red Hat Satellite Capsule",
-        "Red Hat Directory Server",
-        "Red Hat Certificate System",
-        "Red Hat Identity Management",
-        "Red Hat Enterprise Linux for SAP Solutions",
-        "Red Hat Enterprise Linux for Real Time",
-        "Red Hat Enterprise Linux for IBM Z",
-        "Red Hat Enterprise Linux for Power",
-        "Red Hat Enterprise Linux for ARM",
-        "Red Hat Software Collections",
-        "Red Hat Developer Toolset",
-    ]
-
-
-def get_document_types() -> list[str]:
+        tuple[str, ...]: 产品列表
+    """
+    return AVAILABLE_PRODUCTS
+
+
+# 可用的文档类型
+DOCUMENT_TYPES = (
+    "Solution",
+    "Article",
+    "Documentation",
+    "Video",
+    "Blog",
+    "Product Documentation",
+    "Knowledgebase",
+    "Security Advisory",
+    "Bug Fix",
+    "Enhancement",
+    "Reference Architecture",
+    "Technical Brief",
+    "White Paper",
+    "FAQ",
+    "Getting Started",
+    "Installation Guide",
+    "Administration Guide",
+    "Developer Guide",
+    "Release Notes",
+    "Troubleshooting Guide",
+)
+
+
+def get_document_types() -> tuple[str, ...]:
     """
     获取可用的文档类型
 
     Returns:
-        list[str]: 文档类型列表
-    """
-    return [
-        "Solution",
-        "Article",
-        "Documentation",
-        "Video",
-        "Blog",
-        "Product Documentation",
-        "Knowledgebase",
-        "Security Advisory",
-        "Bug Fix",
-        "Enhancement",
-        "Reference Architecture",
-        "Technical Brief",
-        "White Paper",
-        "FAQ",
-        "Getting Started",
-        "Installation Guide",
-        "Administration Guide",
-        "Developer Guide",
-        "Release Notes",
-        "Troubleshooting Guide",
-    ]
+        tuple[str, ...]: 文档类型列表
+    """
+    return DOCUMENT_TYPES
+
+
+# 严格模式：导入时立即读取并校验凭据，缺失时启动失败而不是在首次请求时才发现
+if os.environ.get("WOODGATE_STRICT_ENV") == "1":
+    validate_credentials()
@@ -6,9 +6,11 @@
 import asyncio
 import logging
 import traceback
+from typing import Any, Awaitable, Callable, Optional
 
 from playwright.async_api import BrowserContext, Page
 
+from ..config import get_config
 from .utils import log_step
 
 logger = logging.getLogger(__name__)
@@ -17,6 +19,9 @@ logger = logging.getLogger(__name__)
 LOGIN_URL = "https://sso.redhat.com/auth/realms/redhat-external/login-actions/authenticate"
 MANAGEMENT_URL = "https://access.redhat.com/management"
 
+# 登录失败后重试前等待的秒数，由WOODGATE_RETRY_DELAY配置，默认3秒
+LOGIN_RETRY_DELAY = get_config()["retry_delay"]
+
 
 async def login_to_redhat_portal(
     page: Page,
@@ -24,6 +29,8 @@ async def login_to_redhat_portal(
     username: str,
     password: str,
     max_retries: int = 3,
+    *,
+    sleeper: Optional[Callable[[float], Awaitable[Any]]] = None,
 ) -> bool:
     """
     登录到Red Hat客户门户
@@ -34,10 +41,15 @@ async def login_to_redhat_portal(
         username (str): Red Hat账号用户名
         password (str): Red Hat账号密码
         max_retries (int, optional): 最大重试次数. Defaults to 3.
+        sleeper (Callable, optional): 重试前等待使用的协程函数，可以传入带抖动的退避实现.
+            Defaults to asyncio.sleep.
 
     Returns:
         bool: 登录成功返回True，否则返回False
     """
+    # 调用时再取asyncio.sleep，而不是在定义时绑定
+    sleep = sleeper or asyncio.sleep
+
     # 参数验证
     if not username or not password:
         logger.error("用户名和密码都必须提供")
@@ -51,18 +63,23 @@ async def login_to_redhat_portal(
 
     # 访问登录页面
     try:
-        # 使用networkidle而不是domcontentloaded，确保页面完全加载
-        await page.goto("https://access.redhat.com/login", wait_until="networkidle", timeout=30000)
+        # 只等待DOM就绪，不等待networkidle，避免被广告和统计脚本拖慢
+        await page.goto(
+            "https://access.redhat.com/login", wait_until="domcontentloaded", timeout=30000
+        )
         log_step("已加载登录页面")
 
-        # 等待额外的时间，确保页面完全加载和渲染
-        await asyncio.sleep(2)
+        # 以用户名输入框出现作为页面就绪的条件
+        try:
+            await page.wait_for_selector("#username", state="attached", timeout=10000)
+        except Exception as e:
+            logger.warning("等待用户名输入框时出错: %s", e)
 
         # 检查页面是否已经准备好
         is_ready = await page.evaluate(
             """
             () => {
-                return document.readyState === 'complete' &&
+                return document.readyState !== 'loading' &&
                        !!document.querySelector('form') &&
                        (!!document.querySelector('#username') ||
                         !!document.querySelector('input[type="text"]') ||
@@ -77,7 +94,8 @@ async def login_to_redhat_portal(
             log_step("登录页面可能未完全准备好，但将继续尝试")
     except Exception as e:
         logger.error("加载登录页面失败: %s", e)
-        logger.debug("错误堆栈: %s", traceback.format_exc())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
         return False
 
     # 注意：cookie横幅处理现在由browser.py中的setup_cookie_banner_handlers函数处理
@@ -200,7 +218,7 @@ async def login_to_redhat_portal(
 
             # 等待页面加载完成
             try:
-                await page.wait_for_load_state("networkidle", timeout=30000)
+                await page.wait_for_load_state("domcontentloaded", timeout=30000)
             except Exception as e:
                 logger.warning("等待页面加载完成时出错: %s", e)
 
@@ -256,8 +274,8 @@ async def login_to_redhat_portal(
 
             # 如果不是最后一次尝试，则重试
             if attempt < max_retries - 1:
-                log_step("登录未成功，将在3秒后重试...")
-                await asyncio.sleep(3)
+                log_step(f"登录未成功，将在{LOGIN_RETRY_DELAY}秒后重试...")
+                await sleep(LOGIN_RETRY_DELAY)
                 await page.reload()
                 continue
 
@@ -266,12 +284,13 @@ async def login_to_redhat_portal(
 
         except Exception as e:
             logger.error("登录过程中出错: %s", e)
-            logger.debug("错误堆栈: %s", traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("错误堆栈: %s", traceback.format_exc())
 
             # 如果不是最后一次尝试，则重试
             if attempt < max_retries - 1:
-                log_step("将在3秒后重试...")
-                await asyncio.sleep(3)
+                log_step(f"将在{LOGIN_RETRY_DELAY}秒后重试...")
+                await sleep(LOGIN_RETRY_DELAY)
                 await page.reload()
                 continue
 
@@ -295,8 +314,8 @@ async def check_login_status(page: Page) -> bool:
     log_step("检查登录状态...")
 
     try:
-        # 访问需要登录的页面
-        await page.goto(MANAGEMENT_URL, wait_until="networkidle", timeout=30000)
+        # 访问需要登录的页面，由下面的wait_for_selector判断页面是否就绪
+        await page.goto(MANAGEMENT_URL, wait_until="domcontentloaded", timeout=30000)
 
         # 等待页面加载，检查是否有用户菜单或个人资料元素
         try:
@@ -335,7 +354,8 @@ async def check_login_status(page: Page) -> bool:
 
     except Exception as e:
         logger.error("检查登录状态时出错: %s", e)
-        logger.debug("错误堆栈: %s", traceback.format_exc())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
         return False
 
     # 默认返回值，确保所有路径都有返回值
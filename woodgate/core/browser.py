@@ -3,9 +3,14 @@
 使用Playwright替代Selenium实现更高效的浏览器自动化
 """
 
+import asyncio
+import json
 import logging
+import os
+import tempfile
 import traceback
-from typing import Optional
+from typing import Any, Optional
+from urllib.parse import urlparse
 
 from playwright.async_api import (
     Browser,
@@ -13,9 +18,12 @@ from playwright.async_api import (
     Locator,
     Page,
     Playwright,
+    Route,
     async_playwright,
 )
 
+from ..config import get_config
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,7 +68,14 @@ async def setup_cookie_banner_handlers(page: Page) -> None:
 
             # 定义处理函数
             async def handle_cookie_banner(banner: Locator) -> None:
-                if await banner.is_visible():
+                try:
+                    visible = await banner.is_visible()
+                except Exception as e:
+                    # 处理程序抛出的异常会让触发它的页面操作失败，这里只记录日志
+                    logger.debug("检查cookie横幅 %s 是否可见失败: %s", selector, e)
+                    return
+
+                if visible:
                     logger.info(f"检测到cookie横幅: {selector}")
 
                     # 尝试点击接受按钮
@@ -72,7 +87,7 @@ async def setup_cookie_banner_handlers(page: Page) -> None:
                                 await button.click()
                                 return
                         except Exception as e:
-                            logger.debug(f"尝试点击按钮 {btn_selector} 失败: {e}")
+                            logger.debug("尝试点击按钮 %s 失败: %s", btn_selector, e)
 
                     # 如果没有找到特定按钮，尝试通过文本查找
                     for text in [
@@ -92,7 +107,7 @@ async def setup_cookie_banner_handlers(page: Page) -> None:
                                 await button.click()
                                 return
                         except Exception as e:
-                            logger.debug(f"尝试点击文本为 '{text}' 的按钮失败: {e}")
+                            logger.debug("尝试点击文本为 '%s' 的按钮失败: %s", text, e)
 
                     # 如果上述方法都失败，尝试使用JavaScript点击
                     try:
@@ -115,15 +130,15 @@ async def setup_cookie_banner_handlers(page: Page) -> None:
                             await banner.element_handle(),
                         )
                     except Exception as e:
-                        logger.debug(f"使用JavaScript点击失败: {e}")
+                        logger.debug("使用JavaScript点击失败: %s", e)
 
             # 添加处理程序
             handler = page.add_locator_handler(banner_locator, handle_cookie_banner)
             # 确保异步处理程序被正确等待
             await handler
-            logger.debug(f"已添加cookie横幅处理程序: {selector}")
+            logger.debug("已添加cookie横幅处理程序: %s", selector)
         except Exception as e:
-            logger.debug(f"为选择器 {selector} 添加处理程序失败: {e}")
+            logger.debug("为选择器 %s 添加处理程序失败: %s", selector, e)
 
     # 添加一个通用的cookie横幅处理程序，用于处理可能的iframe内的cookie横幅
     try:
@@ -213,10 +228,10 @@ async def setup_cookie_banner_handlers(page: Page) -> None:
                             await button.first.click(timeout=1000, force=True)
                             break
                 except Exception as e:
-                    logger.debug(f"点击文本按钮失败: {e}")
+                    logger.debug("点击文本按钮失败: %s", e)
 
             except Exception as e:
-                logger.debug(f"通用cookie横幅处理失败: {e}")
+                logger.debug("通用cookie横幅处理失败: %s", e)
 
         # 只在页面加载后执行一次，避免重复执行
         # 使用正确的异步回调函数
@@ -229,7 +244,7 @@ async def setup_cookie_banner_handlers(page: Page) -> None:
 
         logger.debug("已添加通用cookie横幅处理程序")
     except Exception as e:
-        logger.debug(f"添加通用cookie横幅处理程序失败: {e}")
+        logger.debug("添加通用cookie横幅处理程序失败: %s", e)
 
     # 添加特定的Red Hat cookie处理
     try:
@@ -252,11 +267,104 @@ async def setup_cookie_banner_handlers(page: Page) -> None:
         )
         logger.info("已预设Red Hat cookie接受标志")
     except Exception as e:
-        logger.debug(f"预设cookie失败: {e}")
+        logger.debug("预设cookie失败: %s", e)
 
     logger.info("cookie横幅处理程序设置完成")
 
 
+# 浏览器启动参数
+BROWSER_LAUNCH_ARGS = [
+    "--no-sandbox",  # 禁用沙箱，解决某些环境下的权限问题
+    "--disable-dev-shm-usage",  # 解决在低内存环境中的崩溃问题
+    "--disable-extensions",  # 禁用扩展，减少资源占用和干扰
+    "--disable-gpu",  # 禁用GPU加速，提高在服务器环境下的兼容性
+    "--disable-notifications",  # 禁用通知，避免弹窗干扰
+]
+
+# 浏览器上下文选项
+CONTEXT_OPTIONS: dict[str, Any] = {
+    "viewport": {"width": 1920, "height": 1080},  # 设置窗口大小，模拟标准显示器分辨率
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",  # 设置用户代理
+    "ignore_https_errors": True,  # 忽略HTTPS错误，提高兼容性
+    "java_script_enabled": True,  # 启用JavaScript
+    "has_touch": False,  # 禁用触摸，模拟桌面环境
+}
+
+
+# 不需要加载的资源类型，页面解析只依赖DOM，不依赖渲染结果
+BLOCKED_RESOURCE_TYPES = frozenset(
+    {"image", "media", "font", "stylesheet", "websocket", "manifest"}
+)
+
+# 不需要加载的统计和广告域名
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "demdex.net",
+    "omtrdc.net",
+    "adobedtm.com",
+    "hotjar.com",
+)
+
+
+def is_blocked_request(resource_type: str, url: str) -> bool:
+    """
+    判断请求是否需要拦截，同步和异步的路由处理函数共用这一规则
+
+    Args:
+        resource_type: 请求的资源类型
+        url: 请求的URL
+
+    Returns:
+        bool: 需要拦截返回True
+    """
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+
+    host = urlparse(url).hostname or ""
+    # 只匹配域名本身和它的子域名，不误伤notdoubleclick.net这类相似域名
+    return any(host == h or host.endswith("." + h) for h in BLOCKED_HOSTS)
+
+
+async def _block_resources(route: Route) -> None:
+    """
+    路由处理函数 - 拦截非必要的资源请求
+
+    Args:
+        route: Playwright路由实例
+    """
+    request = route.request
+    if is_blocked_request(request.resource_type, request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _configure_context(context: BrowserContext) -> None:
+    """
+    配置浏览器上下文：在上下文级别拦截资源，覆盖其中的所有页面
+
+    Args:
+        context: 浏览器上下文
+    """
+    await context.route("**/*", _block_resources)
+
+
+async def _configure_page(page: Page) -> None:
+    """
+    配置新建页面：超时时间和cookie横幅处理程序
+
+    Args:
+        page: Playwright页面实例
+    """
+    page.set_default_timeout(20000)  # 设置默认超时时间为20秒
+    page.set_default_navigation_timeout(30000)  # 设置导航超时时间为30秒
+
+    # 添加cookie横幅处理程序
+    await setup_cookie_banner_handlers(page)
+
+
 async def initialize_browser() -> tuple[Playwright, Browser, BrowserContext, Page]:
     """
     初始化并配置Chromium浏览器
@@ -273,45 +381,22 @@ async def initialize_browser() -> tuple[Playwright, Browser, BrowserContext, Pag
         # 启动浏览器，配置优化选项
         browser = await playwright.chromium.launch(
             headless=True,  # 启用无头模式，不显示浏览器窗口，提高运行效率
-            args=[
-                "--no-sandbox",  # 禁用沙箱，解决某些环境下的权限问题
-                "--disable-dev-shm-usage",  # 解决在低内存环境中的崩溃问题
-                "--disable-extensions",  # 禁用扩展，减少资源占用和干扰
-                "--disable-gpu",  # 禁用GPU加速，提高在服务器环境下的兼容性
-                "--disable-notifications",  # 禁用通知，避免弹窗干扰
-            ],
+            args=BROWSER_LAUNCH_ARGS,
         )
 
         # 创建浏览器上下文，配置视口大小和其他选项
-        context = await browser.new_context(
-            viewport={
-                "width": 1920,
-                "height": 1080,
-            },  # 设置窗口大小，模拟标准显示器分辨率
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",  # 设置用户代理
-            ignore_https_errors=True,  # 忽略HTTPS错误，提高兼容性
-            java_script_enabled=True,  # 启用JavaScript
-            has_touch=False,  # 禁用触摸，模拟桌面环境
-        )
+        context = await browser.new_context(**CONTEXT_OPTIONS)
+        await _configure_context(context)
 
-        # 创建页面
+        # 创建并配置页面
         page = await context.new_page()
-
-        # 配置页面选项
-        await page.route(
-            "**/*.{png,jpg,jpeg,gif,svg}", lambda route: route.abort()
-        )  # 阻止加载图片，提高性能
-        page.set_default_timeout(20000)  # 设置默认超时时间为20秒
-        page.set_default_navigation_timeout(30000)  # 设置导航超时时间为30秒
-
-        # 添加cookie横幅处理程序
-        await setup_cookie_banner_handlers(page)
+        await _configure_page(page)
 
         logger.info("浏览器初始化完成")
         return playwright, browser, context, page
     except Exception as e:
         logger.error(f"浏览器初始化失败: {e}")
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         raise
 
 
@@ -350,4 +435,155 @@ async def close_browser(
         logger.info("浏览器资源已完全释放")
     except Exception as e:
         logger.warning(f"关闭浏览器时出错: {e}")
-        logger.debug(f"错误堆栈: {traceback.format_exc()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
+
+
+class BrowserPool:
+    """
+    浏览器池 - 在多次MCP工具调用之间复用同一个Playwright和Chromium进程
+
+    浏览器在首次使用时启动，之后每次调用只创建新的浏览器上下文和页面，
+    创建上下文的开销远小于启动一个新的浏览器进程。
+    登录后的会话(cookie和localStorage)保存到storage_state_path，
+    新建上下文时自动恢复，避免每次调用都重新登录。
+    同时打开的上下文数量不超过max_contexts，超出的调用等待已有上下文释放。
+    """
+
+    def __init__(self, storage_state_path: Optional[str] = None, max_contexts: int = 4) -> None:
+        self.storage_state_path = storage_state_path
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._lock = asyncio.Lock()
+        self._session_lock = asyncio.Lock()
+        self._context_slots = asyncio.Semaphore(max(1, max_contexts))
+
+    def has_session(self) -> bool:
+        """是否存在当前用户保存的登录会话"""
+        if not self.storage_state_path:
+            return False
+        try:
+            st = os.stat(self.storage_state_path)
+        except OSError:
+            return False
+        # 不信任其他用户创建的会话文件
+        return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+    async def _get_browser(self) -> Browser:
+        """获取共享的浏览器实例，必要时启动Playwright和Chromium"""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    logger.info("启动Playwright...")
+                    self._playwright = await async_playwright().start()
+
+                logger.info("启动共享的Chromium浏览器...")
+                self._browser = await self._playwright.chromium.launch(
+                    headless=True,
+                    args=BROWSER_LAUNCH_ARGS,
+                )
+            return self._browser
+
+    def session_cookies(self) -> list[dict[str, Any]]:
+        """
+        读取已保存登录会话中的cookie，供不经过浏览器的HTTP请求使用
+
+        Returns:
+            list: cookie列表，没有会话或读取失败时返回空列表
+        """
+        if not self.has_session():
+            return []
+
+        try:
+            with open(self.storage_state_path, encoding="utf-8") as f:
+                return json.load(f).get("cookies", [])
+        except (OSError, ValueError) as e:
+            logger.warning("读取登录会话失败: %s", e)
+            return []
+
+    async def acquire_page(self) -> tuple[BrowserContext, Page]:
+        """
+        从共享浏览器创建一个新的上下文和页面
+
+        Returns:
+            tuple: (浏览器上下文, 页面实例)
+        """
+        await self._context_slots.acquire()
+        try:
+            browser = await self._get_browser()
+            options = dict(CONTEXT_OPTIONS)
+            if self.has_session():
+                options["storage_state"] = self.storage_state_path
+            context = await browser.new_context(**options)
+        except Exception:
+            self._context_slots.release()
+            raise
+
+        try:
+            await _configure_context(context)
+            page = await context.new_page()
+            await _configure_page(page)
+        except Exception:
+            await context.close()
+            self._context_slots.release()
+            raise
+        return context, page
+
+    async def release(self, context: BrowserContext, page: Page) -> None:
+        """
+        释放页面和上下文，浏览器进程保持运行
+
+        Args:
+            context: 浏览器上下文
+            page: 页面实例
+        """
+        try:
+            await close_browser(context=context, page=page)
+        finally:
+            self._context_slots.release()
+
+    async def save_session(self, context: BrowserContext) -> None:
+        """
+        保存上下文的登录会话，供后续新建的上下文复用
+
+        先写入临时文件再原子替换，避免并发调用读到不完整的文件
+
+        Args:
+            context: 已登录的浏览器上下文
+        """
+        if not self.storage_state_path:
+            return
+
+        try:
+            data = json.dumps(await context.storage_state())
+            async with self._session_lock:
+                state_dir = os.path.dirname(os.path.abspath(self.storage_state_path))
+                # 会话文件包含cookie，目录和文件都只允许当前用户访问
+                os.makedirs(state_dir, mode=0o700, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=state_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(data)
+                    os.replace(tmp_path, self.storage_state_path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            logger.info("登录会话已保存: %s", self.storage_state_path)
+        except Exception as e:
+            logger.warning("保存登录会话失败: %s", e)
+
+    async def shutdown(self) -> None:
+        """关闭共享的浏览器并停止Playwright"""
+        async with self._lock:
+            playwright, browser = self._playwright, self._browser
+            self._playwright = None
+            self._browser = None
+        if playwright is not None or browser is not None:
+            await close_browser(playwright=playwright, browser=browser)
+
+
+# 全局浏览器池，由MCP工具共享
+_config = get_config()
+browser_pool = BrowserPool(
+    storage_state_path=_config["storage_state"], max_contexts=_config["max_contexts"]
+)
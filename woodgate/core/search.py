@@ -4,11 +4,14 @@
 """
 
 import asyncio
+import functools
 import logging
 import traceback
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
-from playwright.async_api import Error, Page, TimeoutError
+import httpx
+from playwright.async_api import Page, TimeoutError
 
 from .utils import handle_cookie_popup, log_step
 
@@ -17,6 +20,17 @@ logger = logging.getLogger(__name__)
 # Red Hat客户门户搜索URL
 SEARCH_BASE_URL = "https://access.redhat.com/search/"
 ALERTS_BASE_URL = "https://access.redhat.com/security/security-updates/"  # 已弃用，保留用于兼容性
+# Red Hat客户门户搜索API (Hydra)，返回JSON格式的搜索结果
+SEARCH_API_URL = "https://access.redhat.com/hydra/rest/search/kcs"
+
+# 页面元素选择器
+RESULT_SELECTOR = ".search-result, .pf-c-card"
+NO_RESULTS_SELECTOR = ".no-results, .pf-c-empty-state"
+DOCUMENT_TITLE_SELECTOR = "h1, .pf-c-title"
+DOCUMENT_CONTENT_SELECTOR = ".field-item, .pf-c-content, article"
+METADATA_FIELD_SELECTOR = ".field, .pf-c-description-list__group"
+METADATA_LABEL_SELECTOR = ".field-label, .pf-c-description-list__term"
+METADATA_VALUE_SELECTOR = ".field-item, .pf-c-description-list__description"
 
 
 async def perform_search(
@@ -59,16 +73,14 @@ async def perform_search(
 
         # 等待搜索结果加载
         try:
-            await page.wait_for_selector(
-                ".search-result, .pf-c-card", state="visible", timeout=15000
-            )
+            await page.wait_for_selector(RESULT_SELECTOR, state="visible", timeout=15000)
             log_step("搜索结果已加载")
         except TimeoutError:
             log_step("等待搜索结果超时，可能没有结果或页面结构已更改")
 
             # 检查是否有"无结果"消息
             try:
-                no_results = await page.query_selector(".no-results, .pf-c-empty-state")
+                no_results = await page.query_selector(NO_RESULTS_SELECTOR)
                 if no_results:
                     log_step("搜索没有返回结果")
                     return []
@@ -82,10 +94,134 @@ async def perform_search(
 
     except Exception as e:
         logger.error(f"执行搜索时出错: {e}")
-        logger.debug(f"错误堆栈: {traceback.format_exc()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
         return []
 
 
+def build_search_api_params(
+    query: str,
+    products: Optional[List[str]] = None,
+    doc_types: Optional[List[str]] = None,
+    page_num: int = 1,
+    rows: int = 20,
+    sort_by: str = "relevant",
+) -> List[tuple[str, Any]]:
+    """
+    构建搜索API的查询参数
+
+    Args:
+        query (str): 搜索关键词
+        products (List[str], optional): 要搜索的产品列表. Defaults to None.
+        doc_types (List[str], optional): 文档类型列表. Defaults to None.
+        page_num (int, optional): 页码. Defaults to 1.
+        rows (int, optional): 每页结果数. Defaults to 20.
+        sort_by (str, optional): 排序方式. Defaults to "relevant".
+
+    Returns:
+        List[tuple[str, Any]]: 查询参数列表，fq参数可以出现多次
+    """
+    params: List[tuple[str, Any]] = [
+        ("q", query),
+        ("rows", rows),
+        ("start", (page_num - 1) * rows),
+    ]
+
+    if products:
+        params.append(("fq", "product:(" + " OR ".join(f'"{p}"' for p in products) + ")"))
+
+    if doc_types:
+        params.append(("fq", "documentKind:(" + " OR ".join(f'"{d}"' for d in doc_types) + ")"))
+
+    # 相关性排序是API的默认行为
+    if sort_by and sort_by != "relevant":
+        params.append(("sort", sort_by))
+
+    return params
+
+
+def _api_client(cookies: List[Dict[str, Any]]) -> httpx.AsyncClient:
+    """
+    创建携带登录会话cookie的HTTP客户端
+
+    Args:
+        cookies (List[Dict[str, Any]]): 浏览器上下文导出的cookie列表
+
+    Returns:
+        httpx.AsyncClient: HTTP客户端
+    """
+    jar = httpx.Cookies()
+    for cookie in cookies:
+        jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""))
+
+    return httpx.AsyncClient(
+        cookies=jar,
+        headers={"Accept": "application/json"},
+        timeout=15.0,
+        follow_redirects=False,
+    )
+
+
+async def search_via_api(
+    cookies: List[Dict[str, Any]],
+    query: str,
+    products: Optional[List[str]] = None,
+    doc_types: Optional[List[str]] = None,
+    page_num: int = 1,
+    rows: int = 20,
+    sort_by: str = "relevant",
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    通过搜索API执行搜索，不需要浏览器
+
+    Args:
+        cookies (List[Dict[str, Any]]): 已登录会话的cookie列表
+        query (str): 搜索关键词
+        products (List[str], optional): 要搜索的产品列表. Defaults to None.
+        doc_types (List[str], optional): 文档类型列表. Defaults to None.
+        page_num (int, optional): 页码. Defaults to 1.
+        rows (int, optional): 每页结果数. Defaults to 20.
+        sort_by (str, optional): 排序方式. Defaults to "relevant".
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: 搜索结果列表；会话失效、请求失败或返回结果无法解析时
+        返回None，由调用方回退到浏览器搜索
+    """
+    params = build_search_api_params(query, products, doc_types, page_num, rows, sort_by)
+    log_step(f"通过搜索API执行搜索: '{query}'")
+
+    try:
+        async with _api_client(cookies) as client:
+            response = await client.get(SEARCH_API_URL, params=params)
+
+        # 会话失效时API返回401/403或重定向到登录页面
+        if response.status_code in (401, 403) or response.is_redirect:
+            log_step(f"搜索API需要重新登录 (HTTP {response.status_code})")
+            return None
+
+        response.raise_for_status()
+        docs = response.json().get("response", {}).get("docs", [])
+
+        results = []
+        for doc in docs:
+            results.append(
+                {
+                    "title": doc.get("publishedTitle") or doc.get("allTitle") or "未知标题",
+                    "url": doc.get("view_uri") or doc.get("uri", ""),
+                    "summary": doc.get("abstract") or doc.get("publishedAbstract") or "无摘要",
+                    "doc_type": doc.get("documentKind") or "未知类型",
+                    "last_updated": doc.get("lastModifiedDate") or "未知日期",
+                }
+            )
+    except Exception as e:
+        # 除网络和JSON错误外，返回结构不符合预期时也回退到浏览器搜索
+        logger.warning("调用搜索API失败: %s", e)
+        return None
+
+    log_step(f"搜索API返回 {len(results)} 个结果")
+    return results
+
+
 def build_search_url(
     query: str,
     products: Optional[List[str]] = None,
@@ -97,6 +233,8 @@ def build_search_url(
     """
     构建Red Hat客户门户搜索URL，与老代码保持一致
 
+    相同参数的URL只构建一次，列表参数转换为元组后作为缓存键
+
     Args:
         query (str): 搜索关键词
         products (List[str], optional): 要搜索的产品列表. Defaults to None.
@@ -108,41 +246,74 @@ def build_search_url(
     Returns:
         str: 构建好的搜索URL
     """
-    # 构建基本URL
-    base_url = f"{SEARCH_BASE_URL}?"
-
-    # 构建参数字典
-    params = {
-        "q": query.replace(" ", "+"),
-        "p": page,
-        "rows": rows,
-    }
-
-    # 添加产品过滤器 - 使用%26连接多个产品，与老代码一致
-    if products and len(products) > 0:
-        product_param = "%26".join(p.replace(" ", "+") for p in products)
-        params["product"] = product_param
+    url = _build_search_url(
+        query, tuple(products or ()), tuple(doc_types or ()), page, rows, sort_by
+    )
+    logger.debug("构建的搜索URL: %s", url)
+    return url
 
-    # 添加文档类型过滤器 - 使用%26连接多个文档类型，与老代码一致
-    if doc_types and len(doc_types) > 0:
-        doc_type_param = "%26".join(d.replace(" ", "+") for d in doc_types)
-        params["documentKind"] = doc_type_param
 
-    # 添加排序参数
+@functools.lru_cache(maxsize=256)
+def _build_search_url(
+    query: str,
+    products: Tuple[str, ...],
+    doc_types: Tuple[str, ...],
+    page: int,
+    rows: int,
+    sort_by: str,
+) -> str:
+    """构建搜索URL，参数必须可哈希"""
+    params: Dict[str, Any] = {"q": query, "p": page, "rows": rows}
+
+    # 多个产品或文档类型用&连接，编码后为%26，与老代码一致
+    if products:
+        params["product"] = "&".join(products)
+    if doc_types:
+        params["documentKind"] = "&".join(doc_types)
     if sort_by:
-        params["sort"] = sort_by.replace(" ", "+")
-
-    # 构建完整URL
-    url = base_url + "&".join(f"{k}={v}" for k, v in params.items())
-
-    logger.debug(f"构建的搜索URL: {url}")
-    return url
+        params["sort"] = sort_by
+
+    # urlencode默认使用quote_plus，空格编码为+，其他特殊字符也会被正确转义
+    return f"{SEARCH_BASE_URL}?{urlencode(params)}"
+
+
+# 在浏览器内一次性提取所有搜索结果，避免对每个结果的每个字段都进行一次CDP往返
+EXTRACT_RESULTS_JS = """
+([resultSelector, noResultsSelector]) => {
+    const text = (root, selector) => {
+        const node = root.querySelector(selector);
+        return node && node.textContent ? node.textContent.trim() : "";
+    };
+    const cards = Array.from(document.querySelectorAll(resultSelector));
+    return {
+        found: cards.length,
+        empty: !!document.querySelector(noResultsSelector),
+        results: cards
+            .map((card) => {
+                const link = card.querySelector("h2 a, .pf-c-title a");
+                if (!link) return null;
+                return {
+                    title: link.textContent ? link.textContent.trim() : "",
+                    url: link.getAttribute("href"),
+                    summary: text(card, ".search-result-content, .pf-c-card__body"),
+                    doc_type: text(card, ".search-result-info span, .pf-c-label"),
+                    last_updated: text(
+                        card, ".search-result-info time, .pf-c-label[data-testid='date']"
+                    ),
+                };
+            })
+            .filter(Boolean),
+    };
+}
+"""
 
 
 async def extract_search_results(page: Page) -> List[Dict[str, Any]]:
     """
     从搜索结果页面提取结果
 
+    所有字段通过一次page.evaluate在浏览器内提取
+
     Args:
         page (Page): Playwright页面实例
 
@@ -156,14 +327,14 @@ async def extract_search_results(page: Page) -> List[Dict[str, Any]]:
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            # 查找所有搜索结果元素
-            result_elements = await page.query_selector_all(".search-result, .pf-c-card")
-            log_step(f"找到 {len(result_elements)} 个搜索结果")
+            extracted = await page.evaluate(
+                EXTRACT_RESULTS_JS, [RESULT_SELECTOR, NO_RESULTS_SELECTOR]
+            )
+            log_step(f"找到 {extracted['found']} 个搜索结果")
 
-            if not result_elements:
+            if not extracted["found"]:
                 # 检查是否有"无结果"消息
-                no_results = await page.query_selector(".no-results, .pf-c-empty-state")
-                if no_results:
+                if extracted["empty"]:
                     log_step("搜索没有返回结果")
                     return []
 
@@ -176,66 +347,25 @@ async def extract_search_results(page: Page) -> List[Dict[str, Any]]:
                 log_step("多次尝试后仍未找到结果元素")
                 return []
 
-            # 处理每个搜索结果
-            for result in result_elements:
-                try:
-                    # 提取标题和链接
-                    title_element = await result.query_selector("h2 a, .pf-c-title a")
-                    if not title_element:
-                        continue
-
-                    title = await title_element.text_content()
-                    title = title.strip() if title else "未知标题"
-                    url = await title_element.get_attribute("href")
-
-                    # 提取摘要
-                    summary = "无摘要"
-                    summary_element = await result.query_selector(
-                        ".search-result-content, .pf-c-card__body"
-                    )
-                    if summary_element:
-                        summary_text = await summary_element.text_content()
-                        summary = summary_text.strip() if summary_text else "无摘要"
-
-                    # 提取文档类型
-                    doc_type = "未知类型"
-                    doc_type_element = await result.query_selector(
-                        ".search-result-info span, .pf-c-label"
-                    )
-                    if doc_type_element:
-                        doc_type_text = await doc_type_element.text_content()
-                        doc_type = doc_type_text.strip() if doc_type_text else "未知类型"
-
-                    # 提取最后更新日期
-                    last_updated = "未知日期"
-                    date_element = await result.query_selector(
-                        ".search-result-info time, .pf-c-label[data-testid='date']"
-                    )
-                    if date_element:
-                        date_text = await date_element.text_content()
-                        last_updated = date_text.strip() if date_text else "未知日期"
-
-                    # 添加到结果列表
-                    results.append(
-                        {
-                            "title": title,
-                            "url": url,
-                            "summary": summary,
-                            "doc_type": doc_type,
-                            "last_updated": last_updated,
-                        }
-                    )
-
-                except Error as e:
-                    logger.warning(f"处理搜索结果时出错: {e}")
-                    continue
+            # 为缺失的字段填充默认值
+            for item in extracted["results"]:
+                results.append(
+                    {
+                        "title": item["title"] or "未知标题",
+                        "url": item["url"],
+                        "summary": item["summary"] or "无摘要",
+                        "doc_type": item["doc_type"] or "未知类型",
+                        "last_updated": item["last_updated"] or "未知日期",
+                    }
+                )
 
             # 提取成功，跳出重试循环
             break
 
         except Exception as e:
             logger.error(f"提取搜索结果时出错: {e}")
-            logger.debug(f"错误堆栈: {traceback.format_exc()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("错误堆栈: %s", traceback.format_exc())
             if attempt < max_retries - 1:
                 log_step(f"将在2秒后重试... (尝试 {attempt + 1}/{max_retries})")
                 await asyncio.sleep(2)
@@ -266,6 +396,28 @@ async def get_product_alerts(page: Page, product: str) -> List[Dict[str, Any]]:
     return []
 
 
+# 在浏览器内一次性提取文档标题、内容和元数据，元数据转换为{标签: 值}，标签末尾的冒号会被去掉
+EXTRACT_DOCUMENT_JS = """
+([titleSelector, contentSelector, fieldSelector, labelSelector, valueSelector]) => {
+    const text = (node) => (node && node.textContent ? node.textContent.trim() : "");
+    const metadata = {};
+    for (const field of document.querySelectorAll(fieldSelector)) {
+        const label = field.querySelector(labelSelector);
+        const value = field.querySelector(valueSelector);
+        if (!label || !value) continue;
+        const key = text(label).replace(/:+$/, "");
+        const content = text(value);
+        if (key && content) metadata[key] = content;
+    }
+    return {
+        title: text(document.querySelector(titleSelector)),
+        content: text(document.querySelector(contentSelector)),
+        metadata,
+    };
+}
+"""
+
+
 async def get_document_content(page: Page, document_url: str) -> Dict[str, Any]:
     """
     获取特定文档的详细内容
@@ -289,66 +441,33 @@ async def get_document_content(page: Page, document_url: str) -> Dict[str, Any]:
 
         # 等待文档内容加载
         try:
-            await page.wait_for_selector(
-                ".field-item, .pf-c-content, article", state="visible", timeout=15000
-            )
+            await page.wait_for_selector(DOCUMENT_CONTENT_SELECTOR, state="visible", timeout=15000)
             log_step("文档内容已加载")
         except TimeoutError:
             log_step("等待文档内容超时，可能页面结构已更改")
             return {"error": "无法加载文档内容"}
 
-        # 提取文档标题
-        title = "未知标题"
-        title_element = await page.query_selector("h1, .pf-c-title")
-        if title_element:
-            title_text = await title_element.text_content()
-            title = title_text.strip() if title_text else "未知标题"
-
-        # 提取文档内容
-        content = "无法提取文档内容"
-        content_element = await page.query_selector(".field-item, .pf-c-content, article")
-        if content_element:
-            content_text = await content_element.text_content()
-            content = content_text.strip() if content_text else "无法提取文档内容"
-
-        # 提取文档元数据
-        metadata = {}
-        try:
-            # 尝试提取各种可能的元数据字段
-            metadata_fields = await page.query_selector_all(".field, .pf-c-description-list__group")
-
-            for field in metadata_fields:
-                try:
-                    label_element = await field.query_selector(
-                        ".field-label, .pf-c-description-list__term"
-                    )
-                    value_element = await field.query_selector(
-                        ".field-item, .pf-c-description-list__description"
-                    )
-
-                    if label_element and value_element:
-                        label_text = await label_element.text_content()
-                        value_text = await value_element.text_content()
-
-                        label = label_text.strip().rstrip(":") if label_text else ""
-                        value = value_text.strip() if value_text else ""
-
-                        if label and value:
-                            metadata[label] = value
-                except Error:
-                    continue
-        except Exception as e:
-            logger.warning(f"提取文档元数据时出错: {e}")
-            logger.debug(f"错误堆栈: {traceback.format_exc()}")
+        # 标题、内容和元数据通过一次page.evaluate在浏览器内提取
+        extracted = await page.evaluate(
+            EXTRACT_DOCUMENT_JS,
+            [
+                DOCUMENT_TITLE_SELECTOR,
+                DOCUMENT_CONTENT_SELECTOR,
+                METADATA_FIELD_SELECTOR,
+                METADATA_LABEL_SELECTOR,
+                METADATA_VALUE_SELECTOR,
+            ],
+        )
 
         return {
-            "title": title,
-            "content": content,
+            "title": extracted["title"] or "未知标题",
+            "content": extracted["content"] or "无法提取文档内容",
             "url": document_url,
-            "metadata": metadata,
+            "metadata": extracted["metadata"],
         }
 
     except Exception as e:
         logger.error(f"获取文档内容时出错: {e}")
-        logger.debug(f"错误堆栈: {traceback.format_exc()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("错误堆栈: %s", traceback.format_exc())
         return {"error": f"获取文档内容时出错: {str(e)}"}
@@ -5,12 +5,99 @@
 
 import logging
 import time
+import weakref
 from typing import Any, Dict
 
 from playwright.async_api import BrowserContext, Page
 
 logger = logging.getLogger(__name__)
 
+# 常见的cookie弹窗选择器
+POPUP_SELECTORS = (
+    "#onetrust-banner-sdk",  # 最常见的
+    ".pf-c-modal-box",  # Red Hat特有的
+    "[role='dialog'][aria-modal='true']",  # 通用备选
+    ".cookie-banner",  # 通用cookie横幅
+    "#cookie-notice",  # 另一种常见的cookie通知
+    "#truste-consent-track",  # Red Hat使用的TrustArc cookie通知
+    ".truste_box_overlay",  # TrustArc弹窗
+    ".truste_overlay",  # TrustArc弹窗
+    "#consent_blackbar",  # 另一种常见的cookie通知
+    ".evidon-banner",  # Evidon cookie通知
+    ".cookie-consent-banner",  # 通用cookie横幅
+    "#gdpr-cookie-message",  # GDPR cookie消息
+    "#cookiebanner",  # 通用cookie横幅
+    "#cookie-law-info-bar",  # Cookie Law Info插件
+    ".cc-window",  # Cookie Consent插件
+)
+
+# 弹窗内的关闭按钮选择器，优先使用更常见的按钮选择器
+CLOSE_BUTTON_SELECTORS = (
+    "button.pf-c-button[aria-label='Close']",
+    "#onetrust-accept-btn-handler",
+    "button.pf-c-button.pf-m-primary",
+    ".close-button",
+    "button[aria-label='Close']",
+    "#truste-consent-button",  # TrustArc同意按钮
+    ".truste_popclose",  # TrustArc关闭按钮
+    ".trustarc-agree-btn",  # TrustArc同意按钮
+    ".evidon-banner-acceptbutton",  # Evidon接受按钮
+    ".cc-dismiss",  # Cookie Consent关闭按钮
+    ".cc-accept-all",  # Cookie Consent接受所有按钮
+    "#cookie-notice-accept-button",  # Cookie Notice接受按钮
+    ".cookie-consent-button",  # 通用cookie同意按钮
+    "button:has-text('Accept All')",  # 接受所有按钮
+    "button:has-text('Accept Cookies')",  # 接受cookies按钮
+)
+
+# 接受或关闭按钮的文本
+ACCEPT_BUTTON_TEXTS = (
+    "Accept",
+    "I agree",
+    "Close",
+    "OK",
+    "Accept All",
+    "Accept Cookies",
+    "Agree",
+    "Continue",
+    "Got it",
+    "I understand",
+    "接受",
+    "同意",
+    "关闭",
+    "继续",
+    "我同意",
+    "我理解",
+)
+
+# 合并后的弹窗选择器，只需等待一次
+POPUP_SELECTOR = ", ".join(POPUP_SELECTORS)
+
+# 在cookie通知元素内按文本顺序查找并点击第一个匹配的按钮，找到返回true
+# 按钮文本需要与候选文本完全相同或作为整词出现，避免误点"Closed"、"Book"这类只是包含候选文本的按钮
+CLICK_ACCEPT_BUTTON_JS = """
+(notice, texts) => {
+    const buttons = Array.from(notice.querySelectorAll('button, [role="button"]'));
+    const labels = buttons.map((b) =>
+        (b.innerText || b.textContent || '').trim().replace(/\\s+/g, ' ').toLowerCase()
+    );
+    for (const text of texts) {
+        const needle = text.toLowerCase();
+        const escaped = needle.replace(/[.*+?^${}()|[\\]\\\\]/g, '\\\\$&');
+        const word = new RegExp('(^|[^\\\\p{L}\\\\p{N}])' + escaped + '([^\\\\p{L}\\\\p{N}]|$)', 'u');
+        const index = labels.findIndex((label) => label === needle || word.test(label));
+        if (index !== -1) {
+            buttons[index].click();
+            return true;
+        }
+    }
+    return false;
+}
+"""
+
+# 已经关闭过cookie弹窗的浏览器上下文，同意状态保存在上下文的cookie中，弹窗不会再出现
+_popup_handled_contexts: "weakref.WeakSet[BrowserContext]" = weakref.WeakSet()
+
 
 def setup_logging(level=logging.INFO):
     """
@@ -86,177 +173,60 @@ async def print_cookies(context: BrowserContext, step_name: str = ""):
     log_step("============================")
 
 
-async def handle_cookie_popup(page: Page, timeout: float = 1.0) -> bool:
+async def handle_cookie_popup(page: Page, timeout: float = 0.5, force: bool = False) -> bool:
     """
     处理网页上出现的cookie或隐私弹窗
 
+    所有弹窗选择器合并为一个选择器只等待一次，没有弹窗时最多等待timeout秒。
+    同一个浏览器上下文中弹窗关闭过一次后，之后的调用直接跳过
+
     Args:
         page (Page): Playwright页面实例
-        timeout (float, optional): 等待弹窗出现的超时时间(秒). Defaults to 1.0.
+        timeout (float, optional): 等待弹窗出现的超时时间(秒). Defaults to 0.5.
+        force (bool, optional): 忽略已处理记录，总是检查弹窗. Defaults to False.
 
     Returns:
         bool: 如果成功处理了弹窗返回True，否则返回False
     """
+    if not force and page.context in _popup_handled_contexts:
+        log_step("当前上下文已处理过cookie通知，跳过检查")
+        return False
+
     log_step("检查是否存在cookie通知...")
 
     try:
-        # 设置较短的超时时间，避免在没有弹窗的情况下等待太久
-        # 注意：在某些版本的Playwright中，set_default_timeout可能是异步方法
-        await page.set_default_timeout(timeout * 1000)  # 转换为毫秒
-
-        # 优化：使用更高效的CSS选择器，减少DOM查询次数
-        popup_selectors = [
-            "#onetrust-banner-sdk",  # 最常见的
-            ".pf-c-modal-box",  # Red Hat特有的
-            "[role='dialog'][aria-modal='true']",  # 通用备选
-            ".cookie-banner",  # 通用cookie横幅
-            "#cookie-notice",  # 另一种常见的cookie通知
-            "#truste-consent-track",  # Red Hat使用的TrustArc cookie通知
-            ".truste_box_overlay",  # TrustArc弹窗
-            ".truste_overlay",  # TrustArc弹窗
-            "#consent_blackbar",  # 另一种常见的cookie通知
-            ".evidon-banner",  # Evidon cookie通知
-            ".cookie-consent-banner",  # 通用cookie横幅
-            "#gdpr-cookie-message",  # GDPR cookie消息
-            "#cookiebanner",  # 通用cookie横幅
-            "#cookie-law-info-bar",  # Cookie Law Info插件
-            ".cc-window",  # Cookie Consent插件
-        ]
-
-        # 检查是否存在cookie通知
-        for selector in popup_selectors:
-            try:
-                # 使用waitForSelector而不是等待元素可见，提高效率
-                cookie_notice = await page.wait_for_selector(
-                    selector, timeout=timeout * 1000, state="attached"
-                )
-                if cookie_notice:
-                    log_step(f"发现cookie通知，使用选择器: {selector}")
-
-                    # 优化：减少选择器数量，优先使用更常见的按钮选择器
-                    close_buttons = [
-                        "button.pf-c-button[aria-label='Close']",
-                        "#onetrust-accept-btn-handler",
-                        "button.pf-c-button.pf-m-primary",
-                        ".close-button",
-                        "button[aria-label='Close']",
-                        "#truste-consent-button",  # TrustArc同意按钮
-                        ".truste_popclose",  # TrustArc关闭按钮
-                        ".trustarc-agree-btn",  # TrustArc同意按钮
-                        ".evidon-banner-acceptbutton",  # Evidon接受按钮
-                        ".cc-dismiss",  # Cookie Consent关闭按钮
-                        ".cc-accept-all",  # Cookie Consent接受所有按钮
-                        "#cookie-notice-accept-button",  # Cookie Notice接受按钮
-                        ".cookie-consent-button",  # 通用cookie同意按钮
-                        "button:has-text('Accept All')",  # 接受所有按钮
-                        "button:has-text('Accept Cookies')",  # 接受cookies按钮
-                    ]
-
-                    # 先尝试在cookie通知元素内查找关闭按钮
-                    for btn_selector in close_buttons:
-                        try:
-                            # 在cookie通知内查找按钮
-                            close_button = await cookie_notice.query_selector(btn_selector)
-                            if close_button:
-                                log_step(f"在cookie通知中找到关闭按钮，使用选择器: {btn_selector}")
-                                await close_button.click()
-                                log_step("已点击关闭按钮")
-                                # 恢复默认超时时间
-                                await page.set_default_timeout(30000)
-                                return True
-                        except Exception:
-                            continue
-
-                    # 尝试通过文本内容查找按钮
-                    for button_text in [
-                        "Accept",
-                        "I agree",
-                        "Close",
-                        "OK",
-                        "Accept All",
-                        "Accept Cookies",
-                        "Agree",
-                        "Continue",
-                        "Got it",
-                        "I understand",
-                        "接受",
-                        "同意",
-                        "关闭",
-                        "继续",
-                        "我同意",
-                        "我理解",
-                    ]:
-                        try:
-                            # 使用text=按钮文本定位
-                            locator = page.get_by_text(button_text, exact=False).first
-                            # 检查元素是否存在
-                            if await locator.count() > 0:
-                                await locator.click(timeout=1000)
-                                log_step(f"找到并点击了文本为'{button_text}'的按钮")
-                            # 恢复默认超时时间
-                            await page.set_default_timeout(30000)
-                            return True
-                        except Exception:
-                            continue
-
-                    # 如果上述方法都失败，尝试使用JavaScript点击
-                    try:
-                        await page.evaluate(
-                            """
-                            const buttons = Array.from(document.querySelectorAll('button, a.button, input[type="button"], input[type="submit"]'));
-                            const acceptButton = buttons.find(button =>
-                                button.textContent.toLowerCase().includes('accept') ||
-                                button.textContent.toLowerCase().includes('agree') ||
-                                button.textContent.toLowerCase().includes('close') ||
-                                button.textContent.toLowerCase().includes('ok') ||
-                                button.textContent.toLowerCase().includes('got it') ||
-                                button.textContent.toLowerCase().includes('continue') ||
-                                button.textContent.toLowerCase().includes('understand') ||
-                                button.textContent.toLowerCase().includes('接受') ||
-                                button.textContent.toLowerCase().includes('同意') ||
-                                button.textContent.toLowerCase().includes('关闭') ||
-                                button.textContent.toLowerCase().includes('继续') ||
-                                button.textContent.toLowerCase().includes('理解')
-                            );
-                            if (acceptButton) acceptButton.click();
-
-                            // 尝试点击特定ID的按钮
-                            const specificButtons = [
-                                document.querySelector('#truste-consent-button'),
-                                document.querySelector('#onetrust-accept-btn-handler'),
-                                document.querySelector('.trustarc-agree-btn'),
-                                document.querySelector('.evidon-banner-acceptbutton'),
-                                document.querySelector('.cc-accept-all'),
-                                document.querySelector('#cookie-notice-accept-button')
-                            ];
-
-                            for (const btn of specificButtons) {
-                                if (btn) {
-                                    btn.click();
-                                    break;
-                                }
-                            }
-                        """
-                        )
-                        log_step("已使用JavaScript尝试点击按钮")
-                        # 恢复默认超时时间
-                        await page.set_default_timeout(30000)
-                        return True
-                    except Exception:
-                        pass
-            except Exception:
-                continue
-
-        # 恢复默认超时时间
-        await page.set_default_timeout(30000)
+        cookie_notice = await page.wait_for_selector(
+            POPUP_SELECTOR, timeout=timeout * 1000, state="attached"
+        )
+    except Exception:
         log_step("未发现cookie通知")
         return False
 
+    if not cookie_notice:
+        log_step("未发现cookie通知")
+        return False
+
+    log_step("发现cookie通知")
+    try:
+        # 先尝试在cookie通知元素内查找关闭按钮
+        for btn_selector in CLOSE_BUTTON_SELECTORS:
+            close_button = await cookie_notice.query_selector(btn_selector)
+            if close_button:
+                log_step(f"在cookie通知中找到关闭按钮，使用选择器: {btn_selector}")
+                await close_button.click()
+                log_step("已点击关闭按钮")
+                _popup_handled_contexts.add(page.context)
+                return True
+
+        # 再在cookie通知元素内按按钮文本查找，一次evaluate完成
+        if await cookie_notice.evaluate(CLICK_ACCEPT_BUTTON_JS, list(ACCEPT_BUTTON_TEXTS)):
+            log_step("已通过按钮文本关闭cookie通知")
+            _popup_handled_contexts.add(page.context)
+            return True
     except Exception as e:
-        # 恢复默认超时时间
-        await page.set_default_timeout(30000)
         log_step(f"处理cookie通知时出错: {e}")
-        return False
+
+    return False
 
 
 def format_alert(feature: Dict[str, Any]) -> str:
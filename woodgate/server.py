@@ -2,15 +2,26 @@
 MCP服务器模块 - 实现Model Context Protocol服务器
 """
 
+import copy
+import functools
 import logging
-from typing import Any, Dict, List, Optional, TypedDict, Union
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, TypedDict, Union
 
 from typing_extensions import NotRequired
 
 from .config import get_available_products, get_credentials, get_document_types
-from .core.auth import login_to_redhat_portal
-from .core.browser import initialize_browser
-from .core.search import get_document_content, get_product_alerts, perform_search
+from .core.auth import check_login_status, login_to_redhat_portal
+from .core.browser import browser_pool
+from .core.search import (
+    get_document_content,
+    get_product_alerts,
+    perform_search,
+    search_via_api,
+)
 
 # 导入 FastMCP 类
 try:
@@ -25,7 +36,7 @@ mcp = FastMCP(
     name="Woodgate",
     description="Red Hat客户门户搜索工具，提供登录、搜索和文档获取功能。",
     version="1.0.0",  # 添加版本号
-    log_level="DEBUG",  # 设置日志级别为DEBUG
+    log_level="INFO",  # 默认INFO，需要调试时再调低
     dependencies=["playwright", "httpx"],  # 声明依赖
     stateless_http=True,  # 支持无状态HTTP传输
 )
@@ -75,6 +86,120 @@ AlertResults = List[Union[AlertInfo, ErrorResponse]]
 DocumentResult = Union[DocumentContent, ErrorResponse]
 
 
+# 结果缓存，短时间内重复的请求直接返回，不再启动浏览器
+_CACHE_MAX_ENTRIES = 128
+_DOC_TTL = 300
+_SEARCH_TTL = 30
+_DOC_CACHE: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+_SEARCH_CACHE: "OrderedDict[tuple, Tuple[Any, float]]" = OrderedDict()
+
+
+def _cache_get(cache: OrderedDict, key: Any) -> Optional[Any]:
+    """
+    读取未过期的缓存项
+
+    Args:
+        cache: 缓存字典
+        key: 缓存键
+
+    Returns:
+        缓存值的副本，不存在或已过期时返回None
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    value, expiry = entry
+    if time.monotonic() >= expiry:
+        del cache[key]
+        return None
+
+    cache.move_to_end(key)
+    # 返回副本，调用方修改结果不会影响缓存项
+    return copy.deepcopy(value)
+
+
+def _cache_put(cache: OrderedDict, key: Any, value: Any, ttl: float) -> None:
+    """
+    写入缓存项的副本，超出容量时淘汰最久未使用的项
+
+    Args:
+        cache: 缓存字典
+        key: 缓存键
+        value: 缓存的值
+        ttl: 有效期(秒)
+    """
+    cache[key] = (copy.deepcopy(value), time.monotonic() + ttl)
+    cache.move_to_end(key)
+    while len(cache) > _CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+@asynccontextmanager
+async def _pooled_page() -> AsyncIterator[Tuple[Any, Any]]:
+    """
+    从浏览器池借用一个上下文和页面，退出时总是归还
+
+    归还失败只记录警告，不影响工具的返回结果
+
+    Yields:
+        tuple: (浏览器上下文, 页面实例)
+    """
+    context, page = await browser_pool.acquire_page()
+    try:
+        yield context, page
+    finally:
+        try:
+            await browser_pool.release(context, page)
+        except Exception as e:
+            logger.warning("释放浏览器页面时出错: %s", e)
+
+
+async def _ensure_login(page, context, username: str, password: str) -> bool:
+    """
+    确保页面处于登录状态
+
+    已保存的会话仍然有效时跳过登录流程，否则重新登录并保存会话
+
+    Args:
+        page: Playwright页面实例
+        context: 浏览器上下文
+        username: Red Hat账号用户名
+        password: Red Hat账号密码
+
+    Returns:
+        bool: 登录成功返回True，否则返回False
+    """
+    if browser_pool.has_session() and await check_login_status(page):
+        logger.info("复用已保存的登录会话")
+        return True
+
+    if not await login_to_redhat_portal(page, context, username, password):
+        return False
+
+    await browser_pool.save_session(context)
+    return True
+
+
+def _format_search_results(results: List[Dict[str, Any]]) -> SearchResults:
+    """将搜索结果转换为SearchResult对象列表"""
+    search_results: SearchResults = []
+    for result in results:
+        if "error" in result:
+            search_results.append({"error": result["error"]})
+        else:
+            search_results.append(
+                {
+                    "title": result.get("title", "未知标题"),
+                    "url": result.get("url", ""),
+                    "description": result.get("summary", ""),
+                    "doc_type": result.get("doc_type", ""),
+                    "last_modified": result.get("last_updated", ""),
+                }
+            )
+    return search_results
+
+
 @mcp.tool()
 async def search(
     query: str,
@@ -102,75 +227,59 @@ async def search(
     print(f"收到MCP搜索请求: query='{query}', products={products}, doc_types={doc_types}")
     print(f"页码={page_num}, 每页结果数={rows}, 排序方式={sort_by}")
 
-    browser_resources = None
-    try:
-        # 并行初始化浏览器和获取凭据
-        import asyncio
-
-        # 使用asyncio.to_thread将同步函数转换为异步操作
-        browser_task = asyncio.create_task(initialize_browser())
-        credentials_task = asyncio.to_thread(get_credentials)
-
-        # 等待两个任务完成
-        browser_resources, credentials_result = await asyncio.gather(browser_task, credentials_task)
-        username, password = credentials_result
-
-        # 解包浏览器资源
-        playwright, browser, context, page_obj = browser_resources
-        page = page_obj  # 重命名变量，避免与函数参数冲突
-
-        # 检查浏览器初始化是否成功
-        if page is None:
-            logger.error("浏览器初始化失败")
-            return [{"error": "浏览器初始化失败，无法执行搜索"}]
-
-        # 执行登录
-        login_success = await login_to_redhat_portal(page, context, username, password)
-        if not login_success:
-            return [ErrorResponse(error="登录失败，请检查凭据")]
-
-        # 执行搜索
-        results = await perform_search(
-            page,
+    cache_key = (query, tuple(products or ()), tuple(doc_types or ()), page_num, rows, sort_by)
+    cached = _cache_get(_SEARCH_CACHE, cache_key)
+    if cached is not None:
+        logger.info("返回缓存的搜索结果")
+        return cached
+
+    # 已有登录会话时直接调用搜索API，不需要启动浏览器
+    if browser_pool.has_session():
+        api_results = await search_via_api(
+            browser_pool.session_cookies(),
             query=query,
-            products=products or [],
-            doc_types=doc_types or [],
+            products=products,
+            doc_types=doc_types,
             page_num=page_num,
             rows=rows,
             sort_by=sort_by,
         )
-        # 将结果转换为SearchResult对象列表
-        search_results: List[Union[SearchResult, ErrorResponse]] = []
-        for result in results:
-            if "error" in result:
-                search_results.append({"error": result["error"]})
-            else:
-                search_results.append(
-                    {
-                        "title": result.get("title", "未知标题"),
-                        "url": result.get("url", ""),
-                        "description": result.get("summary", ""),
-                        "doc_type": result.get("doc_type", ""),
-                        "last_modified": result.get("last_updated", ""),
-                    }
-                )
-        return search_results
+        if api_results is not None:
+            search_results = _format_search_results(api_results)
+            _cache_put(_SEARCH_CACHE, cache_key, search_results, _SEARCH_TTL)
+            return search_results
+        logger.info("搜索API不可用，回退到浏览器搜索")
+
+    try:
+        # 凭据已在进程内缓存，直接读取即可
+        username, password = get_credentials()
+
+        # 从浏览器池借用页面，退出时自动归还
+        async with _pooled_page() as (context, page):
+            # 执行登录
+            login_success = await _ensure_login(page, context, username, password)
+            if not login_success:
+                return [ErrorResponse(error="登录失败，请检查凭据")]
+
+            # 执行搜索
+            results = await perform_search(
+                page,
+                query=query,
+                products=products or [],
+                doc_types=doc_types or [],
+                page_num=page_num,
+                rows=rows,
+                sort_by=sort_by,
+            )
+            search_results = _format_search_results(results)
+            # perform_search出错时也返回空列表，无法与真正没有结果区分，空结果不缓存
+            if search_results and not any("error" in result for result in search_results):
+                _cache_put(_SEARCH_CACHE, cache_key, search_results, _SEARCH_TTL)
+            return search_results
     except Exception as e:
         logger.error(f"搜索过程中出错: {e}")
-        import traceback
-
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         return [{"error": f"搜索过程中出错: {str(e)}"}]
-    finally:
-        try:
-            # 安全地关闭浏览器
-            if browser_resources:
-                playwright, browser, context, page_obj = browser_resources
-                from .core.browser import close_browser
-
-                await close_browser(playwright, browser, context, page_obj)
-        except Exception as e:
-            logger.warning(f"关闭浏览器时出错: {e}")
 
 
 @mcp.tool()
@@ -187,68 +296,40 @@ async def get_alerts(product: str) -> AlertResults:
     logger.info(f"收到MCP获取警报请求: product='{product}'")
     print(f"收到MCP获取警报请求: product='{product}'")
 
-    browser_resources = None
     try:
-        # 并行初始化浏览器和获取凭据
-        import asyncio
-
-        # 使用asyncio.to_thread将同步函数转换为异步操作
-        browser_task = asyncio.create_task(initialize_browser())
-        credentials_task = asyncio.to_thread(get_credentials)
-
-        # 等待两个任务完成
-        browser_resources, credentials_result = await asyncio.gather(browser_task, credentials_task)
-        username, password = credentials_result
-
-        # 解包浏览器资源
-        playwright, browser, context, page_obj = browser_resources
-        page = page_obj  # 重命名变量，避免与函数参数冲突
-
-        # 检查浏览器初始化是否成功
-        if page is None:
-            logger.error("浏览器初始化失败")
-            return [{"error": "浏览器初始化失败，无法获取警报"}]
-
-        # 执行登录
-        login_success = await login_to_redhat_portal(page, context, username, password)
-        if not login_success:
-            return [{"error": "登录失败，请检查凭据"}]
-
-        # 获取产品警报
-        alerts_data = await get_product_alerts(page, product)
-        # 将结果转换为AlertInfo对象列表
-        alert_results: List[Union[AlertInfo, ErrorResponse]] = []
-        for alert in alerts_data:
-            if "error" in alert:
-                alert_results.append({"error": alert["error"]})
-            else:
-                alert_results.append(
-                    {
-                        "title": alert.get("title", "未知警报"),
-                        "severity": alert.get("severity", "未知"),
-                        "issued": alert.get("issued", ""),
-                        "cve": alert.get("cve", ""),
-                        "url": alert.get("url", ""),
-                        "description": alert.get("description", ""),
-                    }
-                )
-        return alert_results
+        # 凭据已在进程内缓存，直接读取即可
+        username, password = get_credentials()
+
+        # 从浏览器池借用页面，退出时自动归还
+        async with _pooled_page() as (context, page):
+            # 执行登录
+            login_success = await _ensure_login(page, context, username, password)
+            if not login_success:
+                return [{"error": "登录失败，请检查凭据"}]
+
+            # 获取产品警报
+            alerts_data = await get_product_alerts(page, product)
+            # 将结果转换为AlertInfo对象列表
+            alert_results: List[Union[AlertInfo, ErrorResponse]] = []
+            for alert in alerts_data:
+                if "error" in alert:
+                    alert_results.append({"error": alert["error"]})
+                else:
+                    alert_results.append(
+                        {
+                            "title": alert.get("title", "未知警报"),
+                            "severity": alert.get("severity", "未知"),
+                            "issued": alert.get("issued", ""),
+                            "cve": alert.get("cve", ""),
+                            "url": alert.get("url", ""),
+                            "description": alert.get("description", ""),
+                        }
+                    )
+            return alert_results
     except Exception as e:
         logger.error(f"获取警报过程中出错: {e}")
-        import traceback
-
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         return [{"error": f"获取警报过程中出错: {str(e)}"}]
-    finally:
-        try:
-            # 安全地关闭浏览器
-            if browser_resources:
-                playwright, browser, context, page_obj = browser_resources
-                from .core.browser import close_browser
-
-                await close_browser(playwright, browser, context, page_obj)
-        except Exception as e:
-            logger.warning(f"关闭浏览器时出错: {e}")
 
 
 @mcp.tool()
@@ -265,87 +346,67 @@ async def get_document(document_url: str) -> DocumentResult:
     logger.info(f"收到MCP获取文档请求: document_url='{document_url}'")
     print(f"收到MCP获取文档请求: document_url='{document_url}'")
 
-    browser_resources = None
+    cached = _cache_get(_DOC_CACHE, document_url)
+    if cached is not None:
+        logger.info("返回缓存的文档内容")
+        return cached
+
     try:
-        # 并行初始化浏览器和获取凭据
-        import asyncio
-
-        # 使用asyncio.to_thread将同步函数转换为异步操作
-        browser_task = asyncio.create_task(initialize_browser())
-        credentials_task = asyncio.to_thread(get_credentials)
-
-        # 等待两个任务完成
-        browser_resources, credentials_result = await asyncio.gather(browser_task, credentials_task)
-        username, password = credentials_result
-
-        # 解包浏览器资源
-        playwright, browser, context, page_obj = browser_resources
-        page = page_obj  # 重命名变量，避免与函数参数冲突
-
-        # 检查浏览器初始化是否成功
-        if page is None:
-            logger.error("浏览器初始化失败")
-            return {"error": "浏览器初始化失败，无法获取文档内容"}
-
-        # 执行登录
-        login_success = await login_to_redhat_portal(page, context, username, password)
-        if not login_success:
-            return {"error": "登录失败，请检查凭据"}
-
-        # 获取文档内容
-        document_data = await get_document_content(page, document_url)
-        # 将结果转换为DocumentContent对象
-        if "error" in document_data:
-            return {"error": document_data["error"]}
-
-        return {
-            "title": document_data.get("title", "未知标题"),
-            "content": document_data.get("content", ""),
-            "url": document_url,
-            "doc_type": document_data.get("metadata", {}).get("Document Type", ""),
-            "last_modified": document_data.get("metadata", {}).get("Last Modified", ""),
-        }
+        # 凭据已在进程内缓存，直接读取即可
+        username, password = get_credentials()
+
+        # 从浏览器池借用页面，退出时自动归还
+        async with _pooled_page() as (context, page):
+            # 执行登录
+            login_success = await _ensure_login(page, context, username, password)
+            if not login_success:
+                return {"error": "登录失败，请检查凭据"}
+
+            # 获取文档内容
+            document_data = await get_document_content(page, document_url)
+            # 将结果转换为DocumentContent对象
+            if "error" in document_data:
+                return {"error": document_data["error"]}
+
+            document: DocumentContent = {
+                "title": document_data.get("title", "未知标题"),
+                "content": document_data.get("content", ""),
+                "url": document_url,
+                "doc_type": document_data.get("metadata", {}).get("Document Type", ""),
+                "last_modified": document_data.get("metadata", {}).get("Last Modified", ""),
+            }
+            _cache_put(_DOC_CACHE, document_url, document, _DOC_TTL)
+            return document
     except Exception as e:
         logger.error(f"获取文档内容过程中出错: {e}")
-        import traceback
-
-        logger.error(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         return {"error": f"获取文档内容过程中出错: {str(e)}"}
-    finally:
-        try:
-            # 安全地关闭浏览器
-            if browser_resources:
-                playwright, browser, context, page_obj = browser_resources
-                from .core.browser import close_browser
-
-                await close_browser(playwright, browser, context, page_obj)
-        except Exception as e:
-            logger.warning(f"关闭浏览器时出错: {e}")
 
 
 @mcp.resource("redhat://products")
-def available_products() -> List[str]:
+def available_products() -> Tuple[str, ...]:
     """获取可用的产品列表"""
     return get_available_products()
 
 
 @mcp.resource("redhat://doc-types")
-def document_types() -> List[str]:
+def document_types() -> Tuple[str, ...]:
     """获取可用的文档类型"""
     return get_document_types()
 
 
 @mcp.resource("redhat://search-params")
+@functools.cache
 def search_params() -> Dict[str, Any]:
-    """获取搜索参数配置"""
+    """获取搜索参数配置，内容不会变化，只构建一次"""
     return {
-        "sort_options": [
+        "sort_options": (
             {"value": "relevant", "label": "相关性"},
             {"value": "lastModifiedDate desc", "label": "最新更新"},
             {"value": "lastModifiedDate asc", "label": "最早更新"},
             {"value": "portal_publication_date desc", "label": "最新发布"},
             {"value": "portal_publication_date asc", "label": "最早发布"},
-        ],
+        ),
         "default_rows": 20,
         "max_rows": 100,
         "products": get_available_products(),